@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# benchmarks/cli_startup.py
+"""Track CLI cold-start cost with `python -X importtime`.
+
+Each run starts fresh interpreters for a few CLI entry points, sums the
+cumulative import time of top-level modules, and appends the result to a
+JSON-lines history file so regressions show up over time.
+
+    python benchmarks/cli_startup.py [--runs 5] [--history benchmarks/results/cli_startup.jsonl]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLES = ROOT / "examples"
+
+SCENARIOS = {
+    # What cron pays for a typo'd path or a pre-flight check
+    "validate_only": [
+        "-m", "marketpulse.cli",
+        "--portfolio", str(EXAMPLES / "portfolio.json"),
+        "--preferences", str(EXAMPLES / "preferences.json"),
+        "--validate-only",
+    ],
+    "help": ["-m", "marketpulse.cli", "--help"],
+    # The agent stack loaded when an analysis actually runs
+    "agent_stack": ["-c", "import marketpulse.flows.market_analysis_flow"],
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str):
+    """Return (total microseconds, {top-level module: cumulative microseconds})"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        # Only top-level imports (single leading space) so nested imports are not double counted
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(2))
+    return sum(modules.values()), modules
+
+
+def run_once(args):
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    total, modules = parse_importtime(proc.stderr)
+    return proc.returncode, wall, total, modules
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per scenario")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to show")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Limit to these scenarios")
+    parser.add_argument("--history", default=str(ROOT / "benchmarks" / "results" / "cli_startup.jsonl"))
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "scenarios": {},
+    }
+
+    for name in args.scenario or SCENARIOS:
+        walls, imports, slowest = [], [], {}
+        failed = False
+        for _ in range(args.runs):
+            returncode, wall, total, modules = run_once(SCENARIOS[name])
+            failed = failed or returncode != 0
+            walls.append(wall)
+            imports.append(total)
+            slowest = modules
+        top = sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        record["scenarios"][name] = {
+            "wall_ms_median": round(statistics.median(walls) * 1000, 1),
+            "import_ms_median": round(statistics.median(imports) / 1000, 1),
+            "failed": failed,
+            "top_imports_ms": {module: round(us / 1000, 1) for module, us in top},
+        }
+
+        result = record["scenarios"][name]
+        print(f"{name}: wall {result['wall_ms_median']} ms, imports {result['import_ms_median']} ms"
+              f"{' (non-zero exit)' if failed else ''}")
+        for module, ms in result["top_imports_ms"].items():
+            print(f"    {ms:>8} ms  {module}")
+
+    history = Path(args.history)
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with history.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Appended results to {history}")
+
+
+if __name__ == "__main__":
+    main()
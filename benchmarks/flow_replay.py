@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# benchmarks/flow_replay.py
+"""End-to-end latency benchmark of the analysis flow against local provider stand-ins.
+
+Starts the replay server (benchmarks/replay) in place of OpenAI, Serper and
+Alpha Vantage, then runs complete analyses with no network access:
+
+- flow: MarketSentimentFlow.kickoff_async()
+- stream: consuming MarketSentimentFlow.stream_analysis(), as the API does
+- cli: cli.run_analysis() on files, as cron does
+
+Each scenario reports median and max wall time, mean per-stage latency and
+provider requests per run. One extra run per scenario under tracemalloc
+reports peak and retained Python allocations. Tool caches and shared results
+are cleared before every run unless --warm is given, and stage memoization is
+off. Results are appended to a JSON-lines history. With --max-regression, the
+run fails when a scenario's median is slower than the last comparable record
+by more than that fraction.
+
+    python benchmarks/flow_replay.py [--runs 3] [--llm-latency 0.2] [--holdings 24] [--max-regression 0.25]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from replay.server import ReplayConfig, ReplayServer  # noqa: E402
+
+EXAMPLES = ROOT / "examples"
+SCENARIOS = ("flow", "stream", "cli")
+SECTORS = ("Technology", "Healthcare", "Financials", "Energy", "Industrials", "Consumer Discretionary")
+
+
+def configure_environment(server: ReplayServer, cache_dir: str, stream_partials: bool):
+    """Route every provider to the replay server and lift limits that would skew timings"""
+    os.environ.update(server.env())
+    os.environ.update({
+        "MARKETPULSE_CACHE_DIR": cache_dir,
+        "MARKETPULSE_STAGE_MEMO": "0",
+        "MARKETPULSE_STREAM_PARTIALS": "1" if stream_partials else "0",
+        "SERPER_PER_MINUTE": "1000000",
+        "SERPER_PER_DAY": "100000000",
+        "ALPHA_VANTAGE_PER_MINUTE": "1000000",
+        "ALPHA_VANTAGE_PER_DAY": "100000000",
+        "OTEL_SDK_DISABLED": "true",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+    })
+
+
+def load_inputs(holdings: int):
+    with open(EXAMPLES / "portfolio.json") as f:
+        portfolio = json.load(f)
+    with open(EXAMPLES / "preferences.json") as f:
+        preferences = json.load(f)
+    if holdings:
+        portfolio = {"holdings": [
+            {"ticker": f"T{i:03d}", "company": f"Company {i}", "sector": SECTORS[i % len(SECTORS)],
+             "allocation": round(100 / holdings, 2), "shares": 10, "purchase_price": 100.0}
+            for i in range(holdings)
+        ]}
+    return portfolio, preferences
+
+
+def reset_caches():
+    from marketpulse.tools.cache import CACHES
+    from marketpulse.utils.shared_results import shared_stage_store
+
+    shared_stage_store.clear()
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def stage_totals():
+    from marketpulse.utils.metrics import STAGE_LATENCY
+
+    totals = {}
+    for (stage, _outcome), (seconds, count) in STAGE_LATENCY.totals().items():
+        previous = totals.get(stage, (0.0, 0))
+        totals[stage] = (previous[0] + seconds, previous[1] + count)
+    return totals
+
+
+async def run_flow(portfolio, preferences, workdir):
+    from marketpulse.flows.market_analysis_flow import MarketSentimentFlow
+
+    await MarketSentimentFlow(portfolio, preferences).kickoff_async()
+
+
+async def run_stream(portfolio, preferences, workdir):
+    from marketpulse.flows.market_analysis_flow import MarketSentimentFlow
+
+    async for _event in MarketSentimentFlow(portfolio, preferences).stream_analysis():
+        pass
+
+
+async def run_cli(portfolio, preferences, workdir):
+    from marketpulse.cli import run_analysis
+
+    portfolio_file = os.path.join(workdir, "portfolio.json")
+    preferences_file = os.path.join(workdir, "preferences.json")
+    with open(portfolio_file, "w") as f:
+        json.dump(portfolio, f)
+    with open(preferences_file, "w") as f:
+        json.dump(preferences, f)
+    await run_analysis(portfolio_file, preferences_file, os.path.join(workdir, "analysis.json"))
+
+
+RUNNERS = {"flow": run_flow, "stream": run_stream, "cli": run_cli}
+
+
+def run_once(name, portfolio, preferences, workdir, warm):
+    from marketpulse.tools.http_client import http_client
+
+    if not warm:
+        reset_caches()
+
+    async def run():
+        try:
+            await RUNNERS[name](portfolio, preferences, workdir)
+        finally:
+            await http_client.close()
+
+    # Agents are verbose; keep their output out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        asyncio.run(run())
+        return time.perf_counter() - started
+
+
+def measure(name, args, server, portfolio, preferences, workdir):
+    before_stages, before_requests = stage_totals(), dict(server.requests)
+    walls = [run_once(name, portfolio, preferences, workdir, args.warm) for _ in range(args.runs)]
+    after_stages = stage_totals()
+
+    stages = {}
+    for stage, (seconds, count) in after_stages.items():
+        seconds -= before_stages.get(stage, (0.0, 0))[0]
+        count -= before_stages.get(stage, (0.0, 0))[1]
+        if count:
+            stages[stage] = round(seconds / count * 1000, 1)
+    requests = {
+        provider: round((server.requests[provider] - before_requests[provider]) / args.runs, 1)
+        for provider in server.requests
+    }
+
+    tracemalloc.start()
+    run_once(name, portfolio, preferences, workdir, args.warm)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms_median": round(statistics.median(walls) * 1000, 1),
+        "wall_ms_max": round(max(walls) * 1000, 1),
+        "stage_ms_mean": stages,
+        "requests_per_run": requests,
+        "alloc_peak_mb": round(peak / 1024 / 1024, 2),
+        "alloc_retained_mb": round(retained / 1024 / 1024, 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def find_baseline(history: Path, settings):
+    """The most recent record run with the same settings"""
+    if not history.exists():
+        return None
+    baseline = None
+    with history.open() as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("settings") == settings:
+                baseline = record
+    return baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end flow benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per scenario")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Limit to these scenarios")
+    parser.add_argument("--holdings", type=int, default=0, help="Use a synthetic portfolio of this size instead of the example")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--quote-latency", type=float, default=0.05)
+    parser.add_argument("--items", type=int, default=4, help="Entries per list in templated outputs")
+    parser.add_argument("--cassette", help="Replay recorded responses from this JSON-lines file")
+    parser.add_argument("--stream-partials", action="store_true", help="Stream LLM output with partial events on")
+    parser.add_argument("--warm", action="store_true", help="Keep caches between runs to measure the warm path")
+    parser.add_argument("--max-regression", type=float, help="Fail when a median is this fraction slower than the baseline")
+    parser.add_argument("--history", default=str(ROOT / "benchmarks" / "results" / "flow_replay.jsonl"))
+    args = parser.parse_args()
+
+    settings = {
+        "holdings": args.holdings,
+        "llm_latency": args.llm_latency,
+        "llm_seconds_per_token": args.llm_seconds_per_token,
+        "search_latency": args.search_latency,
+        "quote_latency": args.quote_latency,
+        "items": args.items,
+        "cassette": bool(args.cassette),
+        "stream_partials": args.stream_partials,
+        "warm": args.warm,
+    }
+    config = ReplayConfig(
+        llm_latency=args.llm_latency,
+        llm_seconds_per_token=args.llm_seconds_per_token,
+        search_latency=args.search_latency,
+        quote_latency=args.quote_latency,
+        items=args.items,
+        cassette=args.cassette
+    )
+    history = Path(args.history)
+    baseline = find_baseline(history, settings)
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "settings": settings,
+        "scenarios": {},
+    }
+
+    regressions = []
+    with ReplayServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        configure_environment(server, os.path.join(workdir, "cache"), args.stream_partials)
+        portfolio, preferences = load_inputs(args.holdings)
+        for name in args.scenario or SCENARIOS:
+            result = measure(name, args, server, portfolio, preferences, workdir)
+            record["scenarios"][name] = result
+            print(f"{name}: median {result['wall_ms_median']} ms, max {result['wall_ms_max']} ms, "
+                  f"peak alloc {result['alloc_peak_mb']} MB, requests {result['requests_per_run']}")
+            for stage, ms in result["stage_ms_mean"].items():
+                print(f"    {ms:>9} ms  {stage}")
+
+            previous = (baseline or {}).get("scenarios", {}).get(name)
+            if previous and args.max_regression is not None:
+                limit = previous["wall_ms_median"] * (1 + args.max_regression)
+                if result["wall_ms_median"] > limit:
+                    regressions.append(f"{name}: {result['wall_ms_median']} ms vs baseline "
+                                       f"{previous['wall_ms_median']} ms ({baseline['revision']})")
+        record["replay"] = server.stats()
+
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with history.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Appended results to {history}")
+
+    if regressions:
+        print("Latency regressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# benchmarks/json_extract.py
+"""Benchmark agent-output JSON extraction against the previous multi-pass parser.
+
+The corpus is every *.txt file in benchmarks/corpus/ (capture real outputs by
+running analyses with MARKETPULSE_CAPTURE_DIR=benchmarks/corpus) plus large
+synthetic outputs in the shapes tasks.yaml asks for, wrapped the ways agents
+actually wrap them: code fences, prose, trailing commas and escaped documents.
+
+    python benchmarks/json_extract.py [--repeat 200]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from marketpulse.clean_json import extract_json  # noqa: E402
+from marketpulse.utils.metrics import JSON_PARSE  # noqa: E402
+
+CORPUS_DIR = ROOT / "benchmarks" / "corpus"
+
+
+def legacy_parse(text: str):
+    """The flow's parser before the single-pass extractor, kept for comparison"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            start_idx = text.find('{')
+            end_idx = text.rfind('}')
+            if start_idx >= 0 and end_idx > start_idx:
+                json_str = re.sub(r'\\+"', '"', text[start_idx:end_idx + 1])
+                return json.loads(json_str)
+            return None
+        except Exception:
+            try:
+                json_str = text[text.find('{'):text.rfind('}') + 1]
+                json_str = re.sub(r',(\s*])', r'\1', json_str)
+                json_str = re.sub(r',(\s*})', r'\1', json_str)
+                return json.loads(json_str)
+            except Exception:
+                return None
+
+
+def _portfolio_news(rng: random.Random, holdings: int) -> dict:
+    sentiments = ["positive", "negative", "neutral"]
+    return {
+        "company_news": [
+            {
+                "ticker": f"T{i:03d}",
+                "company": f"Company {i} Holdings Inc.",
+                "news_items": [
+                    {
+                        "headline": f"Company {i} reports {'record' if j % 2 else 'mixed'} quarter; guidance {{revised}} after \"strong\" demand",
+                        "source": rng.choice(["Reuters", "Bloomberg", "CNBC", "WSJ"]),
+                        "date": f"2025-04-{j + 1:02d}",
+                        "sentiment": rng.choice(sentiments),
+                    }
+                    for j in range(6)
+                ],
+                "overall_sentiment": rng.choice(sentiments),
+            }
+            for i in range(holdings)
+        ],
+        "sector_news": [
+            {
+                "sector": sector,
+                "developments": [
+                    {"development": f"{sector} development {k}: margins, rates and supply chains", "impact": "Moderate impact on holdings"}
+                    for k in range(4)
+                ],
+            }
+            for sector in ["Technology", "Energy", "Healthcare", "Financials", "Consumer Staples"]
+        ],
+    }
+
+
+def synthetic_corpus(holdings: int = 40, seed: int = 7):
+    rng = random.Random(seed)
+    data = _portfolio_news(rng, holdings)
+    pretty = json.dumps(data, indent=2)
+    compact = json.dumps(data)
+    trailing = re.sub(r'(\]|\}|")(\n\s*[\]}])', r'\1,\2', pretty)
+    return {
+        "clean": pretty,
+        "code_fence": f"```json\n{pretty}\n```",
+        "prose": f"Here is the analysis {{as requested}}:\n\n{pretty}\n\nLet me know if you need more detail.",
+        "trailing_commas": f"```json\n{trailing}\n```",
+        "escaped": compact.replace('\\', '\\\\').replace('"', '\\"'),
+    }
+
+
+def load_corpus(include_synthetic: bool):
+    corpus = {}
+    if CORPUS_DIR.is_dir():
+        for path in sorted(CORPUS_DIR.glob("*.txt")):
+            corpus[f"captured/{path.stem}"] = path.read_text()
+    if include_synthetic:
+        corpus.update({f"synthetic/{name}": text for name, text in synthetic_corpus().items()})
+    return corpus
+
+
+def _bench(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            fn(text)
+        except ValueError:
+            pass
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON extraction benchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--no-synthetic", action="store_true", help="Only use captured outputs")
+    args = parser.parse_args()
+
+    corpus = load_corpus(not args.no_synthetic)
+    if not corpus:
+        print(f"No corpus found in {CORPUS_DIR}")
+        return
+
+    print(f"{'sample':<32} {'KiB':>7} {'legacy us':>10} {'new us':>10}  legacy ok  repairs")
+    for name, text in corpus.items():
+        legacy_ok = legacy_parse(text) is not None
+        try:
+            _, repairs = extract_json(text)
+            repairs = ",".join(repairs) or "direct"
+        except ValueError:
+            repairs = "FAILED"
+        legacy_us = _bench(legacy_parse, text, args.repeat)
+        new_us = _bench(extract_json, text, args.repeat)
+        print(f"{name:<32} {len(text) / 1024:>7.1f} {legacy_us:>10.1f} {new_us:>10.1f}  {str(legacy_ok):<9}  {repairs}")
+
+    print("\nRepair paths fired (all runs):")
+    for (path,), count in sorted(JSON_PARSE._values.items()):
+        print(f"  {path:<16} {int(count)}")
+
+
+if __name__ == "__main__":
+    main()
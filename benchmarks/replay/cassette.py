@@ -0,0 +1,57 @@
+# benchmarks/replay/cassette.py
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+class Cassette:
+    """Recorded provider responses keyed by a hash of the request, stored as JSON lines.
+
+    Each line is {"provider", "key", "response"}. Requests are keyed on their
+    content only (messages for the LLM, query for Serper, symbol for Alpha
+    Vantage), never on API keys, so recordings are safe to commit.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["response"]
+
+    @staticmethod
+    def key(provider: str, request: Any) -> str:
+        # Hashed here rather than with stage_memo.input_hash: importing marketpulse's
+        # utils would read the cache settings before the harness has set them
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{provider}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    def get(self, provider: str, request: Any) -> Optional[Any]:
+        with self._lock:
+            response = self._entries.get(self.key(provider, request))
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def record(self, provider: str, request: Any, response: Any):
+        key = self.key(provider, request)
+        with self._lock:
+            self._entries[key] = response
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps({"provider": provider, "key": key, "response": response}) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,190 @@
+# benchmarks/replay/fixtures.py
+
+import random
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# A phrase from each task description in tasks.yaml that identifies the stage a prompt is for
+STAGE_MARKERS = (
+    ("recommendations", "Generate specific trading recommendations"),
+    ("sentiment_analysis", "Synthesize all collected information"),
+    ("portfolio_news", "analyze recent company-specific news"),
+    ("influencer_data", "market-moving individuals and institutions"),
+    ("global_news", "global financial news"),
+)
+
+TICKER_PATTERN = re.compile(r'"ticker"\s*:\s*"([A-Za-z.\-]{1,10})"')
+SENTIMENTS = ("positive", "negative", "neutral")
+OUTLOOKS = ("bullish", "bearish", "neutral")
+LEVELS = ("high", "medium", "low")
+
+
+def detect_stage(prompt: str) -> Optional[str]:
+    for stage, marker in STAGE_MARKERS:
+        if marker in prompt:
+            return stage
+    return None
+
+
+def prompt_tickers(prompt: str) -> List[str]:
+    """Tickers of the holdings in a task prompt, in order of appearance"""
+    tickers = []
+    for ticker in TICKER_PATTERN.findall(prompt):
+        if ticker.upper() not in tickers and ticker.upper() != "SYMBOL":
+            tickers.append(ticker.upper())
+    return tickers
+
+
+def _text(rng: random.Random, subject: str, words: int = 12) -> str:
+    vocabulary = ("guidance", "demand", "margins", "rates", "outlook", "earnings", "supply", "revenue",
+                  "inflation", "growth", "pricing", "momentum", "capex", "buybacks", "regulation")
+    return f"{subject}: " + " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def stage_output(stage: str, prompt: str, items: int = 4, seed: int = 0) -> Dict[str, Any]:
+    """A templated result in the shape tasks.yaml asks for, deterministic for a seed and prompt"""
+    rng = random.Random(f"{seed}:{stage}:{len(prompt)}")
+    tickers = prompt_tickers(prompt) or ["SPY"]
+    sectors = ["Technology", "Healthcare", "Financials", "Energy"][:max(1, min(4, items))]
+    today = date.today().isoformat()
+
+    if stage == "global_news":
+        return {
+            "major_events": [{"event": _text(rng, f"Event {i}"), "potential_impact": _text(rng, "Impact")} for i in range(items)],
+            "economic_data": [
+                {"indicator": f"Indicator {i}", "actual": f"{rng.uniform(0, 5):.1f}%",
+                 "expected": f"{rng.uniform(0, 5):.1f}%", "impact": _text(rng, "Impact", 6)}
+                for i in range(items)
+            ],
+            "central_bank_actions": [{"bank": "Federal Reserve", "action": "Held rates", "market_reaction": _text(rng, "Reaction", 6)}],
+            "geopolitical_developments": [
+                {"development": _text(rng, f"Development {i}"), "affected_markets": ["US", "Europe"], "potential_impact": _text(rng, "Impact", 6)}
+                for i in range(items)
+            ],
+            "market_trends": [{"trend": _text(rng, f"Trend {i}", 8), "affected_sectors": sectors} for i in range(items)],
+        }
+    if stage == "portfolio_news":
+        return {
+            "company_news": [
+                {
+                    "ticker": ticker,
+                    "company": f"{ticker} Inc.",
+                    "news_items": [
+                        {"headline": _text(rng, ticker, 10), "source": "Replay Wire", "date": today, "sentiment": rng.choice(SENTIMENTS)}
+                        for _ in range(items)
+                    ],
+                    "overall_sentiment": rng.choice(SENTIMENTS),
+                }
+                for ticker in tickers
+            ],
+            "sector_news": [
+                {"sector": sector, "developments": [{"development": _text(rng, sector), "impact": _text(rng, "Impact", 6)}]}
+                for sector in sectors
+            ],
+        }
+    if stage == "influencer_data":
+        people = ("Jerome Powell", "Janet Yellen", "Elon Musk", "Warren Buffett", "Jamie Dimon")
+        return {
+            "influencer_statements": [
+                {"person": person, "position": "Role", "statement": _text(rng, "Statement", 16), "date": today,
+                 "market_relevance": _text(rng, "Relevance", 8), "affected_sectors": sectors}
+                for person in people[:max(1, items)]
+            ],
+            "regulatory_announcements": [
+                {"regulator": "SEC", "announcement": _text(rng, "Announcement"), "affected_industries": sectors,
+                 "potential_impact": _text(rng, "Impact", 6)}
+            ],
+        }
+    if stage == "sentiment_analysis":
+        return {
+            "overall_market_sentiment": rng.choice(OUTLOOKS),
+            "sentiment_rationale": _text(rng, "Rationale", 30),
+            "sector_sentiment": [{"sector": s, "sentiment": rng.choice(OUTLOOKS), "rationale": _text(rng, "Rationale")} for s in sectors],
+            "regional_sentiment": [{"region": r, "sentiment": rng.choice(OUTLOOKS), "rationale": _text(rng, "Rationale")} for r in ("US", "Europe")],
+            "potential_opportunities": [{"opportunity": _text(rng, f"Opportunity {i}"), "confidence": rng.choice(LEVELS)} for i in range(items)],
+            "potential_risks": [
+                {"risk": _text(rng, f"Risk {i}"), "likelihood": rng.choice(LEVELS), "potential_impact": rng.choice(LEVELS)}
+                for i in range(items)
+            ],
+        }
+    if stage == "recommendations":
+        return {
+            "trading_recommendations": [
+                {"action": rng.choice(("buy", "sell", "hold")), "ticker": ticker, "company": f"{ticker} Inc.",
+                 "confidence": rng.choice(LEVELS), "position_size": f"{rng.randint(1, 15)}%",
+                 "rationale": _text(rng, "Rationale", 20), "risk_assessment": rng.choice(LEVELS)}
+                for ticker in tickers
+            ],
+            "portfolio_adjustments": [{"adjustment": _text(rng, "Adjustment"), "rationale": _text(rng, "Rationale")}],
+            "hedging_strategies": [{"strategy": _text(rng, "Strategy"), "implementation": _text(rng, "Implementation")}],
+            "summary": _text(rng, "Summary", 30),
+        }
+    return {}
+
+
+def tool_input(tool: str, prompt: str) -> Dict[str, str]:
+    """Arguments for the one tool call a templated agent makes before answering"""
+    tickers = prompt_tickers(prompt)
+    if tool == "stock_quote":
+        return {"symbol": tickers[0] if tickers else "SPY"}
+    if tool == "influencer_monitor":
+        return {"person": "Jerome Powell"}
+    return {"query": f"{tickers[0]} latest news" if tickers else "stock market today"}
+
+
+def search_results(query: str, count: int = 5) -> Dict[str, Any]:
+    """A Serper-shaped response for a query"""
+    rng = random.Random(query)
+    return {
+        "searchParameters": {"q": query, "type": "search"},
+        "organic": [
+            {"title": _text(rng, f"Result {i}", 8), "link": f"https://news.example.com/{i}",
+             "snippet": _text(rng, "Snippet", 24), "date": "1 hour ago", "position": i + 1}
+            for i in range(count)
+        ],
+    }
+
+
+def global_quote(symbol: str) -> Dict[str, Any]:
+    """An Alpha Vantage GLOBAL_QUOTE response for a symbol"""
+    rng = random.Random(symbol)
+    price = rng.uniform(20, 600)
+    change = rng.uniform(-0.04, 0.04) * price
+    return {
+        "Global Quote": {
+            "01. symbol": symbol,
+            "05. price": f"{price:.4f}",
+            "06. volume": str(rng.randint(100_000, 50_000_000)),
+            "07. latest trading day": date.today().isoformat(),
+            "09. change": f"{change:.4f}",
+            "10. change percent": f"{change / (price - change) * 100:.4f}%",
+        }
+    }
+
+
+def daily_series(symbol: str, sessions: int = 100) -> Dict[str, Any]:
+    """An Alpha Vantage TIME_SERIES_DAILY response: a random walk that shares a common market factor"""
+    rng = random.Random(symbol)
+    market = random.Random("market")
+    beta = rng.uniform(0.5, 1.6)
+    price = rng.uniform(20, 600)
+    days = []
+    day = date.today()
+    while len(days) < sessions:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            days.append(day)
+    series = {}
+    for day in reversed(days):
+        change = beta * market.gauss(0.0004, 0.01) + rng.gauss(0, 0.012)
+        close = price * (1 + change)
+        series[day.isoformat()] = {
+            "1. open": f"{price:.4f}",
+            "2. high": f"{max(price, close) * 1.005:.4f}",
+            "3. low": f"{min(price, close) * 0.995:.4f}",
+            "4. close": f"{close:.4f}",
+            "5. volume": str(rng.randint(100_000, 50_000_000)),
+        }
+        price = close
+    return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
@@ -0,0 +1,304 @@
+# benchmarks/replay/server.py
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from aiohttp import ClientSession, web
+
+from .cassette import Cassette
+from .fixtures import daily_series, detect_stage, global_quote, search_results, stage_output, tool_input
+
+TOOL_NAME = re.compile(r"Tool Name: (\S+)")
+# Text of crewai's own format instructions, which mention observations before any tool ran
+FORMAT_INSTRUCTIONS = "Observation: the result of the action"
+
+UPSTREAMS = {
+    "llm": "https://api.openai.com/v1",
+    "serper": "https://google.serper.dev",
+    "alphavantage": "https://www.alphavantage.co",
+}
+
+
+class ReplayConfig:
+    """Latency and content settings for the stand-in providers.
+
+    Latencies are in seconds with +/- `jitter` relative variation. The LLM also
+    spends `llm_seconds_per_token` per generated token, spread over the chunks
+    of a streamed response. With `tool_calls`, agents that have tools make one
+    tool call before answering, so runs exercise the search and quote servers.
+    Requests found in the cassette are answered from it; with `record`, misses
+    are forwarded to the real provider and recorded, otherwise templated.
+    """
+
+    def __init__(
+        self,
+        llm_latency: float = 0.4,
+        llm_seconds_per_token: float = 0.0,
+        search_latency: float = 0.05,
+        quote_latency: float = 0.05,
+        jitter: float = 0.2,
+        items: int = 4,
+        tool_calls: bool = True,
+        seed: int = 0,
+        cassette: Optional[str] = None,
+        record: bool = False
+    ):
+        self.llm_latency = llm_latency
+        self.llm_seconds_per_token = llm_seconds_per_token
+        self.search_latency = search_latency
+        self.quote_latency = quote_latency
+        self.jitter = jitter
+        self.items = items
+        self.tool_calls = tool_calls
+        self.seed = seed
+        self.cassette = cassette
+        self.record = record
+
+
+class ReplayServer:
+    """Local HTTP stand-ins for OpenAI chat completions, Serper and Alpha Vantage.
+
+    Runs on its own event loop in a background thread, so both the async and
+    the synchronous tool paths can reach it. Point the app at it with env():
+
+        with ReplayServer(ReplayConfig(llm_latency=0.2)) as server:
+            os.environ.update(server.env())
+            ...  # import and run marketpulse
+
+    The base URLs are read when marketpulse modules are imported, so set the
+    environment before importing them.
+    """
+
+    def __init__(self, config: ReplayConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or ReplayConfig()
+        self.host = host
+        self.port = port
+        self.cassette = Cassette(self.config.cassette)
+        self.requests = {"llm": 0, "serper": 0, "alphavantage": 0}
+        self._rng = random.Random(self.config.seed)
+        # Real credentials are only needed, and only used, for recording
+        self._upstream_keys = {
+            "llm": os.getenv("OPENAI_API_KEY", ""),
+            "serper": os.getenv("SERPER_API_KEY", ""),
+            "alphavantage": os.getenv("ALPHA_VANTAGE_API_KEY", ""),
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[ClientSession] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that route marketpulse's providers to this server"""
+        env = {
+            "MARKETPULSE_LLM_BASE_URL": f"{self.base_url}/v1",
+            "SERPER_BASE_URL": f"{self.base_url}/serper",
+            "ALPHA_VANTAGE_BASE_URL": f"{self.base_url}/alphavantage",
+        }
+        if not self.config.record:
+            env.update({"OPENAI_API_KEY": "replay", "SERPER_API_KEY": "replay", "ALPHA_VANTAGE_API_KEY": "replay"})
+        return env
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "cassette_hits": self.cassette.hits,
+            "cassette_misses": self.cassette.misses,
+        }
+
+    def _app(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self._chat)
+        app.router.add_post("/serper/{kind}", self._serper)
+        app.router.add_get("/alphavantage/query", self._alphavantage)
+        return app
+
+    async def _sleep(self, seconds: float):
+        if seconds > 0:
+            await asyncio.sleep(seconds * (1 + self._rng.uniform(-self.config.jitter, self.config.jitter)))
+
+    async def _upstream(self, provider: str, method: str, path: str, **kwargs) -> Any:
+        if self._session is None:
+            self._session = ClientSession()
+        async with self._session.request(method, UPSTREAMS[provider] + path, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _lookup(self, provider: str, request: Any, fetch) -> Optional[Any]:
+        """Cassette response for a request, recording a live one on a miss when recording"""
+        response = self.cassette.get(provider, request)
+        if response is None and self.config.record:
+            response = await fetch()
+            self.cassette.record(provider, request, response)
+        return response
+
+    def _template_reply(self, messages) -> str:
+        """A crewai-style agent turn: one tool call if the agent has tools and none ran yet, else a final answer"""
+        contents = [str(m.get("content") or "") for m in messages]
+        prompt = "\n".join(contents)
+        # Agent roles and goals echo the task phrases, so recognize the stage from the task alone
+        task = next((c.split("Current Task:", 1)[1] for c in contents if "Current Task:" in c), prompt)
+        tools = TOOL_NAME.findall(prompt)
+        observed = any(
+            "Observation:" in str(m.get("content") or "") and FORMAT_INSTRUCTIONS not in str(m.get("content") or "")
+            for m in messages if m.get("role") != "system"
+        )
+        if tools and not observed and self.config.tool_calls:
+            return (
+                "Thought: I should gather current information first\n"
+                f"Action: {tools[0]}\nAction Input: {json.dumps(tool_input(tools[0], task))}"
+            )
+        stage = detect_stage(task)
+        data = stage_output(stage, task, self.config.items, self.config.seed) if stage else {"answer": "ok"}
+        return f"Thought: I now can give a great answer\nFinal Answer: {json.dumps(data, indent=2)}"
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        self.requests["llm"] += 1
+        body = await request.json()
+        messages = body.get("messages", [])
+
+        async def fetch():
+            upstream = {**body, "stream": False}
+            upstream.pop("stream_options", None)
+            completion = await self._upstream(
+                "llm", "POST", "/chat/completions", json=upstream,
+                headers={"Authorization": f"Bearer {self._upstream_keys['llm']}"}
+            )
+            return completion["choices"][0]["message"]["content"]
+
+        await self._sleep(self.config.llm_latency)
+        content = await self._lookup("llm", {"model": body.get("model"), "messages": messages}, fetch)
+        if content is None:
+            content = self._template_reply(messages)
+
+        model = body.get("model", "replay")
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content") or "")) for m in messages) // 4,
+            "completion_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-replay-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        generation = usage["completion_tokens"] * self.config.llm_seconds_per_token
+
+        if not body.get("stream"):
+            await self._sleep(generation)
+            return web.json_response({
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)] or [""]
+        for piece in pieces:
+            await self._sleep(generation / len(pieces))
+            await response.write(self._chunk(completion_id, created, model, {"content": piece}))
+        final = json.loads(self._chunk(completion_id, created, model, {}, "stop")[len("data: "):])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            final["usage"] = usage
+        await response.write(f"data: {json.dumps(final)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    @staticmethod
+    def _chunk(completion_id: str, created: int, model: str, delta: Dict[str, Any], finish_reason: str = None) -> bytes:
+        chunk = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n".encode()
+
+    async def _serper(self, request: web.Request) -> web.Response:
+        self.requests["serper"] += 1
+        kind = request.match_info["kind"]
+        body = await request.json()
+
+        async def fetch():
+            return await self._upstream(
+                "serper", "POST", f"/{kind}", json=body,
+                headers={"X-API-KEY": self._upstream_keys["serper"], "Content-Type": "application/json"}
+            )
+
+        await self._sleep(self.config.search_latency)
+        results = await self._lookup("serper", {"kind": kind, **body}, fetch)
+        return web.json_response(results if results is not None else search_results(body.get("q", ""), body.get("num") or 5))
+
+    async def _alphavantage(self, request: web.Request) -> web.Response:
+        self.requests["alphavantage"] += 1
+        params = {key: value for key, value in request.query.items() if key != "apikey"}
+
+        async def fetch():
+            return await self._upstream(
+                "alphavantage", "GET", "/query", params={**params, "apikey": self._upstream_keys["alphavantage"]}
+            )
+
+        await self._sleep(self.config.quote_latency)
+        data = await self._lookup("alphavantage", params, fetch)
+        if data is None:
+            symbol = params.get("symbol", "").upper()
+            data = daily_series(symbol) if params.get("function") == "TIME_SERIES_DAILY" else global_quote(symbol)
+        return web.json_response(data)
+
+    async def _start(self):
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def _stop(self):
+        if self._session is not None:
+            await self._session.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def start(self) -> "ReplayServer":
+        ready = threading.Event()
+        failure = []
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._start())
+            except Exception as e:
+                failure.append(e)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="replay-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        logging.info(f"Replay server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
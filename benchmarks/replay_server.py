@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# benchmarks/replay_server.py
+"""Serve the replay stand-ins in the foreground, e.g. to run the API server offline:
+
+    python benchmarks/replay_server.py --llm-latency 0.5
+    # then start the app with the printed environment
+"""
+
+import argparse
+import time
+
+from replay.server import ReplayConfig, ReplayServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for OpenAI, Serper and Alpha Vantage")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="Seconds per LLM call before the first token")
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.0, help="Generation time per completion token")
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--quote-latency", type=float, default=0.05)
+    parser.add_argument("--items", type=int, default=4, help="Entries per list in templated task outputs")
+    parser.add_argument("--no-tool-calls", action="store_true", help="Answer immediately instead of calling one tool first")
+    parser.add_argument("--cassette", help="JSON-lines file of recorded responses to replay")
+    parser.add_argument("--record", action="store_true", help="Forward cassette misses to the real providers and record them")
+    args = parser.parse_args()
+
+    config = ReplayConfig(
+        llm_latency=args.llm_latency,
+        llm_seconds_per_token=args.llm_seconds_per_token,
+        search_latency=args.search_latency,
+        quote_latency=args.quote_latency,
+        items=args.items,
+        tool_calls=not args.no_tool_calls,
+        cassette=args.cassette,
+        record=args.record
+    )
+    with ReplayServer(config, port=args.port) as server:
+        for name, value in server.env().items():
+            print(f"export {name}={value}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(server.stats())
+
+
+if __name__ == "__main__":
+    main()
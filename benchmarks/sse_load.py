@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# benchmarks/sse_load.py
+"""Concurrent SSE load test for /api/sentiment/analyze and /api/sentiment/demo.
+
+By default the app is started as a single uvicorn worker with every provider
+routed to the replay server (benchmarks/replay), so the crews run against
+stand-ins with fixed latency and no network. Pass --url to load an already
+running deployment instead.
+
+For each concurrency level, N clients open streams at once. Meanwhile /health
+is polled to sample its latency and the app's event-loop lag. Per level the
+report gives:
+
+- accepted and rejected (503) streams, and failures
+- time to first event, gaps between events, and total stream time (p50/p95/max)
+- /health latency and event-loop lag (p50/p95/max)
+
+Results are appended to a JSON-lines history for comparison across revisions.
+
+    python benchmarks/sse_load.py --concurrency 1 4 8 16 [--endpoint analyze] [--llm-latency 0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from replay.server import ReplayConfig, ReplayServer  # noqa: E402
+
+EXAMPLES = ROOT / "examples"
+
+
+def percentiles(values):
+    """p50, p95 and max in milliseconds, or None when there are no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] * 1000, 1)
+
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(ordered[-1] * 1000, 1)}
+
+
+async def open_stream(session, url, body):
+    """One client: returns timing of a full SSE stream"""
+    started = time.perf_counter()
+    result = {"status": None, "events": 0, "first_event": None, "gaps": [], "total": None, "error": None}
+    try:
+        kwargs = {"json": body} if body is not None else {}
+        async with session.request("POST" if body is not None else "GET", url, **kwargs) as response:
+            result["status"] = response.status
+            if response.status != 200:
+                await response.read()
+                return result
+            last = None
+            async for line in response.content:
+                if not line.startswith(b"data:"):
+                    continue
+                now = time.perf_counter()
+                if last is None:
+                    result["first_event"] = now - started
+                else:
+                    result["gaps"].append(now - last)
+                last = now
+                result["events"] += 1
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        result["error"] = str(e) or type(e).__name__
+    result["total"] = time.perf_counter() - started
+    return result
+
+
+async def poll_health(session, base_url, stop, interval):
+    """Sample /health latency and the app's reported event-loop lag until `stop` is set"""
+    latencies, lags = [], []
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                health = await response.json()
+            latencies.append(time.perf_counter() - started)
+            lag = (health.get("event_loop") or {}).get("lag_ms_last")
+            if lag is not None:
+                lags.append(lag / 1000)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+    return latencies, lags
+
+
+async def run_level(base_url, endpoint, body, concurrency, health_interval, timeout):
+    url = f"{base_url}/api/sentiment/{endpoint}"
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(timeout=client_timeout, connector=connector) as session:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(poll_health(session, base_url, stop, health_interval))
+        started = time.perf_counter()
+        results = await asyncio.gather(*(open_stream(session, url, body) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        stop.set()
+        health_latencies, lags = await prober
+
+    accepted = [r for r in results if r["status"] == 200 and r["error"] is None]
+    return {
+        "concurrency": concurrency,
+        "wall_ms": round(wall * 1000, 1),
+        "accepted": len(accepted),
+        "rejected": sum(1 for r in results if r["status"] == 503),
+        "failed": sum(1 for r in results if r["error"] is not None or r["status"] not in (200, 503)),
+        "events_per_stream": round(sum(r["events"] for r in accepted) / len(accepted), 1) if accepted else 0,
+        "first_event_ms": percentiles([r["first_event"] for r in accepted if r["first_event"] is not None]),
+        "event_gap_ms": percentiles([gap for r in accepted for gap in r["gaps"]]),
+        "stream_ms": percentiles([r["total"] for r in accepted]),
+        "health_ms": percentiles(health_latencies),
+        "loop_lag_ms": percentiles(lags),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(env, port, startup_timeout):
+    """Run the app as one uvicorn worker and wait until /health answers"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "marketpulse.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+    async def wait_ready():
+        deadline = time.monotonic() + startup_timeout
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"App exited during startup: {proc.stderr.read().decode()[-2000:]}")
+                try:
+                    async with session.get(f"http://127.0.0.1:{port}/health") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.25)
+        raise RuntimeError(f"App did not become healthy within {startup_timeout}s")
+
+    try:
+        asyncio.run(wait_ready())
+    except Exception:
+        proc.terminate()
+        raise
+    return proc
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def print_level(level):
+    def fmt(stats):
+        return "-" if stats is None else f"{stats['p50']}/{stats['p95']}/{stats['max']}"
+
+    print(f"N={level['concurrency']}: {level['accepted']} ok, {level['rejected']} rejected, {level['failed']} failed, "
+          f"wall {level['wall_ms']} ms")
+    print(f"    first event {fmt(level['first_event_ms'])}  gap {fmt(level['event_gap_ms'])}  "
+          f"stream {fmt(level['stream_ms'])}  (p50/p95/max ms)")
+    print(f"    /health {fmt(level['health_ms'])}  loop lag {fmt(level['loop_lag_ms'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent SSE load test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrent streams per level")
+    parser.add_argument("--endpoint", choices=("demo", "analyze"), default="demo")
+    parser.add_argument("--url", help="Load this running app instead of starting one against the replay server")
+    parser.add_argument("--max-analyses", type=int, help="MARKETPULSE_MAX_ANALYSES for the started app")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--quote-latency", type=float, default=0.05)
+    parser.add_argument("--warm", action="store_true", help="Keep the app's caches between levels (default: memo off)")
+    parser.add_argument("--health-interval", type=float, default=0.25, help="Seconds between /health probes")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-stream timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--history", default=str(ROOT / "benchmarks" / "results" / "sse_load.jsonl"))
+    args = parser.parse_args()
+
+    body = None
+    if args.endpoint == "analyze":
+        with open(EXAMPLES / "portfolio.json") as f, open(EXAMPLES / "preferences.json") as g:
+            body = {"portfolio": json.load(f), "preferences": json.load(g)}
+
+    settings = {
+        "endpoint": args.endpoint,
+        "target": "external" if args.url else "replay",
+        "max_analyses": args.max_analyses,
+        "llm_latency": args.llm_latency,
+        "llm_seconds_per_token": args.llm_seconds_per_token,
+        "search_latency": args.search_latency,
+        "quote_latency": args.quote_latency,
+        "warm": args.warm,
+    }
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "settings": settings,
+        "levels": [],
+    }
+
+    def run_levels(base_url):
+        for concurrency in args.concurrency:
+            level = asyncio.run(run_level(base_url, args.endpoint, body, concurrency, args.health_interval, args.timeout))
+            record["levels"].append(level)
+            print_level(level)
+
+    if args.url:
+        run_levels(args.url.rstrip("/"))
+    else:
+        config = ReplayConfig(
+            llm_latency=args.llm_latency,
+            llm_seconds_per_token=args.llm_seconds_per_token,
+            search_latency=args.search_latency,
+            quote_latency=args.quote_latency
+        )
+        with ReplayServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+            env = {
+                **os.environ,
+                **server.env(),
+                "PYTHONPATH": str(ROOT / "src"),
+                "MARKETPULSE_CACHE_DIR": os.path.join(workdir, "cache"),
+                "MARKETPULSE_STAGE_MEMO": "1" if args.warm else "0",
+                "SERPER_PER_MINUTE": "1000000",
+                "SERPER_PER_DAY": "100000000",
+                "ALPHA_VANTAGE_PER_MINUTE": "1000000",
+                "ALPHA_VANTAGE_PER_DAY": "100000000",
+                "OTEL_SDK_DISABLED": "true",
+                "CREWAI_DISABLE_TELEMETRY": "true",
+            }
+            if args.max_analyses:
+                env["MARKETPULSE_MAX_ANALYSES"] = str(args.max_analyses)
+            port = free_port()
+            app = start_app(env, port, args.startup_timeout)
+            try:
+                run_levels(f"http://127.0.0.1:{port}")
+            finally:
+                app.terminate()
+                app.wait(timeout=30)
+            record["replay"] = server.stats()
+
+    history = Path(args.history)
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with history.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Appended results to {history}")
+
+
+if __name__ == "__main__":
+    main()
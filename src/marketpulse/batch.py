@@ -0,0 +1,159 @@
+# src/marketpulse/batch.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from .crew_pool import CrewPool, crew_pool
+from .flows.market_analysis_flow import MarketSentimentFlow
+from .utils.crew_executor import crew_executor
+from .utils.stage_memo import holding_slice
+
+BATCH_CONCURRENCY = int(os.getenv("MARKETPULSE_BATCH_CONCURRENCY", "4"))
+
+# Stages computed once for the whole batch
+SHARED_STAGES = ("global_news", "influencer_data")
+
+
+def batch_slots(portfolios: int) -> int:
+    """Analysis slots a batch reserves: one per crew set it runs at once, within the admission limit"""
+    return max(1, min(BATCH_CONCURRENCY, portfolios, crew_executor.max_analyses))
+
+
+def unique_holdings(portfolios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Holdings across all portfolios, one per ticker (first occurrence wins), in order of appearance"""
+    holdings = {}
+    for portfolio in portfolios:
+        for holding in portfolio.get("holdings", []):
+            ticker = holding_slice(holding)["ticker"]
+            if ticker and ticker not in holdings:
+                holdings[ticker] = {**holding_slice(holding), "ticker": ticker}
+    return list(holdings.values())
+
+
+def _line(event: Dict[str, Any]) -> str:
+    return json.dumps(event) + "\n"
+
+
+class BatchAnalysis:
+    """Analyze many portfolios, doing shared and per-ticker work once for the whole batch.
+
+    Global news and influencer monitoring run once. Portfolio news and quotes run
+    once over the union of holdings, so cost grows with unique tickers. Only the
+    personalized stages (sentiment and recommendations) run per portfolio, from
+    seeded shared results. Results stream as NDJSON lines in completion order.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], pool: CrewPool = None, concurrency: int = None):
+        self.items = items
+        self.pool = pool or crew_pool
+        self.concurrency = max(1, concurrency or batch_slots(len(items)))
+
+    async def _prepare_shared(self, holdings: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Run the shared stages and portfolio news for the union of holdings"""
+        crews = await self.pool.acquire()
+        try:
+            # The flow prefetches quotes for every unique ticker in one pooled batch
+            flow = MarketSentimentFlow({"holdings": holdings}, {}, crews=crews)
+            global_news, influencer_data, portfolio_news = await asyncio.gather(
+                flow.collect_global_news(),
+                flow.monitor_key_influencers(),
+                flow.analyze_portfolio_news()
+            )
+        finally:
+            self.pool.release(crews)
+
+        if not (global_news and influencer_data and portfolio_news):
+            return None
+        return {
+            "stages": {"global_news": global_news, "influencer_data": influencer_data},
+            "news": {
+                "company_news": {
+                    holding_slice(entry)["ticker"]: entry
+                    for entry in portfolio_news.get("company_news", []) if isinstance(entry, dict)
+                },
+                "sector_news": {
+                    entry.get("sector"): entry
+                    for entry in portfolio_news.get("sector_news", []) if isinstance(entry, dict)
+                },
+            },
+        }
+
+    async def _analyze_one(self, index: int, item: Dict[str, Any], shared: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the personalized stages for one portfolio"""
+        crews = await self.pool.acquire()
+        results: Dict[str, Any] = {}
+        errors = []
+        try:
+            flow = MarketSentimentFlow(
+                item["portfolio"],
+                item["preferences"],
+                crews=crews,
+                seeded_stages=shared["stages"],
+                seeded_news=shared["news"]
+            )
+            async for event in flow.stream_analysis():
+                event_data = json.loads(event[len("data: "):])
+                if event_data["type"] == "task_complete" and event_data["task"] not in SHARED_STAGES:
+                    results[event_data["task"]] = event_data.get("data")
+                elif event_data["type"] == "error":
+                    errors.append(event_data.get("message"))
+        finally:
+            self.pool.release(crews)
+
+        record = {"index": index, "id": item.get("id")}
+        if errors or "recommendations" not in results:
+            return {"type": "portfolio_error", **record, "message": "; ".join(errors) or "Analysis incomplete", "data": results}
+        return {"type": "portfolio_complete", **record, "data": results}
+
+    async def stream(self) -> AsyncGenerator[str, None]:
+        """Run the batch, yielding one NDJSON line per event"""
+        started = time.perf_counter()
+        holdings = unique_holdings([item["portfolio"] for item in self.items])
+        total_holdings = sum(len(item["portfolio"].get("holdings", [])) for item in self.items)
+        yield _line({
+            "type": "status",
+            "message": f"Analyzing {len(self.items)} portfolios with {len(holdings)} unique tickers",
+            "portfolios": len(self.items),
+            "unique_tickers": len(holdings),
+            "total_holdings": total_holdings,
+        })
+
+        shared = await self._prepare_shared(holdings)
+        if shared is None:
+            yield _line({"type": "error", "message": "Shared market analysis failed; batch aborted"})
+            return
+        yield _line({"type": "shared_complete", "data": shared["stages"]})
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self._analyze_one(index, item, shared)
+                except Exception as e:
+                    logging.error(f"Batch portfolio {index} failed: {str(e)}")
+                    return {"type": "portfolio_error", "index": index, "id": item.get("id"), "message": str(e)}
+
+        tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(self.items)]
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                succeeded += record["type"] == "portfolio_complete"
+                yield _line(record)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield _line({
+            "type": "complete",
+            "portfolios": len(self.items),
+            "succeeded": succeeded,
+            "failed": len(self.items) - succeeded,
+            "unique_tickers": len(holdings),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
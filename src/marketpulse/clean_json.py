@@ -1,39 +1,117 @@
-# src/howdoyoufindme/clean_json.py
+# src/marketpulse/clean_json.py
 
 import json
+import logging
 import re
+from typing import Any, Dict, Tuple
+
+from .utils.metrics import JSON_PARSE
+
+# strict=False accepts raw newlines and tabs inside strings, which LLMs emit often
+_DECODER = json.JSONDecoder(strict=False)
+
+# A cheap check for any trailing comma, then a string-aware scan: strings are
+# matched whole, so only commas outside them (group 1) are dropped
+_TRAILING_COMMA_HINT = re.compile(r',\s*[}\]]')
+_TRAILING_COMMAS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|(,)\s*[}\]]')
+_ESCAPED_QUOTES = re.compile(r'\\+"')
+
+# How many '{' positions to try when prose before the JSON contains braces
+MAX_START_CANDIDATES = 3
+
+
+def _unescape_document(text: str) -> str:
+    """Undo one level of escaping for a document emitted as {\\"key\\": ...}"""
+    body = text[:text.rfind('}') + 1]
+    try:
+        return _DECODER.decode('"' + body + '"')
+    except json.JSONDecodeError:
+        return _ESCAPED_QUOTES.sub('"', body)
+
+
+def _drop_trailing_commas(text: str) -> str:
+    if not _TRAILING_COMMA_HINT.search(text):
+        return text
+    chunks = []
+    last = 0
+    for match in _TRAILING_COMMAS.finditer(text):
+        if match.start(1) != -1:
+            chunks.append(text[last:match.start(1)])
+            last = match.end(1)
+    chunks.append(text[last:])
+    return "".join(chunks)
+
+
+def _parse_from(text: str, start: int) -> Tuple[Any, str, Tuple[str, ...]]:
+    """Parse the object starting at `start`; returns (data, text after it, repairs)"""
+    try:
+        data, end = _DECODER.raw_decode(text, start)
+        return data, text[end:], ()
+    except json.JSONDecodeError:
+        pass
+
+    repairs = []
+    text = text[start:]
+    if text[1:64].lstrip().startswith('\\"'):
+        text = _unescape_document(text)
+        repairs.append("escaped_quotes")
+
+    fixed = _drop_trailing_commas(text)
+    if len(fixed) != len(text):
+        repairs.append("trailing_comma")
+    # raw_decode stops at the end of the object, so prose after it is never parsed
+    data, end = _DECODER.raw_decode(fixed)
+    return data, fixed[end:], tuple(repairs)
+
+
+def extract_json(response: str) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+    """Parse the JSON object in an agent response, tolerating common LLM formatting slips.
+
+    Handles code fences and prose around the object, trailing commas, a fully
+    escaped document and raw control characters in strings. The clean case is a
+    single C-level decode and each repair adds at most one pass over the text.
+    Returns the parsed object and the repairs that were needed, and counts them
+    in the JSON parse metric.
+    """
+    if not isinstance(response, str):
+        JSON_PARSE.inc(path="failed")
+        raise ValueError("Agent response is not a string")
+
+    start = response.find('{')
+    error = "No JSON object braces found in response."
+    for _ in range(MAX_START_CANDIDATES):
+        if start == -1:
+            break
+        try:
+            data, trailing, repairs = _parse_from(response, start)
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError; try the next brace in case prose contained one
+            error = str(e)
+            start = response.find('{', start + 1)
+            continue
+
+        leading = response[:start].strip()
+        trailing = trailing.strip()
+        if leading.startswith("```"):
+            repairs = ("code_fence",) + repairs
+        elif leading or (trailing and trailing != "```"):
+            repairs = ("prose",) + repairs
+        for repair in repairs or ("direct",):
+            JSON_PARSE.inc(path=repair)
+        return data, repairs
+
+    JSON_PARSE.inc(path="failed")
+    raise ValueError(f"Failed to parse JSON: {error}")
 
 
 def extract_json_string(response: str) -> str:
     """
     Attempts to extract just the JSON part from a string.
-    Finds the first '{' and the matching last '}' and returns the substring.
-    Also handles potential formatting issues.
+    Returns the cleaned JSON text, re-serialized from the tolerant parse.
     """
-    # Find JSON structure beginning and end
-    start_idx = response.find('{')
-    end_idx = response.rfind('}')
-    
-    if start_idx == -1 or end_idx == -1:
-        raise ValueError("No JSON object braces found in response.")
-    
-    json_str = response[start_idx:end_idx + 1]
-    
-    # Clean up common formatting issues
-    # Remove trailing commas in arrays
-    json_str = re.sub(r',(\s*])', r'\1', json_str)
-    # Remove trailing commas in objects
-    json_str = re.sub(r',(\s*})', r'\1', json_str)
-    
-    try:
-        # Verify it's valid JSON but return the string
-        json.loads(json_str)
-        return json_str
-    except json.JSONDecodeError as e:
-        problem_char = e.pos
-        context = json_str[max(0, problem_char - 50):min(len(json_str), problem_char + 50)]
-        print(f"JSON parse error near: ...{context}...")
-        raise ValueError(f"Failed to parse JSON after cleaning: {str(e)}. Error location: {context}")
+    data, _ = extract_json(response)
+    return json.dumps(data)
+
 
 def clean_and_parse_json(response: str) -> dict:
     """
@@ -41,13 +119,8 @@ def clean_and_parse_json(response: str) -> dict:
     Handles common formatting issues and returns a parsed JSON object.
     """
     try:
-        # First try direct parsing
-        return json.loads(response)
-    except json.JSONDecodeError:
-        try:
-            # Try to extract and clean JSON, then parse it
-            cleaned_str = extract_json_string(response)
-            return json.loads(cleaned_str)  # Parse the cleaned string into a dict
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Full response that failed to parse: {response}")
-            raise ValueError(f"Failed to parse JSON after cleaning: {str(e)}. Content: {response[:100]}...")
\ No newline at end of file
+        data, _ = extract_json(response)
+        return data
+    except ValueError as e:
+        logging.debug(f"Unparseable agent response: {str(response)[:500]}")
+        raise ValueError(f"Failed to parse JSON after cleaning: {str(e)}. Content: {str(response)[:100]}...")
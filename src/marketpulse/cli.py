@@ -1,49 +1,82 @@
 #!/usr/bin/env python
 import sys
 import json
-import yaml
 import warnings
-import asyncio
 from datetime import datetime
 import argparse
-from typing import Dict, Any
+from typing import Dict, Any, List
 import os
 
-from .flows.market_analysis_flow import MarketSentimentFlow
+# The agent stack (crewai, langchain, OpenTelemetry) takes seconds to import, so it is
+# only loaded inside run_analysis; argument and file validation must stay cheap.
 
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
-def load_portfolio(filename: str) -> Dict[str, Any]:
-    """Load portfolio data from a JSON or YAML file"""
+REQUIRED_PREFERENCES = ("risk_tolerance", "investment_horizon")
+
+def _load_data_file(filename: str, label: str) -> Dict[str, Any]:
+    """Load a JSON or YAML file, exiting with a message when it is missing or unreadable"""
     if not os.path.exists(filename):
-        print(f"Error: Portfolio file {filename} not found.")
+        print(f"Error: {label} file {filename} not found.")
         sys.exit(1)
-        
-    if filename.endswith('.json'):
-        with open(filename, 'r') as f:
-            return json.load(f)
-    elif filename.endswith(('.yaml', '.yml')):
-        with open(filename, 'r') as f:
-            return yaml.safe_load(f)
-    else:
-        print("Error: Portfolio file must be .json, .yaml, or .yml")
+
+    try:
+        if filename.endswith('.json'):
+            with open(filename, 'r') as f:
+                return json.load(f)
+        elif filename.endswith(('.yaml', '.yml')):
+            import yaml
+            with open(filename, 'r') as f:
+                return yaml.safe_load(f)
+    except Exception as e:
+        print(f"Error: Could not parse {label.lower()} file {filename}: {str(e)}")
         sys.exit(1)
 
+    print(f"Error: {label} file must be .json, .yaml, or .yml")
+    sys.exit(1)
+
+def load_portfolio(filename: str) -> Dict[str, Any]:
+    """Load portfolio data from a JSON or YAML file"""
+    return _load_data_file(filename, "Portfolio")
+
 def load_preferences(filename: str) -> Dict[str, Any]:
     """Load preferences data from a JSON or YAML file"""
-    if not os.path.exists(filename):
-        print(f"Error: Preferences file {filename} not found.")
-        sys.exit(1)
-        
-    if filename.endswith('.json'):
-        with open(filename, 'r') as f:
-            return json.load(f)
-    elif filename.endswith(('.yaml', '.yml')):
-        with open(filename, 'r') as f:
-            return yaml.safe_load(f)
-    else:
-        print("Error: Preferences file must be .json, .yaml, or .yml")
-        sys.exit(1)
+    return _load_data_file(filename, "Preferences")
+
+def validate_portfolio(portfolio: Any) -> List[str]:
+    """Check a portfolio has the shape the API's Portfolio model expects"""
+    if not isinstance(portfolio, dict):
+        return ["portfolio must be a mapping with a 'holdings' list"]
+    holdings = portfolio.get("holdings")
+    if not isinstance(holdings, list) or not holdings:
+        return ["portfolio.holdings must be a non-empty list"]
+
+    errors = []
+    for i, holding in enumerate(holdings):
+        if not isinstance(holding, dict):
+            errors.append(f"holdings[{i}] must be a mapping")
+        elif not str(holding.get("ticker") or "").strip():
+            errors.append(f"holdings[{i}] is missing a ticker")
+    return errors
+
+def validate_preferences(preferences: Any) -> List[str]:
+    """Check preferences carry the fields the API's Preferences model requires"""
+    if not isinstance(preferences, dict):
+        return ["preferences must be a mapping"]
+
+    errors = [f"preferences.{key} is required" for key in REQUIRED_PREFERENCES if not preferences.get(key)]
+    for key in ("preferred_sectors", "preferred_regions"):
+        if key in preferences and not isinstance(preferences[key], list):
+            errors.append(f"preferences.{key} must be a list")
+    return errors
+
+def validate_inputs(portfolio_file: str, preferences_file: str) -> bool:
+    """Load and validate both input files, printing any problems"""
+    errors = validate_portfolio(load_portfolio(portfolio_file))
+    errors += validate_preferences(load_preferences(preferences_file))
+    for error in errors:
+        print(f"Error: {error}")
+    return not errors
 
 def save_output(data: Dict[str, Any], filename: str = None):
     """Save analysis output to a file"""
@@ -62,8 +95,16 @@ async def run_analysis(portfolio_file: str, preferences_file: str, output_file:
     print("Loading portfolio and preferences...")
     portfolio = load_portfolio(portfolio_file)
     preferences = load_preferences(preferences_file)
-    
+    errors = validate_portfolio(portfolio) + validate_preferences(preferences)
+    if errors:
+        for error in errors:
+            print(f"Error: {error}")
+        sys.exit(1)
+
     print("Starting market sentiment analysis...")
+    from .flows.market_analysis_flow import MarketSentimentFlow
+    from .tools.http_client import http_client
+
     flow = MarketSentimentFlow(portfolio, preferences)
     results = {}
     
@@ -94,6 +135,8 @@ async def run_analysis(portfolio_file: str, preferences_file: str, output_file:
                     
             except json.JSONDecodeError:
                 print(f"Warning: Could not parse event: {event_str[:50]}...")
+
+    await http_client.close()
     
     # Save the results
     if results and output_file:
@@ -119,15 +162,72 @@ async def run_analysis(portfolio_file: str, preferences_file: str, output_file:
     
     return results
 
+async def run_warm(portfolio_files: List[str], now: bool, dry_run: bool):
+    """Precompute shared stages, quotes and portfolio news for the next market open"""
+    from .tools.http_client import http_client
+    from .warmer import known_portfolios, warmer
+
+    portfolios = known_portfolios(portfolio_files or None)
+    as_of = None
+    if now:
+        from .utils.shared_results import MARKET_TZ
+        as_of = datetime.now(MARKET_TZ)
+
+    if dry_run:
+        plan = warmer.plan(portfolios, as_of)
+        print(f"Window {plan['window']}: {len(plan['holdings'])} tickers from {plan['portfolios']} portfolios")
+        if plan["skipped"]:
+            print(f"Over budget, skipped: {', '.join(plan['skipped'])}")
+        return plan
+
+    try:
+        summary = await warmer.run(portfolios, as_of)
+    finally:
+        await http_client.close()
+    print(json.dumps(summary, indent=2))
+    return summary
+
+def warm_main(argv: List[str]):
+    """`warm` subcommand: pre-market cache warmer"""
+    parser = argparse.ArgumentParser(prog="marketpulse warm", description="Pre-market cache warmer")
+    parser.add_argument(
+        "--portfolios",
+        action="append",
+        help="JSON or YAML file with a portfolio, a list of portfolios or {portfolios: [...]} (repeatable); "
+             "defaults to MARKETPULSE_WARM_PORTFOLIOS. Recently submitted job portfolios are always included"
+    )
+    parser.add_argument("--now", action="store_true", help="Warm the current market window instead of the next open")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be warmed within the quota budget")
+    args = parser.parse_args(argv)
+
+    import asyncio
+    asyncio.run(run_warm(args.portfolios, args.now, args.dry_run))
+
 def main():
     """Command line interface for market sentiment analysis"""
+    if len(sys.argv) > 1 and sys.argv[1] == "warm":
+        warm_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Market Sentiment Analysis CLI")
     parser.add_argument("--portfolio", "-p", required=True, help="Path to portfolio JSON or YAML file")
     parser.add_argument("--preferences", "-pref", required=True, help="Path to preferences JSON or YAML file")
     parser.add_argument("--output", "-o", help="Output file path (optional)")
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Check the portfolio and preferences files and exit without running an analysis"
+    )
     
     args = parser.parse_args()
+
+    if args.validate_only:
+        if not validate_inputs(args.portfolio, args.preferences):
+            sys.exit(1)
+        print("Portfolio and preferences are valid.")
+        return
     
+    import asyncio
     asyncio.run(run_analysis(args.portfolio, args.preferences, args.output))
 
 if __name__ == "__main__":
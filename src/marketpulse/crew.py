@@ -1,7 +1,10 @@
-from crewai import Agent, Crew, Process, Task
+from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from .tools.market_tool import FinancialNewsSearchTool, StockQuoteTool, InfluencerMonitorTool
+from .utils.llm_cache import CachedLLM
+from .utils.llm_stream import STREAM_PARTIALS
 from dotenv import load_dotenv
+import os
 
 @CrewBase
 class MarketSentimentCrew:
@@ -13,21 +16,53 @@ class MarketSentimentCrew:
         self.stock_tool = StockQuoteTool()
         self.influencer_tool = InfluencerMonitorTool()
 
+    def _llm(self, agent_name: str, temperature: float) -> LLM:
+        """The agent's model from agents.yaml at the given temperature, streaming when partial results are on.
+
+        Agents with `llm_cache: true` get a CachedLLM that reuses completions for identical prompts.
+        """
+        llm_class = CachedLLM if self.agents_config[agent_name].get("llm_cache") else LLM
+        return llm_class(
+            model=self.agents_config[agent_name].get("llm", "gpt-4o-mini"),
+            temperature=temperature,
+            stream=STREAM_PARTIALS,
+            # An OpenAI-compatible endpoint, e.g. the replay server used by the benchmarks
+            base_url=os.getenv("MARKETPULSE_LLM_BASE_URL") or None
+        )
+
     @agent
     def global_news_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['global_news_agent'],
             tools=[self.news_tool],
-            llm_config={"temperature": 0.3, "model": "gpt-4o-mini"},
+            llm=self._llm('global_news_agent', 0.3),
             verbose=True
         )
 
     @agent
     def portfolio_news_agent(self) -> Agent:
+        return self._build_portfolio_news_agent()
+
+    def _build_portfolio_news_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['portfolio_news_agent'],
             tools=[self.news_tool, self.stock_tool],
-            llm_config={"temperature": 0.3, "model": "gpt-4o-mini"},
+            llm=self._llm('portfolio_news_agent', 0.3),
+            verbose=True
+        )
+
+    def portfolio_news_shard_crew(self) -> Crew:
+        """A standalone portfolio news crew for one shard of holdings.
+
+        Shards run concurrently and tasks keep their output, so each running shard
+        needs its own agent, task and crew rather than the memoized ones. CrewSet
+        keeps the ones it builds for reuse.
+        """
+        shard_agent = self._build_portfolio_news_agent()
+        return Crew(
+            agents=[shard_agent],
+            tasks=[Task(config=self.tasks_config['analyze_portfolio_news_task'], agent=shard_agent)],
+            process=Process.sequential,
             verbose=True
         )
 
@@ -36,7 +71,7 @@ class MarketSentimentCrew:
         return Agent(
             config=self.agents_config['influencer_monitor_agent'],
             tools=[self.influencer_tool],
-            llm_config={"temperature": 0.3, "model": "gpt-4o-mini"},
+            llm=self._llm('influencer_monitor_agent', 0.3),
             verbose=True
         )
 
@@ -44,7 +79,7 @@ class MarketSentimentCrew:
     def sentiment_analysis_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['sentiment_analysis_agent'],
-            llm_config={"temperature": 0.0, "model": "gpt-4o-mini"},
+            llm=self._llm('sentiment_analysis_agent', 0.0),
             verbose=True
         )
 
@@ -53,7 +88,7 @@ class MarketSentimentCrew:
         return Agent(
             config=self.agents_config['portfolio_strategy_agent'],
             tools=[self.stock_tool],
-            llm_config={"temperature": 0.7, "model": "gpt-4o-mini"},
+            llm=self._llm('portfolio_strategy_agent', 0.7),
             verbose=True
         )
 
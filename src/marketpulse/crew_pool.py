@@ -0,0 +1,177 @@
+# src/marketpulse/crew_pool.py
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Process
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+
+from .crew import MarketSentimentCrew
+from .utils.crew_executor import crew_executor
+
+
+class CrewSet:
+    """The single-task crews used by one analysis, built from one MarketSentimentCrew.
+
+    Tasks keep their last output (the sentiment task reads upstream outputs through
+    task context), so a crew set must only serve one analysis at a time and is
+    reset before it is reused.
+    """
+
+    def __init__(self, crew_instance: MarketSentimentCrew = None):
+        self.crew_instance = crew_instance or MarketSentimentCrew()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # Portfolio news crews for shards of large portfolios, built on first use and kept with the set
+        self._shard_crews: List[Crew] = []
+        self._free_shard_crews: List[Crew] = []
+
+        self.global_news_crew = Crew(
+            agents=[self.crew_instance.global_news_agent()],
+            tasks=[self.crew_instance.collect_global_news_task()],
+            process=Process.sequential,
+            verbose=True
+        )
+
+        self.portfolio_news_crew = Crew(
+            agents=[self.crew_instance.portfolio_news_agent()],
+            tasks=[self.crew_instance.analyze_portfolio_news_task()],
+            process=Process.sequential,
+            verbose=True
+        )
+
+        self.influencer_crew = Crew(
+            agents=[self.crew_instance.influencer_monitor_agent()],
+            tasks=[self.crew_instance.monitor_key_influencers_task()],
+            process=Process.sequential,
+            verbose=True
+        )
+
+        self.sentiment_crew = Crew(
+            agents=[self.crew_instance.sentiment_analysis_agent()],
+            tasks=[self.crew_instance.analyze_market_sentiment_task()],
+            process=Process.sequential,
+            verbose=True
+        )
+
+        self.recommendation_crew = Crew(
+            agents=[self.crew_instance.portfolio_strategy_agent()],
+            tasks=[self.crew_instance.generate_recommendations_task()],
+            process=Process.sequential,
+            verbose=True
+        )
+
+    @property
+    def crews(self) -> List[Crew]:
+        return [
+            self.global_news_crew,
+            self.portfolio_news_crew,
+            self.influencer_crew,
+            self.sentiment_crew,
+            self.recommendation_crew,
+        ]
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight > 0
+
+    def kickoff(self, crew: Crew, inputs: Dict[str, Any] = None):
+        """Run one of this set's crews, tracking it so an abandoned set is not reused mid-run"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return crew.kickoff(inputs=inputs or {})
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def shard_crew(self) -> Crew:
+        """A free portfolio news crew for one shard, built in the default executor when none is free"""
+        with self._lock:
+            if self._free_shard_crews:
+                return self._free_shard_crews.pop()
+        crew = await asyncio.get_running_loop().run_in_executor(None, self.crew_instance.portfolio_news_shard_crew)
+        with self._lock:
+            self._shard_crews.append(crew)
+        return crew
+
+    def release_shard_crew(self, crew: Crew):
+        _reset_crew(crew)
+        with self._lock:
+            self._free_shard_crews.append(crew)
+
+    def reset(self):
+        """Clear per-analysis state so the next analysis starts clean"""
+        for crew in self.crews:
+            _reset_crew(crew)
+        with self._lock:
+            for crew in self._shard_crews:
+                _reset_crew(crew)
+            self._free_shard_crews = list(self._shard_crews)
+
+
+def _reset_crew(crew: Crew):
+    crew.usage_metrics = None
+    for agent in crew.agents:
+        # Agents accumulate token usage across kickoffs
+        agent._token_process = TokenProcess()
+    for task in crew.tasks:
+        task.output = None
+        task.used_tools = 0
+        task.tools_errors = 0
+        task.delegations = 0
+
+
+class CrewPool:
+    """Crew sets built once at startup and handed out to one analysis at a time.
+
+    When every pooled set is in use a new one is built on demand, in the default
+    executor since building agents and tools takes seconds; sets returned beyond
+    the pool size are dropped.
+    """
+
+    def __init__(self, size: int = None):
+        # One set per admitted analysis, so a warmed pool never has to build on demand
+        self.size = size or crew_executor.max_analyses
+        self._available: List[CrewSet] = []
+        self._lock = threading.Lock()
+        self.startup_seconds: Optional[float] = None
+        self.overflow_builds = 0
+
+    def warm(self) -> float:
+        """Build the pooled crew sets; returns the time it took in seconds"""
+        started = time.perf_counter()
+        built = [CrewSet() for _ in range(self.size)]
+        with self._lock:
+            self._available.extend(built)
+        self.startup_seconds = time.perf_counter() - started
+        logging.info(f"Crew pool ready: {self.size} crew sets in {self.startup_seconds:.2f}s")
+        return self.startup_seconds
+
+    async def acquire(self) -> CrewSet:
+        with self._lock:
+            if self._available:
+                return self._available.pop()
+            self.overflow_builds += 1
+        logging.info("Crew pool exhausted, building an extra crew set")
+        return await asyncio.get_running_loop().run_in_executor(None, CrewSet)
+
+    def release(self, crew_set: CrewSet):
+        # A cancelled analysis can leave a kickoff running in the executor; drop that set
+        if crew_set.busy:
+            logging.info("Discarding crew set with a kickoff still running")
+            return
+        crew_set.reset()
+        with self._lock:
+            if len(self._available) < self.size:
+                self._available.append(crew_set)
+
+    @property
+    def available(self) -> int:
+        return len(self._available)
+
+
+crew_pool = CrewPool()
@@ -1,95 +1,140 @@
 # src/market_sentiment/flows/sentiment_analysis_flow.py
 
-from crewai.flow.flow import Flow, listen, start, FlowState
-from crewai import Agent, Crew, Process
+from crewai.flow.flow import Flow, listen, start, and_, FlowState
+from crewai import Crew
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, AsyncGenerator, List
+from typing import Dict, Any, Optional, AsyncGenerator, Callable, List, Tuple
 import json
 import asyncio
+import functools
 import logging
-import re
+import os
+import time
+from datetime import datetime
 from ..clean_json import clean_and_parse_json
-from ..crew import MarketSentimentCrew
+from ..crew_pool import CrewSet
+from ..utils.crew_executor import crew_executor
+from ..utils.shared_results import market_window, shared_stage_store
+from ..tools.price_history import refresh_price_histories
+from ..tools.quotes import cached_quotes, prefetch_quotes
+from ..utils.metrics import STAGE_INPUT_TOKENS, STAGE_INPUTS_TRIMMED, STAGE_LATENCY, record_token_usage
+from ..utils.payloads import fit_inputs, project_holdings, project_preferences, project_quotes
+from ..utils.portfolio_analytics import portfolio_analytics
+from ..utils.risk import RISK_BENCHMARK, risk_metrics
+from ..utils.stage_memo import holding_slice, merge_portfolio_news, stage_memo
+from ..utils.llm_stream import STREAM_PARTIALS, stream_partials
+from ..utils.portfolio_shards import SHARD_CONCURRENCY, combine_shard_results, shard_holdings
+from ..utils.tracing import Span, activate, current_span, export_to_opentelemetry, trace_span
 
 class MarketSentimentState(FlowState):
     portfolio: Dict[str, Any]
     preferences: Dict[str, Any]
+    quotes: Optional[Dict[str, Any]] = None
+    portfolio_analytics: Optional[Dict[str, Any]] = None
+    risk_metrics: Optional[Dict[str, Any]] = None
     global_news: Optional[Dict[str, Any]] = None
     portfolio_news: Optional[Dict[str, Any]] = None
     influencer_data: Optional[Dict[str, Any]] = None
     sentiment_analysis: Optional[Dict[str, Any]] = None
     recommendations: Optional[Dict[str, Any]] = None
 
+# Stage dependency graph: task name -> (flow method, upstream tasks, status message, error message).
+# Stages whose upstream tasks have all completed are started concurrently.
+STAGE_GRAPH = {
+    "portfolio_analytics": (
+        "compute_portfolio_analytics", (),
+        "Computing portfolio analytics...", "Failed to compute portfolio analytics"
+    ),
+    "global_news": (
+        "collect_global_news", (),
+        "Collecting global financial news...", "Failed to collect global news"
+    ),
+    "portfolio_news": (
+        "analyze_portfolio_news", (),
+        "Analyzing portfolio-specific news...", "Failed to analyze portfolio news"
+    ),
+    "influencer_data": (
+        "monitor_key_influencers", (),
+        "Monitoring key market influencers...", "Failed to monitor key influencers"
+    ),
+    "sentiment_analysis": (
+        "analyze_market_sentiment", ("global_news", "portfolio_news", "influencer_data"),
+        "Analyzing market sentiment...", "Failed to analyze market sentiment"
+    ),
+    "recommendations": (
+        "generate_recommendations", ("sentiment_analysis",),
+        "Generating trading recommendations...", "Failed to generate recommendations"
+    ),
+}
+
+def timed_stage(stage: str):
+    """Run a stage method inside a trace span and record its duration in the stage latency histogram"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            trace = getattr(self, "_trace", None)
+            span = trace.child(stage, kind="stage") if trace else Span(stage, kind="stage")
+            self._stage_spans[stage] = span
+            started = time.perf_counter()
+            result = None
+            try:
+                with activate(span):
+                    result = await method(self, *args, **kwargs)
+                return result
+            finally:
+                STAGE_LATENCY.observe(
+                    time.perf_counter() - started, stage=stage, outcome="ok" if result else "error"
+                )
+        return wrapper
+    return decorator
+
 class MarketSentimentFlow(Flow[MarketSentimentState]):
-    def __init__(self, portfolio: Dict[str, Any], preferences: Dict[str, Any]):
+    def __init__(
+        self,
+        portfolio: Dict[str, Any],
+        preferences: Dict[str, Any],
+        crews: Optional[CrewSet] = None,
+        seeded_stages: Dict[str, Dict[str, Any]] = None,
+        seeded_news: Dict[str, Dict[str, Any]] = None,
+        as_of: Optional[datetime] = None
+    ):
         self.initial_state = MarketSentimentState(
             portfolio=portfolio,
             preferences=preferences
         )
         super().__init__()
-        self._initialize_crew()
-
-    def _initialize_crew(self):
-        """Initialize crew instance with separate crews for each task"""
-        self.crew_instance = MarketSentimentCrew()
-        
-        self.global_news_crew = Crew(
-            agents=[self.crew_instance.global_news_agent()],
-            tasks=[self.crew_instance.collect_global_news_task()],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        self.portfolio_news_crew = Crew(
-            agents=[self.crew_instance.portfolio_news_agent()],
-            tasks=[self.crew_instance.analyze_portfolio_news_task()],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        self.influencer_crew = Crew(
-            agents=[self.crew_instance.influencer_monitor_agent()],
-            tasks=[self.crew_instance.monitor_key_influencers_task()],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        self.sentiment_crew = Crew(
-            agents=[self.crew_instance.sentiment_analysis_agent()],
-            tasks=[self.crew_instance.analyze_market_sentiment_task()],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        self.recommendation_crew = Crew(
-            agents=[self.crew_instance.portfolio_strategy_agent()],
-            tasks=[self.crew_instance.generate_recommendations_task()],
-            process=Process.sequential,
-            verbose=True
-        )
+        # Results computed elsewhere (e.g. once for a whole batch): stage results by
+        # STAGE_GRAPH name, and "company_news" by ticker / "sector_news" by sector
+        self._seeded_stages = seeded_stages or {}
+        self._seeded_news = seeded_news or {}
+        # Memo and shared results are stored for the market window containing as_of
+        # (default now); the pre-market warmer sets it to the upcoming open
+        self._as_of = as_of
+        self._quote_prefetch: Optional[asyncio.Future] = None
+        self._risk_prefetch: Optional[asyncio.Future] = None
+        self._trace: Optional[Span] = None
+        self._stage_spans: Dict[str, Span] = {}
+        # (stage, partial) pairs posted from crew threads while streaming partial results
+        self._partials: Optional[asyncio.Queue] = None
+        self._initialize_crew(crews)
+
+    def _initialize_crew(self, crews: Optional[CrewSet]):
+        """Use the given crew set (e.g. from the app's crew pool) or build a fresh one"""
+        self.crews = crews or CrewSet()
+        self.crew_instance = self.crews.crew_instance
+        self.global_news_crew = self.crews.global_news_crew
+        self.portfolio_news_crew = self.crews.portfolio_news_crew
+        self.influencer_crew = self.crews.influencer_crew
+        self.sentiment_crew = self.crews.sentiment_crew
+        self.recommendation_crew = self.crews.recommendation_crew
 
     def _extract_json_from_response(self, text: str) -> Optional[Dict]:
         """Extract and clean JSON from agent response"""
         try:
-            # First try direct JSON parsing
-            return json.loads(text)
-        except json.JSONDecodeError:
-            try:
-                # Find content between first { and last }
-                start_idx = text.find('{')
-                end_idx = text.rfind('}')
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = text[start_idx:end_idx + 1]
-                    # Remove escaped quotes that might be causing issues
-                    json_str = re.sub(r'\\+"', '"', json_str)
-                    return json.loads(json_str)
-            except Exception:
-                try:
-                    # Last resort: try clean_and_parse_json
-                    return clean_and_parse_json(text)
-                except Exception as e:
-                    logging.error(f"Failed to parse JSON: {str(e)}\nRaw text: {text[:200]}...")
-                    return None
+            return clean_and_parse_json(text)
+        except ValueError as e:
+            logging.error(f"Failed to parse JSON: {str(e)}")
+            return None
 
     def _get_key_influencers(self) -> List[str]:
         """Get list of key influencers to monitor based on market relevance"""
@@ -101,144 +146,499 @@ class MarketSentimentFlow(Flow[MarketSentimentState]):
             "Jamie Dimon"
         ]
 
-    def _format_portfolio_for_task(self) -> str:
-        """Format portfolio data for task input"""
-        portfolio_str = json.dumps(self.state.portfolio)
-        return portfolio_str
-        
-    def _format_preferences_for_task(self) -> str:
-        """Format preferences data for task input"""
-        preferences_str = json.dumps(self.state.preferences)
-        return preferences_str
+    def _portfolio_input(self, stage: str, holdings: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The portfolio projected to the holding fields a stage needs, optionally limited to some holdings"""
+        return project_holdings(self.state.portfolio, stage, holdings)
+
+    async def _fetch_quotes(self) -> Dict[str, Any]:
+        tickers = [h.get("ticker") for h in self.state.portfolio.get("holdings", [])]
+        try:
+            # Low-priority lane with a short wait: agents can still call the quote tool for stragglers
+            quotes = await prefetch_quotes(tickers, max_wait=float(os.getenv("MARKETPULSE_PREFETCH_MAX_WAIT", "10")))
+        except Exception as e:
+            logging.error(f"Error prefetching quotes: {str(e)}")
+            quotes = {}
+        self.state.quotes = quotes
+        return quotes
+
+    async def _prefetched_quotes(self) -> Dict[str, Any]:
+        """Quotes for every holding, fetched in one concurrent batch per flow"""
+        if self._quote_prefetch is None:
+            self._quote_prefetch = asyncio.ensure_future(self._fetch_quotes())
+        return await asyncio.shield(self._quote_prefetch)
+
+    def _portfolio_analytics(self, quotes: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Weights, P&L, concentration and preference drift from `quotes` over whatever quotes are cached"""
+        holdings = self.state.portfolio.get("holdings", [])
+        # Symbols the prefetch could not resolve still get their last cached price
+        quotes = {**cached_quotes(h.get("ticker") for h in holdings), **(quotes or {})}
+        self.state.portfolio_analytics = portfolio_analytics(self.state.portfolio, self.state.preferences, quotes)
+        return self.state.portfolio_analytics
+
+    async def _compute_risk_metrics(self) -> Optional[Dict[str, Any]]:
+        holdings = self.state.portfolio.get("holdings", [])
+        try:
+            await refresh_price_histories(
+                [h.get("ticker") for h in holdings] + [RISK_BENCHMARK],
+                max_wait=float(os.getenv("MARKETPULSE_PREFETCH_MAX_WAIT", "10"))
+            )
+            # Memory-mapped loads and the NumPy pass take milliseconds, but keep file I/O off the event loop
+            metrics = await asyncio.get_running_loop().run_in_executor(None, risk_metrics, holdings)
+        except Exception as e:
+            logging.error(f"Error computing risk metrics: {str(e)}")
+            metrics = None
+        self.state.risk_metrics = metrics
+        return metrics
+
+    async def _prefetched_risk_metrics(self) -> Optional[Dict[str, Any]]:
+        """Risk metrics from stored price history, refreshed and computed once per flow"""
+        if self._risk_prefetch is None:
+            self._risk_prefetch = asyncio.ensure_future(self._compute_risk_metrics())
+        return await asyncio.shield(self._risk_prefetch)
+
+    def _risk_input(self, metrics: Optional[Dict[str, Any]]) -> Any:
+        """Risk metrics for task input"""
+        if not metrics:
+            return "No price history available; assess risk qualitatively."
+        return metrics
+
+    def _quotes_input(self, quotes: Dict[str, Any]) -> Any:
+        """Prefetched quotes for task input"""
+        if not quotes:
+            return "No prefetched quotes available; use the stock_quote tool if needed."
+        return project_quotes(quotes)
+
+    async def _kickoff(self, crew: Crew, inputs: Dict[str, Any] = None):
+        """Run a crew on the bounded crew executor so the event loop stays responsive"""
+        return await crew_executor.run(self.crews.kickoff, crew, inputs)
+
+    async def _run_crew_stage(
+        self,
+        stage: str,
+        crew: Crew,
+        inputs: Dict[str, Any] = None,
+        shard: int = None
+    ) -> Optional[Dict]:
+        """Kick off a single-task crew and parse its JSON output"""
+        if inputs:
+            inputs = self._shape_inputs(stage, crew, inputs)
+        with stream_partials(stage, self._partial_emitter(stage, shard)):
+            result = await self._kickoff(crew, inputs)
+        usage = getattr(result, "token_usage", None)
+        record_token_usage(stage, getattr(crew.agents[0].llm, "model", ""), usage)
+        span = current_span()
+        if span is not None and usage is not None:
+            span.set(
+                llm_calls=usage.successful_requests,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens
+            )
+        if hasattr(result.tasks_output[0], 'raw'):
+            self._capture_raw_output(stage, result.tasks_output[0].raw)
+            return self._extract_json_from_response(result.tasks_output[0].raw)
+        return None
+
+    def _shape_inputs(self, stage: str, crew: Crew, inputs: Dict[str, Any]) -> Dict[str, str]:
+        """Encode task inputs compactly within the stage's token budget and report their size"""
+        encoded, report = fit_inputs(stage, inputs, model=str(getattr(crew.agents[0].llm, "model", "")))
+        STAGE_INPUT_TOKENS.observe(report["tokens"], stage=stage)
+        if report["trimmed"]:
+            STAGE_INPUTS_TRIMMED.inc(stage=stage)
+        span = current_span()
+        if span is not None:
+            span.set(input_tokens=report["tokens"], input_tokens_untrimmed=report["original_tokens"])
+            if report["trimmed"]:
+                span.set(trimmed_inputs=report["trimmed"])
+        return encoded
+
+    def _partial_emitter(self, stage: str, shard: int = None) -> Optional[Callable[[Dict[str, Any]], None]]:
+        """Callback that hands partial results from a crew thread to the event loop"""
+        if self._partials is None:
+            return None
+        loop = asyncio.get_running_loop()
+        partials = self._partials
+
+        def emit(partial: Dict[str, Any]):
+            if shard is not None:
+                # Item indexes restart in every shard
+                partial = {**partial, "shard": shard}
+            loop.call_soon_threadsafe(partials.put_nowait, (stage, partial))
+
+        return emit
+
+    def _drain_partials(self) -> List[str]:
+        """Events for partial results queued so far"""
+        events = []
+        while self._partials is not None and not self._partials.empty():
+            stage, partial = self._partials.get_nowait()
+            events.append(self._format_event("partial", task=stage, data=partial))
+        return events
+
+    def _capture_raw_output(self, stage: str, raw: str):
+        """Save raw agent output to MARKETPULSE_CAPTURE_DIR for the JSON extraction benchmark corpus"""
+        capture_dir = os.getenv("MARKETPULSE_CAPTURE_DIR")
+        if not capture_dir or not raw:
+            return
+        try:
+            os.makedirs(capture_dir, exist_ok=True)
+            with open(os.path.join(capture_dir, f"{stage}-{time.time_ns()}.txt"), "w") as f:
+                f.write(raw)
+        except OSError as e:
+            logging.warning(f"Could not capture {stage} output: {str(e)}")
+
+    def _model_key(self, crew: Crew) -> str:
+        """Describe the model configuration of a crew's agent for cache keys"""
+        llm = crew.agents[0].llm
+        model = getattr(llm, "model", llm)
+        temperature = getattr(llm, "temperature", None)
+        return f"{model}:{temperature}"
+
+    def _stage_crews(self) -> Dict[str, Crew]:
+        return {
+            "global_news": self.global_news_crew,
+            "portfolio_news": self.portfolio_news_crew,
+            "influencer_data": self.influencer_crew,
+            "sentiment_analysis": self.sentiment_crew,
+            "recommendations": self.recommendation_crew,
+        }
+
+    def _apply_seeded_stage(self, stage: str, data: Dict[str, Any]):
+        """Use a result computed outside this flow as the stage's output"""
+        setattr(self.state, stage, data)
+
+    def _memo_key(self, stage: str, crew: Crew, *inputs: Any) -> str:
+        """Stage memo key: the stage's inputs plus the model and prompt templates it runs with"""
+        task = crew.tasks[0]
+        # Kickoff interpolates inputs into the description; hash the templates instead
+        description = getattr(task, "_original_description", None) or task.description
+        expected_output = getattr(task, "_original_expected_output", None) or task.expected_output
+        return stage_memo.key(stage, self._model_key(crew), description, expected_output, *inputs, at=self._as_of)
+
+    def _set_source(self, source: str):
+        span = current_span()
+        if span is not None:
+            span.set(source=source)
+
+    async def _run_memoized_stage(
+        self,
+        stage: str,
+        crew: Crew,
+        memo_inputs: Tuple[Any, ...] = (),
+        inputs: Dict[str, Any] = None
+    ) -> Optional[Dict]:
+        """Reuse the stage's memoized output for identical inputs, otherwise run the crew and memoize it"""
+        key = self._memo_key(stage, crew, *memo_inputs)
+        data = stage_memo.get(key)
+        if data is not None:
+            self._set_source("memo")
+            return data
+        self._set_source("computed")
+        data = await self._run_crew_stage(stage, crew, inputs)
+        stage_memo.put(key, data)
+        return data
+
+    async def _run_shared_stage(self, stage: str, crew: Crew) -> Optional[Dict]:
+        """Run a portfolio-independent stage through the shared result store"""
+        computed = False
+
+        async def compute():
+            nonlocal computed
+            computed = True
+            return await self._run_memoized_stage(stage, crew)
+
+        window = market_window(at=self._as_of) if self._as_of else None
+        data = await shared_stage_store.get_or_compute(stage, self._model_key(crew), compute, window=window)
+        if not computed:
+            self._set_source("shared")
+        return data
+
+    async def _analyze_holdings_news(self, holdings: List[Dict[str, Any]]) -> Optional[Dict]:
+        """Run portfolio news for the holdings, fanned out over bounded shards for large portfolios"""
+        quotes = await self._prefetched_quotes()
+
+        def shard_inputs(shard: List[Dict[str, Any]]) -> Dict[str, Any]:
+            symbols = {holding_slice(h)["ticker"] for h in shard}
+            return {
+                "portfolio": self._portfolio_input("portfolio_news", shard),
+                "quotes": self._quotes_input({s: q for s, q in (quotes or {}).items() if s in symbols})
+            }
+
+        shards = shard_holdings(holdings)
+        if len(shards) <= 1:
+            return await self._run_crew_stage("portfolio_news", self.portfolio_news_crew, shard_inputs(holdings))
+
+        semaphore = asyncio.Semaphore(SHARD_CONCURRENCY)
+
+        async def run_shard(index: int, shard: List[Dict[str, Any]]) -> Optional[Dict]:
+            async with semaphore:
+                with trace_span(f"portfolio_news_shard_{index}", kind="shard", holdings=len(shard)):
+                    crew = await self.crews.shard_crew()
+                    try:
+                        return await self._run_crew_stage("portfolio_news", crew, shard_inputs(shard), shard=index)
+                    finally:
+                        self.crews.release_shard_crew(crew)
+
+        results = await asyncio.gather(*(run_shard(i, shard) for i, shard in enumerate(shards)), return_exceptions=True)
+        for index, result in enumerate(results):
+            if isinstance(result, Exception) or not result:
+                tickers = ", ".join(holding_slice(h)["ticker"] for h in shards[index])
+                logging.error(f"Portfolio news shard {index} ({tickers}) failed: {result}")
+        return combine_shard_results([r for r in results if not isinstance(r, Exception)])
+
+    async def _run_portfolio_news(self) -> Optional[Dict]:
+        """Portfolio news with per-ticker memoization: only holdings without memoized news are analyzed"""
+        crew = self.portfolio_news_crew
+        holdings = self.state.portfolio.get("holdings", [])
+        ticker_keys = {
+            holding_slice(h)["ticker"]: self._memo_key("company_news", crew, holding_slice(h)) for h in holdings
+        }
+        sector_keys = {
+            h["sector"]: self._memo_key("sector_news", crew, h["sector"]) for h in holdings if h.get("sector")
+        }
+
+        seeded_news = self._seeded_news.get("company_news", {})
+        seeded_sectors = self._seeded_news.get("sector_news", {})
+        cached_news = {
+            ticker: entry for ticker, key in ticker_keys.items()
+            if (entry := seeded_news.get(ticker) or stage_memo.get(key)) is not None
+        }
+        cached_sectors = {
+            sector: entry for sector, key in sector_keys.items()
+            if (entry := seeded_sectors.get(sector) or stage_memo.get(key)) is not None
+        }
+        missing = [h for h in holdings if holding_slice(h)["ticker"] not in cached_news]
+
+        fresh = None
+        if missing:
+            self._set_source("computed" if len(missing) == len(holdings) else "incremental")
+            fresh = await self._analyze_holdings_news(missing)
+            if not fresh:
+                return None
+            for entry in fresh.get("company_news", []):
+                key = ticker_keys.get(str(entry.get("ticker", "")).strip().upper()) if isinstance(entry, dict) else None
+                if key:
+                    stage_memo.put(key, entry)
+            for entry in fresh.get("sector_news", []):
+                key = sector_keys.get(entry.get("sector")) if isinstance(entry, dict) else None
+                if key:
+                    stage_memo.put(key, entry)
+        else:
+            self._set_source("memo")
+
+        data = merge_portfolio_news(holdings, cached_news, cached_sectors, fresh)
+        covered = {str(entry.get("ticker", "")).strip().upper() for entry in data["company_news"]}
+        dropped = [ticker for ticker in ticker_keys if ticker not in covered]
+        if dropped:
+            logging.warning(f"Portfolio news has no entry for: {', '.join(dropped)}")
+        span = current_span()
+        if span is not None:
+            span.set(memo_hits=len(cached_news), analyzed=len(missing), dropped=len(dropped))
+        return data
+
+    @start()
+    @timed_stage("portfolio_analytics")
+    async def compute_portfolio_analytics(self):
+        """Compute portfolio weights, P&L and concentration without an LLM, from quotes already cached.
+
+        This is a convenience for clients, so a failure here does not stop the
+        analysis: the stage reports an empty result instead.
+        """
+        try:
+            return self._portfolio_analytics()
+        except Exception as e:
+            logging.error(f"Error in compute_portfolio_analytics: {str(e)}")
+        return {"holdings": [], "unavailable": "Portfolio analytics could not be computed"}
 
     @start()
+    @timed_stage("global_news")
     async def collect_global_news(self):
-        """Start the analysis by collecting global financial news"""
+        """Collect global financial news (shared across requests within a market window)"""
         try:
-            result = self.global_news_crew.kickoff(inputs={})
-            if hasattr(result.tasks_output[0], 'raw'):
-                data = self._extract_json_from_response(result.tasks_output[0].raw)
-                if data:
-                    self.state.global_news = data
-                    return data
+            data = await self._run_shared_stage("global_news", self.global_news_crew)
+            if data:
+                self.state.global_news = data
+                return data
         except Exception as e:
             logging.error(f"Error in collect_global_news: {str(e)}")
         return None
 
-    @listen(collect_global_news)
-    async def analyze_portfolio_news(self, global_news_result):
+    @start()
+    @timed_stage("portfolio_news")
+    async def analyze_portfolio_news(self):
         """Analyze news specific to the user's portfolio"""
         try:
-            result = self.portfolio_news_crew.kickoff(inputs={
-                "portfolio": self._format_portfolio_for_task()
-            })
-            if hasattr(result.tasks_output[0], 'raw'):
-                data = self._extract_json_from_response(result.tasks_output[0].raw)
-                if data:
-                    self.state.portfolio_news = data
-                    return data
+            data = await self._run_portfolio_news()
+            if data:
+                self.state.portfolio_news = data
+                return data
         except Exception as e:
             logging.error(f"Error in analyze_portfolio_news: {str(e)}")
         return None
 
-    @listen(analyze_portfolio_news)
-    async def monitor_key_influencers(self, portfolio_news_result):
-        """Monitor statements from key market influencers"""
+    @start()
+    @timed_stage("influencer_data")
+    async def monitor_key_influencers(self):
+        """Monitor statements from key market influencers (shared across requests within a market window)"""
         try:
-            # Get a list of influencers to monitor
-            influencers = self._get_key_influencers()
-            
-            # Execute the task
-            result = self.influencer_crew.kickoff(inputs={})
-            
-            if hasattr(result.tasks_output[0], 'raw'):
-                data = self._extract_json_from_response(result.tasks_output[0].raw)
-                if data:
-                    self.state.influencer_data = data
-                    return data
+            data = await self._run_shared_stage("influencer_data", self.influencer_crew)
+            if data:
+                self.state.influencer_data = data
+                return data
         except Exception as e:
             logging.error(f"Error in monitor_key_influencers: {str(e)}")
         return None
 
-    @listen(monitor_key_influencers)
-    async def analyze_market_sentiment(self, influencer_result):
+    @listen(and_(collect_global_news, analyze_portfolio_news, monitor_key_influencers))
+    @timed_stage("sentiment_analysis")
+    async def analyze_market_sentiment(self, _collected=None):
         """Analyze overall market sentiment based on all collected data"""
         try:
-            result = self.sentiment_crew.kickoff(inputs={})
-            
-            if hasattr(result.tasks_output[0], 'raw'):
-                data = self._extract_json_from_response(result.tasks_output[0].raw)
-                if data:
-                    self.state.sentiment_analysis = data
-                    return data
+            data = await self._run_memoized_stage("sentiment_analysis", self.sentiment_crew, (
+                self.state.global_news, self.state.portfolio_news, self.state.influencer_data
+            ), {
+                "global_news": self.state.global_news,
+                "portfolio_news": self.state.portfolio_news,
+                "influencer_data": self.state.influencer_data
+            })
+            if data:
+                self.state.sentiment_analysis = data
+                return data
         except Exception as e:
             logging.error(f"Error in analyze_market_sentiment: {str(e)}")
         return None
 
     @listen(analyze_market_sentiment)
-    async def generate_recommendations(self, sentiment_result):
+    @timed_stage("recommendations")
+    async def generate_recommendations(self, _sentiment_result=None):
         """Generate portfolio recommendations based on sentiment analysis"""
         try:
-            result = self.recommendation_crew.kickoff(inputs={
-                "portfolio": self._format_portfolio_for_task(),
-                "preferences": self._format_preferences_for_task()
+            quotes, risk = await asyncio.gather(self._prefetched_quotes(), self._prefetched_risk_metrics())
+            try:
+                # Recomputed with the prefetched quotes: the early event may have had no prices on a cold cache
+                analytics = self._portfolio_analytics(quotes)
+            except Exception as e:
+                logging.error(f"Error recomputing portfolio analytics: {str(e)}")
+                analytics = "Not available."
+            # Analytics derive from the portfolio, preferences and quotes, so like quotes they stay out of the key
+            data = await self._run_memoized_stage("recommendations", self.recommendation_crew, (
+                self.state.sentiment_analysis, self.state.portfolio, self.state.preferences, risk
+            ), {
+                "portfolio": self._portfolio_input("recommendations"),
+                "preferences": project_preferences(self.state.preferences),
+                "sentiment_analysis": self.state.sentiment_analysis,
+                "quotes": self._quotes_input(quotes),
+                "risk_metrics": self._risk_input(risk),
+                "portfolio_analytics": analytics
             })
-            
-            if hasattr(result.tasks_output[0], 'raw'):
-                data = self._extract_json_from_response(result.tasks_output[0].raw)
-                if data:
-                    self.state.recommendations = data
-                    return data
+            if data:
+                self.state.recommendations = data
+                return data
         except Exception as e:
             logging.error(f"Error in generate_recommendations: {str(e)}")
         return None
 
     async def stream_analysis(self) -> AsyncGenerator[str, None]:
-        """Stream the analysis process"""
+        """Stream the analysis process, running stages as soon as their dependencies complete"""
+        running: Dict[asyncio.Task, str] = {}
+        completed = set()
+        partial_waiter: Optional[asyncio.Future] = None
+        self._trace = Span("market_sentiment_analysis", kind="analysis")
+        self._stage_spans = {}
+        self._partials = asyncio.Queue() if STREAM_PARTIALS else None
         try:
             yield self._format_event("status", "Starting market sentiment analysis...")
+            # Start fetching quotes and price history right away; the portfolio and strategy stages await them
+            self._quote_prefetch = asyncio.ensure_future(self._fetch_quotes())
+            self._risk_prefetch = asyncio.ensure_future(self._compute_risk_metrics())
             await asyncio.sleep(0.1)
 
-            global_news = await self.collect_global_news()
-            if global_news:
-                yield self._format_event("task_complete", task="global_news", data=global_news)
-                yield self._format_event("status", "Analyzing portfolio-specific news...")
-                
-                portfolio_news = await self.analyze_portfolio_news(global_news)
-                if portfolio_news:
-                    yield self._format_event("task_complete", task="portfolio_news", data=portfolio_news)
-                    yield self._format_event("status", "Monitoring key market influencers...")
-                    
-                    influencer_data = await self.monitor_key_influencers(portfolio_news)
-                    if influencer_data:
-                        yield self._format_event("task_complete", task="influencer_data", data=influencer_data)
-                        yield self._format_event("status", "Analyzing market sentiment...")
-                        
-                        sentiment_analysis = await self.analyze_market_sentiment(influencer_data)
-                        if sentiment_analysis:
-                            yield self._format_event("task_complete", task="sentiment_analysis", data=sentiment_analysis)
-                            yield self._format_event("status", "Generating trading recommendations...")
-                            
-                            recommendations = await self.generate_recommendations(sentiment_analysis)
-                            if recommendations:
-                                yield self._format_event("task_complete", task="recommendations", data=recommendations)
-                                yield self._format_event("complete", "Market sentiment analysis complete")
-                            else:
-                                yield self._format_event("error", "Failed to generate recommendations")
-                        else:
-                            yield self._format_event("error", "Failed to analyze market sentiment")
-                    else:
-                        yield self._format_event("error", "Failed to monitor key influencers")
-                else:
-                    yield self._format_event("error", "Failed to analyze portfolio news")
-            else:
-                yield self._format_event("error", "Failed to collect global news")
-                    
+            for name, data in self._seeded_stages.items():
+                if name in STAGE_GRAPH and data:
+                    self._apply_seeded_stage(name, data)
+                    completed.add(name)
+                    yield self._format_event("task_complete", task=name, data=data)
+
+            while True:
+                started = set(running.values())
+                for name, (method_name, upstream, status_message, _) in STAGE_GRAPH.items():
+                    if name in completed or name in started:
+                        continue
+                    if all(dep in completed for dep in upstream):
+                        yield self._format_event("status", status_message)
+                        running[asyncio.create_task(getattr(self, method_name)())] = name
+
+                if not running:
+                    break
+
+                waiting = set(running)
+                if self._partials is not None:
+                    if partial_waiter is None:
+                        partial_waiter = asyncio.ensure_future(self._partials.get())
+                    waiting.add(partial_waiter)
+
+                finished, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if partial_waiter in finished:
+                    stage, partial = partial_waiter.result()
+                    partial_waiter = None
+                    yield self._format_event("partial", task=stage, data=partial)
+                for stage_task in finished:
+                    if stage_task not in running:
+                        continue
+                    name = running.pop(stage_task)
+                    # Partial results posted before the stage finished go out ahead of it
+                    for event in self._drain_partials():
+                        yield event
+                    data = stage_task.result()
+                    if not data:
+                        yield self._format_event("error", STAGE_GRAPH[name][3])
+                        yield self._timing_summary_event()
+                        return
+                    completed.add(name)
+                    yield self._format_event(
+                        "task_complete", task=name, data=data, timing=self._stage_timing(name)
+                    )
+
+            yield self._timing_summary_event()
+            yield self._format_event("complete", "Market sentiment analysis complete")
+
         except Exception as e:
             logging.error(f"Error in stream_analysis: {str(e)}")
             yield self._format_event("error", f"Error during analysis: {str(e)}")
+        finally:
+            self._trace.end()
+            export_to_opentelemetry(self._trace)
+            for stage_task in running:
+                stage_task.cancel()
+            if partial_waiter is not None:
+                partial_waiter.cancel()
+            for prefetch in (self._quote_prefetch, self._risk_prefetch):
+                if prefetch is not None and not prefetch.done():
+                    prefetch.cancel()
+
+    def _stage_timing(self, stage: str) -> Optional[Dict[str, Any]]:
+        span = self._stage_spans.get(stage)
+        if span is None:
+            return None
+        timing = span.summary()
+        timing["offset_ms"] = round((span.start_time - self._trace.start_time) * 1000, 1)
+        return timing
+
+    def _timing_summary_event(self) -> str:
+        """Wall-clock total plus per-stage timings for everything that ran"""
+        data = {
+            "total_ms": round((time.time() - self._trace.start_time) * 1000, 1),
+            "stages": {stage: self._stage_timing(stage) for stage in self._stage_spans},
+        }
+        return self._format_event("timing_summary", data=data)
 
-    def _format_event(self, event_type: str, message: str = None, task: str = None, data: Dict = None) -> str:
+    def _format_event(
+        self,
+        event_type: str,
+        message: str = None,
+        task: str = None,
+        data: Dict = None,
+        timing: Dict = None
+    ) -> str:
         """Format an event for SSE streaming"""
         event = {"type": event_type}
         if message:
@@ -247,4 +647,6 @@ class MarketSentimentFlow(Flow[MarketSentimentState]):
             event["task"] = task
         if data:
             event["data"] = data
+        if timing:
+            event["timing"] = timing
         return f"data: {json.dumps(event)}\n\n"
\ No newline at end of file
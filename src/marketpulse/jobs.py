@@ -0,0 +1,311 @@
+# src/marketpulse/jobs.py
+
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from .crew_pool import crew_pool
+from .tools.cache import CACHE_ROOT
+from .utils.crew_executor import crew_executor
+from .utils.shared_results import market_window
+from .utils.stage_memo import input_hash
+
+JOBS_DB = os.getenv("MARKETPULSE_JOBS_DB", os.path.join(CACHE_ROOT, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("MARKETPULSE_JOB_WORKERS", "2"))
+# How long SSE readers wait for a new event before sending a keep-alive comment
+KEEPALIVE_SECONDS = 15
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    event_base INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobStore:
+    """SQLite persistence for jobs and their ordered event logs"""
+
+    def __init__(self, path: str = None):
+        self.path = path or JOBS_DB
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Databases created before event_base existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)").fetchall()}
+            if "event_base" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN event_base INTEGER NOT NULL DEFAULT 0")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def create(self, kind: str, payload: Dict[str, Any], request_hash: str) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, request_hash, status, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, request_hash, QUEUED, json.dumps(payload), time.time())
+        )
+        return job_id
+
+    def find_reusable(self, request_hash: str) -> Optional[str]:
+        """Latest job for the same request that is pending or finished successfully"""
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE request_hash = ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+            (request_hash, FAILED)
+        )
+        return rows[0]["id"] if rows else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def set_status(self, job_id: str, status: str, result: Any = None, error: str = None):
+        now = time.time()
+        if status == RUNNING:
+            self._execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (status, now, job_id))
+        else:
+            self._execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, job_id)
+            )
+
+    def append_event(self, job_id: str, seq: int, event: Dict[str, Any]):
+        self._execute("INSERT INTO job_events (job_id, seq, data) VALUES (?, ?, ?)", (job_id, seq, json.dumps(event)))
+
+    def events_after(self, job_id: str, seq: int) -> List[sqlite3.Row]:
+        return self._execute(
+            "SELECT seq, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, seq)
+        )
+
+    def recent_portfolios(self, since: float) -> List[Dict[str, Any]]:
+        """Portfolios submitted in jobs created after `since` (epoch seconds)"""
+        portfolios = []
+        for row in self._execute("SELECT kind, payload FROM jobs WHERE created_at >= ?", (since,)):
+            payload = json.loads(row["payload"])
+            items = payload.get("requests", []) if row["kind"] == "batch" else [payload]
+            portfolios.extend(item["portfolio"] for item in items if isinstance(item.get("portfolio"), dict))
+        return portfolios
+
+    def recover(self) -> List[str]:
+        """Requeue jobs left unfinished by a previous process; returns the ids to run"""
+        with self._lock:
+            ids = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()]
+            # Their partial event logs are discarded and the rerun emits a complete sequence. It is
+            # numbered after the discarded events, so a client resuming with Last-Event-ID from the
+            # interrupted run receives the whole rerun instead of skipping its first events.
+            for job_id in ids:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL, event_base = MAX(event_base, "
+                    "COALESCE((SELECT MAX(seq) FROM job_events WHERE job_id = ?), 0)) WHERE id = ?",
+                    (QUEUED, job_id, job_id)
+                )
+                self._conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+        return ids
+
+
+class JobQueue:
+    """In-process worker queue for analyses, decoupled from the HTTP connection that submitted them.
+
+    Every event a job produces is persisted with a sequence number, so any number
+    of clients can follow a job, reconnect with Last-Event-ID, or fetch the final
+    result later. Identical requests within a market window share one job.
+    SQLite calls run on the default executor, keeping commits off the event loop.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = None):
+        self._store = store
+        self.workers = max(1, workers or JOB_WORKERS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Set and replaced whenever a job records an event, waking SSE readers; dropped once the job finishes
+        self._signals: Dict[str, asyncio.Event] = {}
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in self.store.recover():
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _db(self, method: Callable[..., Any], *args) -> Any:
+        """Run a JobStore call on the default executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._db(self.store.get, job_id)
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job, or return the existing job for an identical request in the current window"""
+        if not self._tasks:
+            self.start()
+        request_hash = input_hash(kind, payload, market_window())
+        job_id = await self._db(self.store.find_reusable, request_hash)
+        reused = job_id is not None
+        if not reused:
+            job_id = await self._db(self.store.create, kind, payload, request_hash)
+            self._queue.put_nowait(job_id)
+        return {"job_id": job_id, "reused": reused, "status": (await self.get(job_id))["status"]}
+
+    def _signal(self, job_id: str) -> asyncio.Event:
+        return self._signals.setdefault(job_id, asyncio.Event())
+
+    def _discard_signal(self, job_id: str, signal: asyncio.Event):
+        """Forget the signal of a finished job: no event will set it again"""
+        if self._signals.get(job_id) is signal:
+            del self._signals[job_id]
+
+    def _notify(self, job_id: str):
+        signal = self._signals.pop(job_id, None)
+        if signal is not None:
+            signal.set()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                # A job that cannot even be loaded must not stop the worker
+                logging.error(f"Job {job_id} could not be started: {str(e)}")
+                with contextlib.suppress(Exception):
+                    await self._db(self.store.set_status, job_id, FAILED, None, str(e))
+                self._notify(job_id)
+
+    async def _process(self, job_id: str):
+        job = await self.get(job_id)
+        # Jobs share the analysis capacity with streaming requests
+        slots = self._slots(job)
+        await crew_executor.admit(slots=slots)
+        try:
+            await self._run(job_id)
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}")
+            await self._db(self.store.set_status, job_id, FAILED, None, str(e))
+        finally:
+            crew_executor.release(slots)
+            self._notify(job_id)
+
+    def _slots(self, job: Optional[Dict[str, Any]]) -> int:
+        """Analysis slots a job reserves: a batch runs several crew sets at once"""
+        if job is None or job["kind"] != "batch":
+            return 1
+        from .batch import batch_slots
+        return batch_slots(len(job["payload"]["requests"]))
+
+    async def _run(self, job_id: str):
+        job = await self.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return
+        await self._db(self.store.set_status, job_id, RUNNING)
+        # Continues the numbering of a run interrupted by a restart
+        seq = job["event_base"]
+        result: Dict[str, Any] = {}
+        failed = None
+        async for event in self._events_for(job["kind"], job["payload"]):
+            seq += 1
+            await self._db(self.store.append_event, job_id, seq, event)
+            self._notify(job_id)
+            if event.get("type") == "task_complete":
+                result[event["task"]] = event.get("data")
+            elif event.get("type") in ("portfolio_complete", "portfolio_error"):
+                result.setdefault("portfolios", []).append(event)
+            elif event.get("type") == "error":
+                failed = event.get("message")
+        if failed:
+            await self._db(self.store.set_status, job_id, FAILED, result, failed)
+        else:
+            await self._db(self.store.set_status, job_id, DONE, result)
+
+    async def _events_for(self, kind: str, payload: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run a job and yield its events as dicts"""
+        if kind == "batch":
+            from .batch import BatchAnalysis
+            async for line in BatchAnalysis(payload["requests"]).stream():
+                yield json.loads(line)
+            return
+
+        from .flows.market_analysis_flow import MarketSentimentFlow
+        crews = await crew_pool.acquire()
+        try:
+            flow = MarketSentimentFlow(payload["portfolio"], payload["preferences"], crews=crews)
+            async for event in flow.stream_analysis():
+                yield json.loads(event[len("data: "):])
+        finally:
+            crew_pool.release(crews)
+
+    async def stream_events(self, job_id: str, last_event_id: int = 0) -> AsyncGenerator[str, None]:
+        """SSE stream of a job's events after `last_event_id`, following the job until it finishes"""
+        seq = last_event_id
+        while True:
+            signal = self._signal(job_id)
+            for row in await self._db(self.store.events_after, job_id, seq):
+                seq = row["seq"]
+                yield f"id: {seq}\ndata: {row['data']}\n\n"
+            job = await self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                # Catch events recorded between the read above and the status check
+                for row in await self._db(self.store.events_after, job_id, seq):
+                    seq = row["seq"]
+                    yield f"id: {seq}\ndata: {row['data']}\n\n"
+                self._discard_signal(job_id, signal)
+                return
+            try:
+                await asyncio.wait_for(signal.wait(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+
+job_queue = JobQueue()
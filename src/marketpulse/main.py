@@ -1,11 +1,23 @@
 # src/market_sentiment/main.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from .flows.market_analysis_flow import MarketSentimentFlow
-from typing import AsyncGenerator, Dict, Any, List
+from .batch import BatchAnalysis, batch_slots
+from .crew_pool import crew_pool
+from .jobs import DONE, FAILED, job_queue
+from .utils.crew_executor import crew_executor
+from .tools.http_client import http_client
+from .tools.rate_scheduler import flush_quota_state, quota_snapshot
+from .tools.cache import cache_stats
+from .utils.metrics import REGISTRY
+from .utils.loop_monitor import loop_monitor
+from typing import AsyncGenerator, Dict, Any, List, Optional
 import asyncio
+import logging
+import os
 from pydantic import BaseModel
 
 app = FastAPI()
@@ -35,38 +47,318 @@ class SentimentRequest(BaseModel):
     portfolio: Portfolio
     preferences: Preferences
 
-async def event_generator(portfolio: Dict[str, Any], preferences: Dict[str, Any]) -> AsyncGenerator[str, None]:
-    """Generate SSE events from sentiment analysis flow"""
-    flow = MarketSentimentFlow(portfolio, preferences)
-    async for event in flow.stream_analysis():
-        yield event
-        await asyncio.sleep(0)
+class BatchItem(SentimentRequest):
+    """One portfolio in a batch, with an optional caller-supplied id echoed in its result"""
+    id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    """Request model for batch sentiment analysis"""
+    requests: List[BatchItem]
+
+def _runtime_metrics():
+    """Point-in-time values reported on every /metrics scrape"""
+    yield (
+        "marketpulse_analyses_in_flight", "gauge", "Analyses currently admitted",
+        [({}, crew_executor.active_analyses)]
+    )
+    yield (
+        "marketpulse_crew_pool_available", "gauge", "Prebuilt crew sets waiting in the pool",
+        [({}, crew_pool.available)]
+    )
+    yield (
+        "marketpulse_crew_pool_overflow_builds_total", "counter", "Crew sets built on demand because the pool was empty",
+        [({}, crew_pool.overflow_builds)]
+    )
+    if crew_pool.startup_seconds is not None:
+        yield (
+            "marketpulse_crew_pool_startup_seconds", "gauge", "Time spent building the crew pool at startup",
+            [({}, crew_pool.startup_seconds)]
+        )
+    stats = cache_stats()
+    yield (
+        "marketpulse_tool_cache_lookups_total", "counter", "Tool cache lookups by result",
+        [({"cache": name, "result": result}, values[counter])
+         for name, values in stats.items()
+         for result, counter in (("memory_hit", "memory_hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))]
+    )
+    yield (
+        "marketpulse_tool_cache_hit_ratio", "gauge", "Tool cache hit ratio",
+        [({"cache": name}, values["hit_ratio"]) for name, values in stats.items()]
+    )
+    yield (
+        "marketpulse_tool_cache_evictions_total", "counter", "Tool cache evictions by tier",
+        [({"cache": name, "tier": tier}, values[f"{tier}_evictions"])
+         for name, values in stats.items() for tier in ("memory", "disk")]
+    )
+    quota = quota_snapshot()
+    yield (
+        "marketpulse_provider_quota_remaining", "gauge", "Calls left in the provider's daily budget",
+        [({"provider": name}, values["remaining_today"]) for name, values in quota.items()]
+    )
+    yield (
+        "marketpulse_provider_throttled_total", "counter", "Provider calls that hit the rate limit",
+        [({"provider": name}, values["throttled"]) for name, values in quota.items()]
+    )
+
+REGISTRY.register_collector(_runtime_metrics)
+
+warm_task: Optional[asyncio.Task] = None
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Content-Type": "text/event-stream",
+    "X-Accel-Buffering": "no",
+    "Transfer-Encoding": "chunked"
+}
+
+class Admission:
+    """Analysis slots reserved for one streaming response, released exactly once.
+
+    The stream releases them when it ends. The response's background task
+    releases them too, for clients that disconnect before the stream is ever
+    iterated, in which case the generator's finally block never runs.
+    """
+
+    def __init__(self, slots: int = 1):
+        self.slots = slots
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            crew_executor.release(self.slots)
+
+def admit_analysis(slots: int = 1) -> Admission:
+    """Reserve analysis slots or reject the request when the crew pool is saturated"""
+    if not crew_executor.try_admit(slots):
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis capacity exhausted, retry shortly",
+            headers={"Retry-After": os.getenv("MARKETPULSE_RETRY_AFTER", "30")}
+        )
+    return Admission(slots)
+
+def admitted_response(
+    admission: Admission,
+    content: AsyncGenerator[str, None],
+    media_type: str,
+    headers: Dict[str, str]
+) -> StreamingResponse:
+    """Stream `content`, releasing the admission when the response ends however it ends"""
+    try:
+        return StreamingResponse(
+            content, media_type=media_type, headers=headers, background=BackgroundTask(admission.release)
+        )
+    except Exception:
+        admission.release()
+        raise
+
+async def event_generator(
+    portfolio: Dict[str, Any],
+    preferences: Dict[str, Any],
+    admission: Admission
+) -> AsyncGenerator[str, None]:
+    """Generate SSE events from sentiment analysis flow, releasing the admission slot when done"""
+    try:
+        crews = await crew_pool.acquire()
+        try:
+            flow = MarketSentimentFlow(portfolio, preferences, crews=crews)
+            async for event in flow.stream_analysis():
+                yield event
+                await asyncio.sleep(0)
+        finally:
+            crew_pool.release(crews)
+    finally:
+        admission.release()
+
+@app.on_event("startup")
+async def warm_crew_pool():
+    """Build crews, agents and tools once instead of on every request"""
+    seconds = await asyncio.get_running_loop().run_in_executor(None, crew_pool.warm)
+    logging.info(f"Startup: crew pool of {crew_pool.size} built in {seconds:.2f}s")
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    """Track event-loop lag so blocking work in request handlers shows up in /health and /metrics"""
+    loop_monitor.start()
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the background job workers, resuming jobs left unfinished by a previous process"""
+    job_queue.start()
+
+@app.on_event("startup")
+async def schedule_pre_market_warm():
+    """Warm shared stages and portfolio news before every open when MARKETPULSE_WARM_SCHEDULE is on"""
+    global warm_task
+    if os.getenv("MARKETPULSE_WARM_SCHEDULE", "").lower() in ("1", "true", "yes"):
+        from .warmer import warmer
+        warm_task = asyncio.create_task(warmer.run_forever())
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    if warm_task is not None:
+        warm_task.cancel()
+    await job_queue.stop()
+    await loop_monitor.stop()
+    crew_executor.shutdown()
+    await http_client.close()
+    flush_quota_state()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "active_analyses": crew_executor.active_analyses,
+        "max_analyses": crew_executor.max_analyses,
+        "crew_pool": {
+            "size": crew_pool.size,
+            "available": crew_pool.available,
+            "overflow_builds": crew_pool.overflow_builds,
+            "startup_seconds": crew_pool.startup_seconds
+        },
+        "event_loop": loop_monitor.snapshot()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/quota")
+async def quota_status():
+    """Remaining provider quota and throttling counters"""
+    return quota_snapshot()
 
 @app.post("/api/sentiment/analyze")
 async def analyze_sentiment(request: SentimentRequest):
     """Analyze market sentiment for a user's portfolio"""
+    admission = admit_analysis()
     try:
         portfolio_dict = request.portfolio.dict()
         preferences_dict = request.preferences.dict()
         
-        return StreamingResponse(
-            event_generator(portfolio_dict, preferences_dict),
+        return admitted_response(
+            admission,
+            event_generator(portfolio_dict, preferences_dict, admission),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Content-Type": "text/event-stream",
-                "X-Accel-Buffering": "no",
-                "Transfer-Encoding": "chunked"
-            }
+            headers=SSE_HEADERS
         )
     except Exception as e:
+        admission.release()
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+async def batch_generator(items: List[Dict[str, Any]], admission: Admission) -> AsyncGenerator[str, None]:
+    """Generate NDJSON lines for a batch, releasing the admission slots when done"""
+    try:
+        async for line in BatchAnalysis(items, concurrency=admission.slots).stream():
+            yield line
+    finally:
+        admission.release()
+
+@app.post("/api/sentiment/batch")
+async def analyze_sentiment_batch(request: BatchRequest):
+    """Analyze many portfolios at once, streaming one NDJSON line per completed portfolio"""
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Batch contains no portfolios")
+    items = [item.dict() for item in request.requests]
+    # One slot per crew set the batch runs at once
+    admission = admit_analysis(batch_slots(len(items)))
+    return admitted_response(
+        admission,
+        batch_generator(items, admission),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _job_links(job_id: str) -> Dict[str, str]:
+    return {
+        "events_url": f"/api/sentiment/jobs/{job_id}/events",
+        "result_url": f"/api/sentiment/jobs/{job_id}/result"
+    }
+
+async def _get_job(job_id: str) -> Dict[str, Any]:
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@app.post("/api/sentiment/jobs", status_code=202)
+async def submit_sentiment_job(request: SentimentRequest):
+    """Queue an analysis as a background job; identical requests in the same market window share a job"""
+    submitted = await job_queue.submit("analysis", {
+        "portfolio": request.portfolio.dict(),
+        "preferences": request.preferences.dict()
+    })
+    return {**submitted, **_job_links(submitted["job_id"])}
+
+@app.post("/api/sentiment/batch/jobs", status_code=202)
+async def submit_batch_job(request: BatchRequest):
+    """Queue a batch analysis as a background job"""
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Batch contains no portfolios")
+    submitted = await job_queue.submit("batch", {"requests": [item.dict() for item in request.requests]})
+    return {**submitted, **_job_links(submitted["job_id"])}
+
+@app.get("/api/sentiment/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Current status of a job"""
+    job = await _get_job(job_id)
+    return {
+        "job_id": job_id,
+        "kind": job["kind"],
+        "status": job["status"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        **_job_links(job_id)
+    }
+
+@app.get("/api/sentiment/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: Optional[int] = None, last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Replay a job's events and follow it until it finishes.
+
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) to resume after
+    the last event they received instead of starting the analysis again.
+    """
+    await _get_job(job_id)
+    resume_from = last_event_id
+    if resume_from is None and last_event_id_header:
+        try:
+            resume_from = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+    return StreamingResponse(
+        job_queue.stream_events(job_id, resume_from or 0),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@app.get("/api/sentiment/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Final results of a finished job; 202 while it is still queued or running, 409 if it failed"""
+    job = await _get_job(job_id)
+    if job["status"] == DONE:
+        return {"job_id": job_id, "status": job["status"], "result": job["result"]}
+    if job["status"] == FAILED:
+        # The job ran and the request was valid; the body carries the error and any stages that completed
+        return JSONResponse(
+            status_code=409,
+            content={
+                "job_id": job_id,
+                "status": job["status"],
+                "error": job["error"] or "Job failed",
+                "result": job["result"]
+            }
+        )
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": job["status"]},
+        headers={"Retry-After": "5"}
+    )
+
 @app.get("/api/sentiment/demo")
 async def analyze_sentiment_demo():
     """Demo endpoint with sample portfolio data"""
@@ -87,14 +379,10 @@ async def analyze_sentiment_demo():
         "investment_horizon": "medium-term"
     }
     
-    return StreamingResponse(
-        event_generator(sample_portfolio, sample_preferences),
+    admission = admit_analysis()
+    return admitted_response(
+        admission,
+        event_generator(sample_portfolio, sample_preferences, admission),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Content-Type": "text/event-stream",
-            "X-Accel-Buffering": "no",
-            "Transfer-Encoding": "chunked"
-        }
+        headers=SSE_HEADERS
     )
\ No newline at end of file
@@ -0,0 +1,264 @@
+# src/marketpulse/tools/cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+CACHE_ROOT = os.getenv("MARKETPULSE_CACHE_DIR", ".cache")
+
+# Registry of every cache created in this process, used for reporting
+CACHES: Dict[str, "ToolCache"] = {}
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
+def end_of_day_ttl(now: float = None) -> float:
+    """Seconds until local midnight, for results that are valid for the calendar day"""
+    current = datetime.fromtimestamp(now or time.time())
+    midnight = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - current).total_seconds()
+
+
+class ToolCache:
+    """Two-tier cache for tool results: a bounded in-process LRU over a JSON file tier.
+
+    Every entry stores its own expiry time, so freshness no longer depends on file
+    modification times. A TTL of None means "valid until the end of the calendar day".
+    The disk tier under `<root>/<namespace>/` is bounded by entry count and total size;
+    the oldest entries are evicted first. Coroutines use aget/aset/aget_stale, which
+    answer memory hits inline and run disk reads, writes and sweeps in the executor.
+    """
+
+    SWEEP_EVERY = 32
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_memory_entries: int = None,
+        max_disk_entries: int = None,
+        max_disk_bytes: int = None,
+        root: str = None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries or int(os.getenv("MARKETPULSE_CACHE_MEMORY_ENTRIES", "512"))
+        self.max_disk_entries = max_disk_entries or int(os.getenv("MARKETPULSE_CACHE_MAX_FILES", "2000"))
+        self.max_disk_bytes = max_disk_bytes or int(float(os.getenv("MARKETPULSE_CACHE_MAX_MB", "100")) * 1024 * 1024)
+        self.directory = os.path.join(root or CACHE_ROOT, namespace)
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dir_ready = False
+        self._writes_since_sweep = self.SWEEP_EVERY
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+        CACHES[namespace] = self
+
+    def _filename(self, key: str) -> str:
+        # The readable prefix is lossy ("BRK.B" and "BRKB" share it); the hash of the full key is not
+        safe = "".join(x for x in key if x.isalnum() or x.isspace()).lower().replace(" ", "_")[:60]
+        return os.path.join(self.directory, f"{safe}_{hashlib.sha256(key.encode()).hexdigest()[:24]}.json")
+
+    def _read(self, key: str) -> Tuple[str, float]:
+        """The stored value and expiry for the key; raises if there is no readable entry for it"""
+        with open(self._filename(key), "r") as f:
+            envelope = json.load(f)
+        if envelope["key"] != key:
+            raise KeyError(key)
+        return envelope["value"], float(envelope["expires_at"])
+
+    def _count(self, counter: str):
+        self.counters[counter] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self._count("memory_evictions")
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self._count("memory_hits")
+                    return entry[0]
+                # The disk copy has the same expiry; it is counted as expired there
+                del self._memory[key]
+        return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        try:
+            value, expires_at = self._read(key)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing file, or a legacy cache file without expiry or key metadata
+            self._count("misses")
+            return None
+
+        if expires_at <= now:
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        self._remember(key, value, expires_at)
+        self._count("disk_hits")
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached value, checking memory before disk"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        return value if value is not None else self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for coroutines: a memory hit returns inline, the disk lookup runs in the executor"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return await asyncio.get_running_loop().run_in_executor(None, self._get_disk, key, now)
+
+    def _get_stale_disk(self, key: str) -> Optional[str]:
+        try:
+            return self._read(key)[0]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def get_stale(self, key: str) -> Optional[str]:
+        """Return the last stored value even if it has expired (fallback when a provider is unavailable)"""
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry[0] if entry is not None else self._get_stale_disk(key)
+
+    async def aget_stale(self, key: str) -> Optional[str]:
+        """get_stale() for coroutines, reading disk in the executor"""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return entry[0]
+        return await asyncio.get_running_loop().run_in_executor(None, self._get_stale_disk, key)
+
+    def _expiry(self, ttl: Optional[float], now: float) -> float:
+        ttl = ttl if ttl is not None else self.ttl
+        return now + (ttl if ttl is not None else end_of_day_ttl(now))
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """Store a value in both tiers with an explicit expiry time"""
+        now = time.time()
+        expires_at = self._expiry(ttl, now)
+        self._remember(key, value, expires_at)
+        self._write(key, value, now, expires_at)
+
+    async def aset(self, key: str, value: str, ttl: Optional[float] = None):
+        """set() for coroutines: the memory tier is updated inline, the file write and sweep run in the executor"""
+        now = time.time()
+        expires_at = self._expiry(ttl, now)
+        self._remember(key, value, expires_at)
+        await asyncio.get_running_loop().run_in_executor(None, self._write, key, value, now, expires_at)
+
+    def _write(self, key: str, value: str, now: float, expires_at: float):
+        try:
+            if not self._dir_ready:
+                os.makedirs(self.directory, exist_ok=True)
+                self._dir_ready = True
+            filename = self._filename(key)
+            tmp_name = f"{filename}.{threading.get_ident()}.tmp"
+            with open(tmp_name, "w") as f:
+                json.dump({"key": key, "value": value, "created_at": now, "expires_at": expires_at}, f)
+            os.replace(tmp_name, filename)
+        except OSError as e:
+            logging.warning(f"Could not write {self.namespace} cache entry: {str(e)}")
+            return
+
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.SWEEP_EVERY:
+            self._writes_since_sweep = 0
+            self.sweep()
+
+    def sweep(self):
+        """Enforce the disk tier's count and size bounds by removing the oldest entries"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        remaining = len(entries)
+        total_bytes = sum(size for _, size, _ in entries)
+        if remaining <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+            return
+
+        # Entries are rewritten once per TTL, so the oldest files are the first to expire
+        entries.sort()
+        for _, size, path in entries:
+            if remaining <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            remaining -= 1
+            total_bytes -= size
+            self._count("disk_evictions")
+        logging.info(f"Swept {self.namespace} cache: {remaining} entries, {total_bytes} bytes")
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def clear(self):
+        """Drop every entry from both tiers (benchmarks measuring the cold path)"""
+        self.clear_memory()
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """Counters for every tool cache in this process"""
+    return {namespace: cache.stats() for namespace, cache in CACHES.items()}
+
+
+NEWS_CACHE = ToolCache("news", ttl=_env_float("MARKETPULSE_NEWS_CACHE_TTL", None))
+QUOTE_CACHE = ToolCache("quotes", ttl=_env_float("MARKETPULSE_QUOTE_CACHE_TTL", 3600))
+INFLUENCER_CACHE = ToolCache("influencers", ttl=_env_float("MARKETPULSE_INFLUENCER_CACHE_TTL", 4 * 3600))
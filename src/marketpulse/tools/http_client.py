@@ -0,0 +1,121 @@
+# src/marketpulse/tools/http_client.py
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_TIMEOUT = float(os.getenv("MARKETPULSE_HTTP_TIMEOUT", "15"))
+HTTP_RETRIES = int(os.getenv("MARKETPULSE_HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("MARKETPULSE_HTTP_BACKOFF", "0.5"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("MARKETPULSE_HTTP_LIMIT_PER_HOST", "8"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpError(Exception):
+    """Raised when an upstream API keeps failing after all retries"""
+
+
+class AsyncHttpClient:
+    """Shared aiohttp session with per-host connection limits, timeouts and retries.
+
+    Retries use exponential backoff with full jitter so bursts of concurrent tool
+    calls do not retry in lockstep against the same provider.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = HTTP_LIMIT_PER_HOST,
+        timeout: float = HTTP_TIMEOUT,
+        retries: int = HTTP_RETRIES,
+        backoff: float = HTTP_BACKOFF
+    ):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _session_for_loop(self) -> aiohttp.ClientSession:
+        # aiohttp sessions are bound to the loop they were created on (the CLI runs a new loop per call)
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+        return self._session
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def request_json(
+        self,
+        method: str,
+        url: str,
+        params: Dict[str, Any] = None,
+        json_body: Dict[str, Any] = None,
+        headers: Dict[str, str] = None
+    ) -> Any:
+        """Send a request and decode the JSON body, retrying transient failures"""
+        session = self._session_for_loop()
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.request(method, url, params=params, json=json_body, headers=headers) as response:
+                    if response.status in RETRY_STATUSES:
+                        last_error = HttpError(f"{url} returned HTTP {response.status}")
+                    else:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientResponseError, ValueError) as e:
+                raise HttpError(f"{url} failed: {str(e)}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+
+            if attempt < self.retries:
+                delay = self._delay(attempt)
+                logging.info(f"Retrying {url} in {delay:.2f}s after: {last_error}")
+                await asyncio.sleep(delay)
+
+        raise HttpError(f"{url} failed after {self.retries + 1} attempts: {last_error}")
+
+    async def get_json(self, url: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> Any:
+        return await self.request_json("GET", url, params=params, headers=headers)
+
+    async def post_json(self, url: str, json_body: Dict[str, Any], headers: Dict[str, str] = None) -> Any:
+        return await self.request_json("POST", url, json_body=json_body, headers=headers)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def build_sync_session() -> requests.Session:
+    """Pooled requests session with the same retry policy, for the synchronous tool path"""
+    session = requests.Session()
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        backoff_jitter=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=HTTP_LIMIT_PER_HOST)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_client = AsyncHttpClient()
+sync_session = build_sync_session()
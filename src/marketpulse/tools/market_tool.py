@@ -6,9 +6,92 @@ from typing import Type
 from pydantic import BaseModel, Field
 from langchain_community.utilities import GoogleSerperAPIWrapper
 import os
-import requests
-from datetime import datetime, timedelta
 import json
+import requests
+from contextlib import contextmanager
+from .cache import NEWS_CACHE, QUOTE_CACHE, INFLUENCER_CACHE
+from .single_flight import SingleFlight
+from .http_client import HTTP_TIMEOUT, HttpError, http_client, sync_session
+from .quotes import QUOTE_FLIGHTS, astale_quote, fetch_quote, fetch_quote_sync, stale_quote
+from .rate_scheduler import QuotaExhausted, get_scheduler
+from ..utils.metrics import TOOL_LATENCY
+from ..utils.tracing import trace_span
+
+# Overridable so benchmarks can point the tools at the local replay server
+SERPER_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev").rstrip("/")
+SERPER = get_scheduler("serper")
+
+# Concurrent callers asking for the same normalized key share one upstream request
+NEWS_FLIGHTS = SingleFlight("news")
+INFLUENCER_FLIGHTS = SingleFlight("influencers")
+
+INFLUENCER_QUERY = (
+    "{person} recent statement market finance economy "
+    "(site:cnbc.com OR site:bloomberg.com OR site:reuters.com OR site:ft.com OR site:wsj.com)"
+)
+
+
+@contextmanager
+def _tool_call(tool: str, key: str):
+    """Time a tool call in the latency histogram and as a span under the current stage"""
+    with TOOL_LATENCY.time(tool=tool), trace_span(tool, kind="tool", key=key, cache="miss") as span:
+        yield span
+
+
+def _serve_stale(cached: str, subject: str, reason: str) -> str:
+    """Serve the last cached result when a provider budget is exhausted"""
+    if cached is not None:
+        SERPER.note_stale_served()
+        return cached
+    return f"Search unavailable for {subject}: {reason}. No cached results exist; do not infer them."
+
+
+def _stale_or_unavailable(cache, cache_key: str, subject: str, reason: str) -> str:
+    return _serve_stale(cache.get_stale(cache_key), subject, reason)
+
+
+async def _astale_or_unavailable(cache, cache_key: str, subject: str, reason: str) -> str:
+    return _serve_stale(await cache.aget_stale(cache_key), subject, reason)
+
+
+def _serper_payload(search_wrapper: GoogleSerperAPIWrapper, query: str) -> dict:
+    payload = {"q": query, "gl": search_wrapper.gl, "hl": search_wrapper.hl, "num": search_wrapper.k}
+    if search_wrapper.tbs:
+        payload["tbs"] = search_wrapper.tbs
+    return payload
+
+
+def _serper_headers(search_wrapper: GoogleSerperAPIWrapper) -> dict:
+    return {"X-API-KEY": search_wrapper.serper_api_key or "", "Content-Type": "application/json"}
+
+
+def serper_search(search_wrapper: GoogleSerperAPIWrapper, query: str) -> str:
+    """Serper search on the synchronous path, waiting for quota if needed.
+
+    Results are formatted like GoogleSerperAPIWrapper.run, but the request goes
+    through the pooled session and SERPER_URL rather than the wrapper's own client.
+    """
+    SERPER.acquire()
+    response = sync_session.post(
+        f"{SERPER_URL}/{search_wrapper.type}",
+        json=_serper_payload(search_wrapper, query),
+        headers=_serper_headers(search_wrapper),
+        timeout=HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+    return search_wrapper._parse_results(response.json())
+
+
+async def serper_search_async(search_wrapper: GoogleSerperAPIWrapper, query: str) -> str:
+    """Async Serper search over the shared HTTP client"""
+    await SERPER.acquire_async()
+    results = await http_client.post_json(
+        f"{SERPER_URL}/{search_wrapper.type}",
+        _serper_payload(search_wrapper, query),
+        headers=_serper_headers(search_wrapper)
+    )
+    return search_wrapper._parse_results(results)
+
 
 class NewsSearchInput(BaseModel):
     """Input schema for NewsSearchTool."""
@@ -31,38 +114,58 @@ class FinancialNewsSearchTool(BaseTool):
         super().__init__()
         self.search_wrapper = GoogleSerperAPIWrapper(serper_api_key=os.getenv('SERPER_API_KEY'))
 
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        return " ".join(query.lower().split())
+
     def _run(self, query: str) -> str:
         """Run the tool with caching and usage tracking"""
-        cache_dir = ".cache/news"
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        # Create a cache key based on the query
-        cache_key = "".join(x for x in query if x.isalnum() or x.isspace()).lower().replace(" ", "_")
-        cache_file = f"{cache_dir}/{cache_key}.json"
-        
-        # Check if we have a cached result for this query from today
-        if os.path.exists(cache_file):
-            file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_time.date() == datetime.now().date():
-                with open(cache_file, 'r') as f:
-                    return f.read()
-        
-        # If no cache or cache is old, make the actual API call
+        cache_key = self._cache_key(query)
+        with _tool_call(self.name, cache_key) as span:
+            # News results are valid for the calendar day unless a TTL is configured
+            cached = NEWS_CACHE.get(cache_key)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return NEWS_FLIGHTS.do(cache_key, lambda: self._search(query, cache_key))
+
+    async def _arun(self, query: str) -> str:
+        """Async variant of _run backed by the shared aiohttp session"""
+        cache_key = self._cache_key(query)
+        with _tool_call(self.name, cache_key) as span:
+            cached = await NEWS_CACHE.aget(cache_key)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return await NEWS_FLIGHTS.do_async(cache_key, lambda: self._asearch(query, cache_key))
+
+    def _search(self, query: str, cache_key: str) -> str:
+        """Call Serper for a news query and cache the results"""
+        # Another caller may have filled the cache while we waited to lead
+        cached = NEWS_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            results = serper_search(self.search_wrapper, f"financial news {query}")
+            NEWS_CACHE.set(cache_key, results)
+            return results
+        except QuotaExhausted as e:
+            return _stale_or_unavailable(NEWS_CACHE, cache_key, query, str(e))
+        except Exception as e:
+            return f"Error performing search: {str(e)}"
+
+    async def _asearch(self, query: str, cache_key: str) -> str:
+        cached = await NEWS_CACHE.aget(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            results = self.search_wrapper.run(f"financial news {query}")
-            
-            # Create logs directory if it doesn't exist
-            os.makedirs(".logs", exist_ok=True)
-            
-            # Log usage
-            with open(".logs/serper_usage.log", "a") as log:
-                log.write(f"{datetime.now().isoformat()},query,{query}\n")
-            
-            # Cache the results
-            with open(cache_file, 'w') as f:
-                f.write(results)
-                
+            results = await serper_search_async(self.search_wrapper, f"financial news {query}")
+            await NEWS_CACHE.aset(cache_key, results)
             return results
+        except QuotaExhausted as e:
+            return await _astale_or_unavailable(NEWS_CACHE, cache_key, query, str(e))
         except Exception as e:
             return f"Error performing search: {str(e)}"
 
@@ -85,56 +188,59 @@ class StockQuoteTool(BaseTool):
 
     def _run(self, symbol: str) -> str:
         """Run the tool to get stock quote data"""
-        cache_dir = ".cache/quotes"
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        # Create a cache file for this symbol
-        cache_file = f"{cache_dir}/{symbol.upper()}.json"
-        
-        # Check if we have a recent cached result (less than 1 hour old)
-        if os.path.exists(cache_file):
-            file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if datetime.now() - file_time < timedelta(hours=1):
-                with open(cache_file, 'r') as f:
-                    return f.read()
-        
-        # If no cache or cache is old, make the actual API call
+        symbol = symbol.strip().upper()
+        with _tool_call(self.name, symbol) as span:
+            cached = QUOTE_CACHE.get(symbol)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return QUOTE_FLIGHTS.do(symbol, lambda: self._fetch_quote(symbol))
+
+    async def _arun(self, symbol: str) -> str:
+        """Async variant of _run backed by the shared aiohttp session"""
+        symbol = symbol.strip().upper()
+        with _tool_call(self.name, symbol) as span:
+            cached = await QUOTE_CACHE.aget(symbol)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return await QUOTE_FLIGHTS.do_async(symbol, lambda: self._afetch_quote(symbol))
+
+    @staticmethod
+    def _quote_unavailable(symbol: str, reason: str, cached: str = None) -> str:
+        """Fall back to the last known quote instead of reporting a missing quote as fact"""
+        if cached is not None:
+            return cached
+        return f"Quote for {symbol} is temporarily unavailable ({reason}); this is not market data."
+
+    def _fetch_quote(self, symbol: str) -> str:
+        """Call Alpha Vantage for a quote and cache the formatted result"""
+        cached = QUOTE_CACHE.get(symbol)
+        if cached is not None:
+            return cached
+
         try:
-            # Using Alpha Vantage API as an example
-            api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
-            url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
-            
-            response = requests.get(url)
-            data = response.json()
-            
-            # Create logs directory if it doesn't exist
-            os.makedirs(".logs", exist_ok=True)
-            
-            # Log usage
-            with open(".logs/alphavantage_usage.log", "a") as log:
-                log.write(f"{datetime.now().isoformat()},quote,{symbol}\n")
-            
-            # Format the response
-            if "Global Quote" in data and data["Global Quote"]:
-                quote = data["Global Quote"]
-                result = {
-                    "symbol": quote.get("01. symbol", ""),
-                    "price": quote.get("05. price", ""),
-                    "change": quote.get("09. change", ""),
-                    "change_percent": quote.get("10. change percent", ""),
-                    "volume": quote.get("06. volume", ""),
-                    "latest_trading_day": quote.get("07. latest trading day", "")
-                }
-                formatted_result = json.dumps(result, indent=2)
-                
-                # Cache the result
-                with open(cache_file, 'w') as f:
-                    f.write(formatted_result)
-                
-                return formatted_result
-            else:
+            quote = fetch_quote_sync(symbol)
+            if quote is None:
                 return f"Error: Could not retrieve quote data for {symbol}."
-                
+            return json.dumps(quote, indent=2)
+        except (QuotaExhausted, requests.RequestException) as e:
+            return self._quote_unavailable(symbol, str(e), stale_quote(symbol))
+        except Exception as e:
+            return f"Error retrieving stock quote: {str(e)}"
+
+    async def _afetch_quote(self, symbol: str) -> str:
+        cached = await QUOTE_CACHE.aget(symbol)
+        if cached is not None:
+            return cached
+
+        try:
+            quote = await fetch_quote(symbol)
+            if quote is None:
+                return f"Error: Could not retrieve quote data for {symbol}."
+            return json.dumps(quote, indent=2)
+        except (QuotaExhausted, HttpError) as e:
+            return self._quote_unavailable(symbol, str(e), await astale_quote(symbol))
         except Exception as e:
             return f"Error retrieving stock quote: {str(e)}"
 
@@ -159,39 +265,56 @@ class InfluencerMonitorTool(BaseTool):
         super().__init__()
         self.search_wrapper = GoogleSerperAPIWrapper(serper_api_key=os.getenv('SERPER_API_KEY'))
 
+    @staticmethod
+    def _cache_key(person: str) -> str:
+        return " ".join(person.lower().split())
+
     def _run(self, person: str) -> str:
         """Run the tool with caching mechanism"""
-        cache_dir = ".cache/influencers"
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        # Create a safe filename
-        safe_name = "".join(x for x in person if x.isalnum() or x.isspace()).lower().replace(" ", "_")
-        cache_file = f"{cache_dir}/{safe_name}.json"
-        
-        # Check if we have a recent cached result (less than 4 hours old)
-        if os.path.exists(cache_file):
-            file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if datetime.now() - file_time < timedelta(hours=4):
-                with open(cache_file, 'r') as f:
-                    return f.read()
-        
-        # If no cache or cache is old, make the actual API call
+        cache_key = self._cache_key(person)
+        with _tool_call(self.name, cache_key) as span:
+            cached = INFLUENCER_CACHE.get(cache_key)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return INFLUENCER_FLIGHTS.do(cache_key, lambda: self._search(person, cache_key))
+
+    async def _arun(self, person: str) -> str:
+        """Async variant of _run backed by the shared aiohttp session"""
+        cache_key = self._cache_key(person)
+        with _tool_call(self.name, cache_key) as span:
+            cached = await INFLUENCER_CACHE.aget(cache_key)
+            if cached is not None:
+                span.set(cache="hit")
+                return cached
+            return await INFLUENCER_FLIGHTS.do_async(cache_key, lambda: self._asearch(person, cache_key))
+
+    def _search(self, person: str, cache_key: str) -> str:
+        """Call Serper for an influencer's recent statements and cache the results"""
+        cached = INFLUENCER_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Craft a query focused on recent statements/actions with market impact
-            query = f"{person} recent statement market finance economy (site:cnbc.com OR site:bloomberg.com OR site:reuters.com OR site:ft.com OR site:wsj.com)"
-            results = self.search_wrapper.run(query)
-            
-            # Create logs directory if it doesn't exist
-            os.makedirs(".logs", exist_ok=True)
-            
-            # Log usage
-            with open(".logs/serper_usage.log", "a") as log:
-                log.write(f"{datetime.now().isoformat()},influencer,{person}\n")
-            
-            # Cache the results
-            with open(cache_file, 'w') as f:
-                f.write(results)
-                
+            results = serper_search(self.search_wrapper, INFLUENCER_QUERY.format(person=person))
+            INFLUENCER_CACHE.set(cache_key, results)
+            return results
+        except QuotaExhausted as e:
+            return _stale_or_unavailable(INFLUENCER_CACHE, cache_key, person, str(e))
+        except Exception as e:
+            return f"Error monitoring influencer: {str(e)}"
+
+    async def _asearch(self, person: str, cache_key: str) -> str:
+        cached = await INFLUENCER_CACHE.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            results = await serper_search_async(self.search_wrapper, INFLUENCER_QUERY.format(person=person))
+            await INFLUENCER_CACHE.aset(cache_key, results)
             return results
+        except QuotaExhausted as e:
+            return await _astale_or_unavailable(INFLUENCER_CACHE, cache_key, person, str(e))
         except Exception as e:
-            return f"Error monitoring influencer: {str(e)}"
\ No newline at end of file
+            return f"Error monitoring influencer: {str(e)}"
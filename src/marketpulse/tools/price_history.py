@@ -0,0 +1,161 @@
+# src/marketpulse/tools/price_history.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from .cache import CACHE_ROOT
+from .http_client import HttpError, http_client
+from .quotes import ALPHA_VANTAGE, ALPHA_VANTAGE_URL, normalize_symbols
+from .rate_scheduler import PREFETCH, QuotaExhausted
+from .single_flight import SingleFlight
+
+PRICE_ROOT = os.getenv("MARKETPULSE_PRICE_DIR") or os.path.join(CACHE_ROOT, "prices")
+PRICE_REFRESH_SECONDS = float(os.getenv("MARKETPULSE_PRICE_REFRESH", str(12 * 3600)))
+# "compact" returns the last 100 sessions; "full" needs a premium Alpha Vantage key
+PRICE_OUTPUTSIZE = os.getenv("MARKETPULSE_PRICE_OUTPUTSIZE", "compact")
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+SERIES_FIELDS = {"open": "1. open", "high": "2. high", "low": "3. low", "close": "4. close", "volume": "5. volume"}
+
+HISTORY_FLIGHTS = SingleFlight("price_history")
+
+
+class PriceHistoryStore:
+    """Daily OHLCV bars per ticker, stored column-wise as one .npy file per column under `<root>/<TICKER>/`.
+
+    Columns are loaded memory-mapped, so reading closes for a whole portfolio
+    only touches those pages. Bars are append-only: sessions after the last
+    stored date are added and each column file is replaced atomically. Readers
+    cut every column to the shortest one, so a read racing a write still sees
+    a consistent prefix.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or PRICE_ROOT
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, name: str) -> str:
+        return os.path.join(self.root, symbol.upper(), name)
+
+    def load(self, symbol: str, columns: Sequence[str] = ("close",)) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-mapped columns for a symbol (always including "date"), or None without stored bars"""
+        try:
+            arrays = {
+                column: np.load(self._path(symbol, f"{column}.npy"), mmap_mode="r")
+                for column in dict.fromkeys(("date", *columns))
+            }
+        except (OSError, ValueError):
+            return None
+        rows = min(len(array) for array in arrays.values())
+        if not rows:
+            return None
+        return {column: array[:rows] for column, array in arrays.items()}
+
+    def fetched_at(self, symbol: str) -> float:
+        try:
+            with open(self._path(symbol, "meta.json"), "r") as f:
+                return float(json.load(f)["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0.0
+
+    def is_fresh(self, symbol: str, max_age: float = None) -> bool:
+        max_age = PRICE_REFRESH_SECONDS if max_age is None else max_age
+        return time.time() - self.fetched_at(symbol) < max_age
+
+    def append(self, symbol: str, bars: Dict[str, np.ndarray]) -> int:
+        """Store bars dated after the last stored session; returns the number of sessions added"""
+        order = np.argsort(bars["date"])
+        bars = {column: np.asarray(bars[column])[order] for column in COLUMNS}
+        directory = self._path(symbol, "")
+        with self._lock:
+            existing = self.load(symbol, COLUMNS)
+            if existing is not None:
+                new = bars["date"] > existing["date"][-1]
+                bars = {column: np.concatenate([existing[column], bars[column][new]]) for column in COLUMNS}
+                added = int(new.sum())
+            else:
+                added = len(bars["date"])
+
+            os.makedirs(directory, exist_ok=True)
+            if added:
+                for column in COLUMNS:
+                    path = self._path(symbol, f"{column}.npy")
+                    tmp_name = f"{path}.{threading.get_ident()}.tmp"
+                    with open(tmp_name, "wb") as f:
+                        np.save(f, bars[column])
+                    os.replace(tmp_name, path)
+            with open(self._path(symbol, "meta.json"), "w") as f:
+                json.dump({"fetched_at": time.time(), "sessions": len(bars["date"])}, f)
+        return added
+
+
+price_store = PriceHistoryStore()
+
+
+def daily_params(symbol: str) -> Dict[str, str]:
+    """Query parameters for an Alpha Vantage TIME_SERIES_DAILY request"""
+    return {
+        "function": "TIME_SERIES_DAILY",
+        "symbol": symbol,
+        "outputsize": PRICE_OUTPUTSIZE,
+        "apikey": os.getenv("ALPHA_VANTAGE_API_KEY", "")
+    }
+
+
+def parse_daily_series(data: Any) -> Optional[Dict[str, np.ndarray]]:
+    """Convert an Alpha Vantage TIME_SERIES_DAILY response into date-sorted columns"""
+    series = data.get("Time Series (Daily)") if isinstance(data, dict) else None
+    if not series:
+        return None
+    dates = sorted(series)
+    bars = {"date": np.array(dates, dtype="datetime64[D]")}
+    for column, field in SERIES_FIELDS.items():
+        bars[column] = np.array([float(series[day].get(field) or "nan") for day in dates])
+    return bars
+
+
+async def _fetch_history(symbol: str, lane: str, max_wait: float) -> int:
+    await ALPHA_VANTAGE.acquire_async(lane, max_wait)
+    data = await http_client.get_json(ALPHA_VANTAGE_URL, params=daily_params(symbol))
+    # Throttled and premium-only requests answer HTTP 200 with a "Note"/"Information" body
+    if isinstance(data, dict) and "Time Series (Daily)" not in data and ("Note" in data or "Information" in data):
+        ALPHA_VANTAGE.penalize()
+        raise QuotaExhausted("Alpha Vantage rate limit reached")
+    bars = parse_daily_series(data)
+    if bars is None:
+        logging.warning(f"Price history request returned no data for {symbol}")
+        return 0
+    return price_store.append(symbol, bars)
+
+
+async def refresh_price_histories(
+    symbols: Iterable[str],
+    lane: str = PREFETCH,
+    max_wait: float = None
+) -> Dict[str, int]:
+    """Append new sessions for every symbol whose history is older than MARKETPULSE_PRICE_REFRESH.
+
+    Refreshes run concurrently within the Alpha Vantage quota, in the
+    low-priority lane by default. A symbol that cannot be refreshed keeps its
+    stored bars. Returns the sessions added per refreshed symbol.
+    """
+    stale = [symbol for symbol in normalize_symbols(symbols) if not price_store.is_fresh(symbol)]
+
+    async def refresh(symbol: str) -> int:
+        try:
+            return await HISTORY_FLIGHTS.do_async(symbol, lambda: _fetch_history(symbol, lane, max_wait))
+        except QuotaExhausted as e:
+            logging.info(f"Price history refresh for {symbol} deferred ({str(e)}); using stored sessions")
+        except HttpError as e:
+            logging.warning(f"Price history refresh failed for {symbol}: {str(e)}")
+        return 0
+
+    results = await asyncio.gather(*(refresh(symbol) for symbol in stale))
+    return dict(zip(stale, results))
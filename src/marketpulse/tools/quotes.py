@@ -0,0 +1,156 @@
+# src/marketpulse/tools/quotes.py
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from .cache import QUOTE_CACHE
+from .http_client import HTTP_TIMEOUT, HttpError, http_client, sync_session
+from .rate_scheduler import INTERACTIVE, PREFETCH, QuotaExhausted, get_scheduler
+from .single_flight import SingleFlight
+
+ALPHA_VANTAGE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co").rstrip("/") + "/query"
+ALPHA_VANTAGE = get_scheduler("alphavantage")
+
+# Shared by the prefetcher and StockQuoteTool so concurrent requests for a symbol coalesce
+QUOTE_FLIGHTS = SingleFlight("quotes")
+
+
+def quote_params(symbol: str) -> Dict[str, str]:
+    """Query parameters for an Alpha Vantage GLOBAL_QUOTE request"""
+    return {
+        "function": "GLOBAL_QUOTE",
+        "symbol": symbol,
+        "apikey": os.getenv("ALPHA_VANTAGE_API_KEY", "")
+    }
+
+
+def format_global_quote(data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Convert an Alpha Vantage GLOBAL_QUOTE response into our quote shape"""
+    quote = data.get("Global Quote") if isinstance(data, dict) else None
+    if not quote:
+        return None
+    return {
+        "symbol": quote.get("01. symbol", ""),
+        "price": quote.get("05. price", ""),
+        "change": quote.get("09. change", ""),
+        "change_percent": quote.get("10. change percent", ""),
+        "volume": quote.get("06. volume", ""),
+        "latest_trading_day": quote.get("07. latest trading day", "")
+    }
+
+
+def normalize_symbols(symbols: Iterable[str]) -> list:
+    """Upper-case, strip and de-duplicate ticker symbols, preserving order"""
+    seen = {}
+    for symbol in symbols:
+        if symbol:
+            seen.setdefault(symbol.strip().upper(), None)
+    return list(seen)
+
+
+def _parse_quote_response(data: Any) -> Optional[Dict[str, str]]:
+    """Format a quote response, treating throttling notices as quota exhaustion"""
+    # Alpha Vantage answers HTTP 200 with a "Note"/"Information" body when throttled
+    if isinstance(data, dict) and not data.get("Global Quote") and ("Note" in data or "Information" in data):
+        ALPHA_VANTAGE.penalize()
+        raise QuotaExhausted("Alpha Vantage rate limit reached")
+    return format_global_quote(data)
+
+
+def _quote_from_response(symbol: str, data: Any) -> Optional[Dict[str, str]]:
+    """Format and cache a quote response"""
+    quote = _parse_quote_response(data)
+    if quote is not None:
+        QUOTE_CACHE.set(symbol, json.dumps(quote, indent=2))
+    return quote
+
+
+def fetch_quote_sync(symbol: str, lane: str = INTERACTIVE) -> Optional[Dict[str, str]]:
+    """Fetch one quote on the synchronous path, waiting for quota if needed"""
+    ALPHA_VANTAGE.acquire(lane)
+    response = sync_session.get(ALPHA_VANTAGE_URL, params=quote_params(symbol), timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return _quote_from_response(symbol, response.json())
+
+
+async def fetch_quote(symbol: str, lane: str = INTERACTIVE, max_wait: float = None) -> Optional[Dict[str, str]]:
+    """Fetch one quote over the shared async HTTP client, waiting for quota if needed"""
+    await ALPHA_VANTAGE.acquire_async(lane, max_wait)
+    data = await http_client.get_json(ALPHA_VANTAGE_URL, params=quote_params(symbol))
+    quote = _parse_quote_response(data)
+    if quote is not None:
+        await QUOTE_CACHE.aset(symbol, json.dumps(quote, indent=2))
+    return quote
+
+
+def stale_quote(symbol: str) -> Optional[str]:
+    """Last known quote for the symbol, regardless of age"""
+    cached = QUOTE_CACHE.get_stale(symbol)
+    if cached is not None:
+        ALPHA_VANTAGE.note_stale_served()
+    return cached
+
+
+async def astale_quote(symbol: str) -> Optional[str]:
+    """stale_quote for coroutines, reading the quote cache's disk tier in the executor"""
+    cached = await QUOTE_CACHE.aget_stale(symbol)
+    if cached is not None:
+        ALPHA_VANTAGE.note_stale_served()
+    return cached
+
+
+def cached_quotes(symbols: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Quotes already in the quote cache, fresh or not, without calling the provider"""
+    quotes = {}
+    for symbol in normalize_symbols(symbols):
+        cached = QUOTE_CACHE.get(symbol) or QUOTE_CACHE.get_stale(symbol)
+        if cached is not None:
+            quotes[symbol] = json.loads(cached)
+    return quotes
+
+
+async def _prefetch_one(symbol: str, lane: str, max_wait: float) -> Optional[Dict[str, str]]:
+    try:
+        quote = await QUOTE_FLIGHTS.do_async(symbol, lambda: fetch_quote(symbol, lane, max_wait))
+    except QuotaExhausted as e:
+        cached = await astale_quote(symbol)
+        logging.info(f"Quote prefetch for {symbol} deferred ({str(e)}); stale quote {'used' if cached else 'unavailable'}")
+        return json.loads(cached) if cached else None
+    except HttpError as e:
+        logging.warning(f"Quote prefetch failed for {symbol}: {str(e)}")
+        return None
+    if quote is None:
+        logging.warning(f"Quote prefetch returned no data for {symbol}")
+    return quote
+
+
+async def prefetch_quotes(
+    symbols: Iterable[str],
+    lane: str = PREFETCH,
+    max_wait: float = None
+) -> Dict[str, Dict[str, str]]:
+    """Fetch quotes for all symbols concurrently over the shared connection pool.
+
+    Fresh cached quotes are reused; everything else is fetched in parallel, within
+    the Alpha Vantage quota, and written to the quote cache so later StockQuoteTool
+    calls are cache hits. Prefetches run in the low-priority lane by default and
+    fall back to stale quotes when the budget runs out.
+    Returns the quotes that could be resolved, keyed by symbol.
+    """
+    quotes: Dict[str, Dict[str, str]] = {}
+    missing = []
+    symbols = normalize_symbols(symbols)
+    for symbol, cached in zip(symbols, await asyncio.gather(*(QUOTE_CACHE.aget(symbol) for symbol in symbols))):
+        if cached is not None:
+            quotes[symbol] = json.loads(cached)
+        else:
+            missing.append(symbol)
+
+    results = await asyncio.gather(*(_prefetch_one(symbol, lane, max_wait) for symbol in missing))
+    for symbol, quote in zip(missing, results):
+        if quote is not None:
+            quotes[symbol] = quote
+    return quotes
@@ -0,0 +1,237 @@
+# src/marketpulse/tools/rate_scheduler.py
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional
+
+from .cache import CACHE_ROOT
+
+INTERACTIVE = "interactive"
+PREFETCH = "prefetch"
+
+# Usage counters are written at most this often, from a timer thread rather than the calling path
+PERSIST_INTERVAL = float(os.getenv("MARKETPULSE_QUOTA_PERSIST_INTERVAL", "5"))
+
+
+class QuotaExhausted(Exception):
+    """Raised when a provider call cannot be scheduled within its budget or wait limit"""
+
+
+class ProviderScheduler:
+    """Token-bucket scheduler for one API provider with per-minute and per-day budgets.
+
+    Calls wait for a token instead of failing. Two priority lanes share the bucket:
+    prefetch calls only take a token when no interactive call is waiting and the
+    bucket holds more than `interactive_reserve` tokens, so background warming never
+    starves user requests. When the daily budget is spent, or a call would wait
+    longer than `max_wait`, QuotaExhausted is raised so callers can fall back to a
+    stale cached value.
+
+    Usage counters are persisted to `<cache root>/quota/<provider>.json` by a
+    timer at most every PERSIST_INTERVAL seconds, and on exit, so taking a token
+    never does file I/O on the caller's thread (the event loop, for async callers).
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        per_minute: int,
+        per_day: int,
+        max_wait: float = None,
+        interactive_reserve: int = 1
+    ):
+        self.provider = provider
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("MARKETPULSE_QUOTA_MAX_WAIT", "30"))
+        self.interactive_reserve = min(interactive_reserve, max(per_minute - 1, 0))
+        self.state_file = os.path.join(CACHE_ROOT, "quota", f"{provider}.json")
+
+        self._lock = threading.Lock()
+        self._tokens = float(per_minute)
+        self._refilled_at = time.monotonic()
+        self._interactive_waiting = 0
+        self._day = date.today().isoformat()
+        self._used_today = 0
+        self._total_calls = 0
+        self._throttled = 0
+        self._stale_served = 0
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("day") == self._day:
+            self._used_today = int(state.get("used_today", 0))
+
+    def _schedule_save(self):
+        """Mark the counters changed and start the persist timer if none is pending (caller holds _lock)"""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(PERSIST_INTERVAL, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write the usage counters if they changed since the last write"""
+        with self._save_lock:
+            with self._lock:
+                timer, self._save_timer = self._save_timer, None
+                if timer is not None and timer is not threading.current_thread():
+                    timer.cancel()
+                if not self._dirty:
+                    return
+                self._dirty = False
+                state = {"day": self._day, "used_today": self._used_today}
+            try:
+                os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+                tmp_name = f"{self.state_file}.{threading.get_ident()}.tmp"
+                with open(tmp_name, "w") as f:
+                    json.dump(state, f)
+                os.replace(tmp_name, self.state_file)
+            except OSError as e:
+                logging.warning(f"Could not persist {self.provider} quota state: {str(e)}")
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.per_minute), self._tokens + elapsed * self.per_minute / 60.0)
+        self._refilled_at = now
+        today = date.today().isoformat()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def _try_take(self, lane: str) -> float:
+        """Take a token if allowed; returns 0 on success, else seconds until the next attempt"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._used_today >= self.per_day:
+                raise QuotaExhausted(f"{self.provider} daily budget of {self.per_day} calls is spent")
+
+            floor = 1.0
+            if lane == PREFETCH:
+                if self._interactive_waiting:
+                    return 60.0 / self.per_minute
+                floor += self.interactive_reserve
+
+            if self._tokens >= floor:
+                self._tokens -= 1
+                self._used_today += 1
+                self._total_calls += 1
+                self._schedule_save()
+                return 0.0
+            return (floor - self._tokens) * 60.0 / self.per_minute
+
+    def _waiting(self, lane: str, delta: int):
+        if lane == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += delta
+
+    def acquire(self, lane: str = INTERACTIVE, max_wait: float = None):
+        """Block until a call may be made (synchronous tool path)"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        self._waiting(lane, 1)
+        try:
+            while True:
+                wait = self._try_take(lane)
+                if wait == 0:
+                    return
+                if time.monotonic() + wait > deadline:
+                    self._note_throttled()
+                    raise QuotaExhausted(f"{self.provider} rate limit: no capacity within {max_wait:g}s")
+                time.sleep(wait)
+        finally:
+            self._waiting(lane, -1)
+
+    async def acquire_async(self, lane: str = INTERACTIVE, max_wait: float = None):
+        """Wait without blocking the event loop until a call may be made"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        self._waiting(lane, 1)
+        try:
+            while True:
+                wait = self._try_take(lane)
+                if wait == 0:
+                    return
+                if time.monotonic() + wait > deadline:
+                    self._note_throttled()
+                    raise QuotaExhausted(f"{self.provider} rate limit: no capacity within {max_wait:g}s")
+                await asyncio.sleep(wait)
+        finally:
+            self._waiting(lane, -1)
+
+    def _note_throttled(self):
+        with self._lock:
+            self._throttled += 1
+
+    def note_stale_served(self):
+        with self._lock:
+            self._stale_served += 1
+
+    def penalize(self):
+        """Drain the bucket after the provider reported a rate limit we did not predict"""
+        with self._lock:
+            self._tokens = 0.0
+            self._refilled_at = time.monotonic()
+            self._throttled += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "provider": self.provider,
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "tokens_available": round(self._tokens, 2),
+                "used_today": self._used_today,
+                "remaining_today": max(self.per_day - self._used_today, 0),
+                "calls": self._total_calls,
+                "throttled": self._throttled,
+                "stale_served": self._stale_served,
+                "interactive_waiting": self._interactive_waiting,
+            }
+
+
+SCHEDULERS: Dict[str, ProviderScheduler] = {
+    "alphavantage": ProviderScheduler(
+        "alphavantage",
+        per_minute=int(os.getenv("ALPHA_VANTAGE_PER_MINUTE", "5")),
+        per_day=int(os.getenv("ALPHA_VANTAGE_PER_DAY", "500"))
+    ),
+    "serper": ProviderScheduler(
+        "serper",
+        per_minute=int(os.getenv("SERPER_PER_MINUTE", "60")),
+        per_day=int(os.getenv("SERPER_PER_DAY", "2500"))
+    ),
+}
+
+
+def get_scheduler(provider: str) -> Optional[ProviderScheduler]:
+    return SCHEDULERS.get(provider)
+
+
+def quota_snapshot() -> Dict[str, Dict[str, float]]:
+    """Remaining quota and throttling counters for every provider"""
+    return {name: scheduler.snapshot() for name, scheduler in SCHEDULERS.items()}
+
+
+def flush_quota_state():
+    """Persist every provider's pending usage counters"""
+    for scheduler in SCHEDULERS.values():
+        scheduler.flush()
+
+
+atexit.register(flush_quota_state)
@@ -0,0 +1,70 @@
+# src/marketpulse/tools/single_flight.py
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls for the same key.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception). Once the call finishes the
+    key is forgotten, so later callers go back to the cache. Sync and async callers
+    share the same in-flight table, so a thread and a coroutine asking for the same
+    key also coalesce.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def _join(self, key: str):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        return future, leader
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._forget(key)
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._forget(key)
@@ -0,0 +1,73 @@
+# src/marketpulse/utils/crew_executor.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class CrewExecutor:
+    """Bounded thread pool for blocking crew kickoffs plus admission control for analyses.
+
+    Crew kickoffs are synchronous and can take tens of seconds, so they run here
+    instead of on the event loop. The number of concurrently admitted analyses is
+    capped so a saturated worker rejects new work instead of queueing it forever.
+    """
+
+    def __init__(self, max_workers: int = None, max_analyses: int = None):
+        self.max_workers = max_workers or int(os.getenv("MARKETPULSE_CREW_WORKERS", "16"))
+        self.max_analyses = max_analyses or int(os.getenv("MARKETPULSE_MAX_ANALYSES", "8"))
+        self._pool = None
+        self._lock = threading.Lock()
+        self._active_analyses = 0
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="crew"
+                    )
+        return self._pool
+
+    @property
+    def active_analyses(self) -> int:
+        return self._active_analyses
+
+    def try_admit(self, slots: int = 1) -> bool:
+        """Reserve slots (one per crew set run at once); returns False when the worker is saturated"""
+        with self._lock:
+            if self._active_analyses + slots > self.max_analyses:
+                return False
+            self._active_analyses += slots
+            return True
+
+    async def admit(self, poll: float = 1.0, slots: int = 1):
+        """Wait for analysis slots (background work that should queue rather than be rejected)"""
+        while not self.try_admit(slots):
+            await asyncio.sleep(poll)
+
+    def release(self, slots: int = 1):
+        """Release slots reserved with try_admit"""
+        with self._lock:
+            self._active_analyses = max(0, self._active_analyses - slots)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool, propagating context variables"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.pool, call)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+crew_executor = CrewExecutor()
@@ -0,0 +1,109 @@
+# src/marketpulse/utils/incremental_json.py
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Agents answer in ReAct format; only the text after this marker is the JSON result
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_DECODER = json.JSONDecoder(strict=False)
+
+
+class ArrayItemParser:
+    """Scan a JSON object as it streams in and return each completed item of its top-level arrays.
+
+    For {"major_events": [{...}, {...}], ...} every object in major_events is
+    returned as soon as its closing brace arrives, tagged with the array's key and
+    its index. Each character is looked at once; text before `marker` is skipped.
+    """
+
+    def __init__(self, marker: Optional[str] = FINAL_ANSWER_MARKER):
+        self._marker = marker
+        self._started = marker is None
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._item_start = -1
+        self._last_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._counts: Dict[str, int] = {}
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Add streamed text; returns (array key, index, item) for items completed by it"""
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+
+        if not self._started:
+            found = self._text.find(self._marker)
+            if found == -1:
+                # Keep just enough to spot a marker split across chunks
+                self._text = self._text[-len(self._marker):]
+                return []
+            self._started = True
+            self._text = self._text[found + len(self._marker):]
+            self._pos = 0
+
+        items = []
+        text = self._text
+        stack = self._stack
+        i = self._pos
+        while i < len(text):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(stack) == 1:
+                        self._last_key = text[self._string_start + 1:i]
+            elif c == '"':
+                if stack:
+                    self._in_string = True
+                    self._string_start = i
+            elif c in '{[':
+                if stack or c == '{':
+                    stack.append(c)
+                    if len(stack) == 2 and c == '[':
+                        self._array_key = self._last_key
+                    elif len(stack) == 3 and c == '{' and stack[1] == '[':
+                        self._item_start = i
+            elif c in '}]' and stack:
+                stack.pop()
+                if len(stack) == 2 and c == '}' and self._item_start >= 0:
+                    item = self._parse_item(text[self._item_start:i + 1])
+                    self._item_start = -1
+                    # Unparseable items keep their index, so indexes match positions in the final result
+                    index = self._counts.get(self._array_key, 0)
+                    self._counts[self._array_key] = index + 1
+                    if item is not None:
+                        items.append((self._array_key, index, item))
+                elif not stack:
+                    self.done = True
+                    break
+            i += 1
+
+        # Drop consumed text, keeping whatever an open item or key string still needs
+        keep = self._item_start if self._item_start >= 0 else (self._string_start if self._in_string else i)
+        self._text = text[keep:]
+        self._pos = i - keep
+        if self._item_start >= 0:
+            self._item_start = 0
+        if self._in_string:
+            self._string_start -= keep
+        return items
+
+    @staticmethod
+    def _parse_item(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = _DECODER.decode(text)
+        except json.JSONDecodeError:
+            # The final parse of the full response still repairs and reports it
+            return None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,92 @@
+# src/marketpulse/utils/llm_cache.py
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import LLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.base_events import BaseEvent
+
+from ..tools.cache import ToolCache
+from .metrics import LLM_CACHE_LOOKUPS
+from .stage_memo import input_hash
+
+
+class LLMCacheHitEvent(BaseEvent):
+    """Emitted instead of the LLM call events when a completion is served from llm_response_cache"""
+
+    type: str = "llm_cache_hit"
+    model: str
+    response: str
+
+
+class LLMResponseCache:
+    """Persistent cache of LLM completions keyed by a hash of everything the completion depends on.
+
+    The key covers the model, sampling parameters, stop words and the full
+    message list: system prompt, task prompt with its interpolated upstream
+    outputs, and the tool transcript so far. Entries live in a ToolCache under
+    `<cache root>/llm/`, so they are bounded on disk and their hit rates are
+    exported with the tool caches.
+    """
+
+    def __init__(self, cache: ToolCache = None):
+        self.enabled = os.getenv("MARKETPULSE_LLM_CACHE", "1").lower() not in ("0", "false", "no")
+        self.cache = cache or ToolCache("llm", ttl=float(os.getenv("MARKETPULSE_LLM_CACHE_TTL", str(6 * 3600))))
+
+    @staticmethod
+    def key(llm: LLM, messages: List[Dict[str, Any]], tools: Optional[List[dict]] = None) -> str:
+        return f"{llm.model} {input_hash(llm.model, llm.temperature, llm.top_p, llm.seed, llm.stop, messages, tools)}"
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return self.cache.get(key)
+
+    def put(self, key: str, response: Any):
+        # Native tool calls return the tool's result rather than text; only text completions are reused
+        if self.enabled and isinstance(response, str) and response.strip():
+            self.cache.set(key, response)
+
+
+llm_response_cache = LLMResponseCache()
+
+
+class CachedLLM(LLM):
+    """An LLM that answers repeated identical calls from llm_response_cache.
+
+    Agents opt in with `llm_cache: true` in agents.yaml; it is meant for
+    temperature-0 agents, whose output for the same prompt is effectively fixed.
+    A hit makes no LLM call, so it emits no LLM call events and invokes no
+    callbacks: token usage and call counts only reflect real requests. It emits
+    an LLMCacheHitEvent instead, which partial results are read from, and
+    lookups are counted in marketpulse_llm_cache_lookups_total.
+    """
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        try:
+            key = llm_response_cache.key(self, messages, tools)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Not caching LLM call: {str(e)}")
+            return super().call(messages, tools, callbacks, available_functions)
+
+        cached = llm_response_cache.get(key)
+        if cached is None:
+            if llm_response_cache.enabled:
+                LLM_CACHE_LOOKUPS.inc(model=self.model, result="miss")
+            response = super().call(messages, tools, callbacks, available_functions)
+            llm_response_cache.put(key, response)
+            return response
+
+        LLM_CACHE_LOOKUPS.inc(model=self.model, result="hit")
+        crewai_event_bus.emit(self, event=LLMCacheHitEvent(model=self.model, response=cached))
+        return cached
@@ -0,0 +1,97 @@
+# src/marketpulse/utils/llm_stream.py
+
+import contextvars
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from .incremental_json import ArrayItemParser
+
+# Agents' LLMs are built with stream=True when this is on (see crew.py)
+STREAM_PARTIALS = os.getenv("MARKETPULSE_STREAM_PARTIALS", "").lower() in ("1", "true", "yes")
+
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+class PartialSink:
+    """Feeds one stage's streamed LLM chunks to an ArrayItemParser and reports completed items"""
+
+    def __init__(self, stage: str, emit: PartialCallback):
+        self.stage = stage
+        self.emit = emit
+        self.parser = ArrayItemParser()
+
+    def call_started(self):
+        # Tool-using agents make several LLM calls; only the last one carries the answer
+        self.parser = ArrayItemParser()
+
+    def chunk(self, text: str):
+        for key, index, item in self.parser.feed(text):
+            self.emit({"key": key, "index": index, "item": item})
+
+
+_current_sink: contextvars.ContextVar[Optional[PartialSink]] = contextvars.ContextVar(
+    "marketpulse_partial_sink", default=None
+)
+_handlers_registered = False
+_register_lock = threading.Lock()
+
+
+def _register_handlers():
+    """Subscribe to crewai's LLM events once; events are routed to the sink of the emitting context"""
+    global _handlers_registered
+    with _register_lock:
+        if _handlers_registered:
+            return
+        from crewai.utilities.events import LLMCallStartedEvent, LLMStreamChunkEvent, crewai_event_bus
+
+        from .llm_cache import LLMCacheHitEvent
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def _on_call_started(source, event):
+            sink = _current_sink.get()
+            if sink is not None:
+                sink.call_started()
+
+        def _feed(text: str):
+            sink = _current_sink.get()
+            if sink is None:
+                return
+            try:
+                sink.chunk(text)
+            except Exception as e:
+                logging.warning(f"Dropping partial results for {sink.stage}: {str(e)}")
+                _current_sink.set(None)
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_chunk(source, event):
+            _feed(event.chunk)
+
+        @crewai_event_bus.on(LLMCacheHitEvent)
+        def _on_cache_hit(source, event):
+            # A cached completion arrives whole, as if streamed in one chunk
+            _on_call_started(source, event)
+            _feed(event.response)
+
+        _handlers_registered = True
+
+
+@contextmanager
+def stream_partials(stage: str, emit: Optional[PartialCallback]):
+    """Send completed array items from LLM output streamed in this context to `emit`.
+
+    The crew executor copies the context into its worker threads, so chunks from
+    a crew kicked off inside the with-block reach this stage's sink. `emit` is
+    called from those threads.
+    """
+    if not STREAM_PARTIALS or emit is None:
+        yield
+        return
+    _register_handlers()
+    token = _current_sink.set(PartialSink(stage, emit))
+    try:
+        yield
+    finally:
+        _current_sink.reset(token)
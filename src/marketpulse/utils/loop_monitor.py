@@ -0,0 +1,65 @@
+# src/marketpulse/utils/loop_monitor.py
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from .metrics import REGISTRY
+
+LOOP_LAG = REGISTRY.histogram(
+    "marketpulse_event_loop_lag_seconds", "Delay of a periodic event-loop callback beyond its schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+LAG_INTERVAL = float(os.getenv("MARKETPULSE_LOOP_LAG_INTERVAL", "0.1"))
+# Lag above this is logged: something blocked the event loop
+LAG_WARN_SECONDS = float(os.getenv("MARKETPULSE_LOOP_LAG_WARN", "0.25"))
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs a callback scheduled every `interval` seconds.
+
+    Lag is time the loop spent on something else: synchronous work in a
+    coroutine, a blocking call, or too many ready tasks. Samples go to the
+    LOOP_LAG histogram, and the last minute's are kept for /health.
+    """
+
+    def __init__(self, interval: float = None, window: float = 60.0):
+        self.interval = interval or LAG_INTERVAL
+        self._samples = deque(maxlen=max(1, int(window / self.interval)))
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self._samples.append(lag)
+            LOOP_LAG.observe(lag)
+            if lag > LAG_WARN_SECONDS:
+                logging.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Latest and worst lag over the recent window, in milliseconds"""
+        if not self._samples:
+            return {"lag_ms_last": None, "lag_ms_max": None}
+        return {
+            "lag_ms_last": round(self._samples[-1] * 1000, 1),
+            "lag_ms_max": round(max(self._samples) * 1000, 1),
+        }
+
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,226 @@
+# src/marketpulse/utils/metrics.py
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+# A collected metric family: (name, type, help, [(labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# USD per million (prompt, completion) tokens, used to estimate LLM cost per stage
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # Per bucket counts followed by sum and count
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def totals(self) -> Dict[LabelValues, Tuple[float, int]]:
+        """(sum, count) of observations per label set"""
+        with self._lock:
+            return {key: (series[-2], series[-1]) for key, series in self._series.items()}
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(float(bound))}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """In-process metric registry rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Add a callable that reports point-in-time values (cache counters, quota, ...) at scrape time"""
+        self._collectors.append(collector)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, type_name, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "marketpulse_stage_duration_seconds", "Duration of MarketSentimentFlow stages", ["stage", "outcome"]
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    "marketpulse_tool_duration_seconds", "Duration of agent tool calls", ["tool"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "marketpulse_llm_tokens_total", "LLM tokens consumed per stage", ["stage", "kind"]
+)
+LLM_COST = REGISTRY.counter(
+    "marketpulse_llm_cost_usd_total", "Estimated LLM cost per stage in USD", ["stage"]
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "marketpulse_llm_requests_total", "Successful LLM requests per stage", ["stage"]
+)
+STAGE_INPUT_TOKENS = REGISTRY.histogram(
+    "marketpulse_stage_input_tokens", "Tokens of the inputs interpolated into a stage's task, after budget trimming",
+    ["stage"], buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+STAGE_INPUTS_TRIMMED = REGISTRY.counter(
+    "marketpulse_stage_inputs_trimmed_total", "Stage runs whose inputs were trimmed to the token budget", ["stage"]
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "marketpulse_llm_cache_lookups_total", "LLM response cache lookups by result; a hit makes no LLM request",
+    ["model", "result"]
+)
+JSON_PARSE = REGISTRY.counter(
+    "marketpulse_json_parse_total", "Agent output JSON parses by repair applied (direct when none was needed)", ["path"]
+)
+
+
+def record_token_usage(stage: str, model: str, usage) -> None:
+    """Record token counts and estimated cost from a crew's UsageMetrics"""
+    if usage is None:
+        return
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    LLM_TOKENS.inc(prompt, stage=stage, kind="prompt")
+    LLM_TOKENS.inc(completion, stage=stage, kind="completion")
+    LLM_TOKENS.inc(getattr(usage, "cached_prompt_tokens", 0) or 0, stage=stage, kind="cached_prompt")
+    LLM_REQUESTS.inc(getattr(usage, "successful_requests", 0) or 0, stage=stage)
+
+    pricing = MODEL_PRICING.get(str(model).split("/")[-1])
+    if pricing:
+        LLM_COST.inc((prompt * pricing[0] + completion * pricing[1]) / 1_000_000, stage=stage)
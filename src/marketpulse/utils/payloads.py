@@ -0,0 +1,188 @@
+# src/marketpulse/utils/payloads.py
+
+import json
+import logging
+import math
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Fields of a holding each stage reads; purchase prices, share counts, notes, ... are dropped
+HOLDING_FIELDS = {
+    "portfolio_news": ("ticker", "company", "sector"),
+    "recommendations": ("ticker", "company", "sector", "allocation"),
+}
+QUOTE_FIELDS = ("price", "change_percent", "latest_trading_day")
+
+# Token budget for the inputs interpolated into each stage's task; 0 disables trimming
+DEFAULT_BUDGETS = {
+    "portfolio_news": 2000,
+    "sentiment_analysis": 6000,
+    "recommendations": 6000,
+}
+
+# Every input a stage's task template interpolates, with its relative importance; larger
+# inputs with lower priority are trimmed first. fit_inputs rejects any other set of inputs.
+INPUT_PRIORITIES = {
+    "sentiment_analysis": {"influencer_data": 1, "global_news": 2, "portfolio_news": 3},
+    "recommendations": {
+        "quotes": 1, "risk_metrics": 2, "sentiment_analysis": 2, "portfolio_analytics": 3, "preferences": 3, "portfolio": 3
+    },
+    "portfolio_news": {"quotes": 1, "portfolio": 2},
+}
+
+
+def stage_budget(stage: str) -> int:
+    """Token budget for a stage: MARKETPULSE_PROMPT_BUDGET_<STAGE>, else the default"""
+    override = os.getenv(f"MARKETPULSE_PROMPT_BUDGET_{stage.upper()}")
+    return int(override) if override else DEFAULT_BUDGETS.get(stage, 0)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model.split("/")[-1])
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Token count with the model's tokenizer, or about 4 characters per token without tiktoken"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def compact(value: Any) -> str:
+    """Minimal JSON encoding for prompts"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def project_holdings(portfolio: Dict[str, Any], stage: str, holdings=None) -> Dict[str, Any]:
+    """The portfolio with only the holding fields `stage` needs"""
+    fields = HOLDING_FIELDS[stage]
+    holdings = portfolio.get("holdings", []) if holdings is None else holdings
+    return {"holdings": [
+        {field: h[field] for field in fields if h.get(field) not in (None, "")}
+        for h in holdings if isinstance(h, dict)
+    ]}
+
+
+def project_quotes(quotes: Dict[str, Any]) -> Dict[str, Any]:
+    """Quotes reduced to what the agents use, keyed by symbol"""
+    return {
+        symbol: {field: quote[field] for field in QUOTE_FIELDS if quote.get(field)}
+        for symbol, quote in (quotes or {}).items() if isinstance(quote, dict)
+    }
+
+
+def project_preferences(preferences: Dict[str, Any]) -> Dict[str, Any]:
+    """Preferences without empty values"""
+    return {key: value for key, value in (preferences or {}).items() if value not in (None, "", [], {})}
+
+
+def _longest_list(value: Any, best: Optional[list] = None) -> Optional[list]:
+    """The longest list nested anywhere in `value` that can still lose an item"""
+    if isinstance(value, dict):
+        for item in value.values():
+            best = _longest_list(item, best)
+    elif isinstance(value, list):
+        items = _items(value)
+        if len(items) > 1 and (best is None or len(items) > len(_items(best))):
+            best = value
+        for item in items:
+            best = _longest_list(item, best)
+    return best
+
+
+def _items(values: list) -> list:
+    """A list's entries without a trailing omission marker"""
+    if values and isinstance(values[-1], str) and values[-1].startswith("(+") and values[-1].endswith(" more omitted)"):
+        return values[:-1]
+    return values
+
+
+def _trim_list(values: list):
+    """Drop the last quarter of a list's entries, noting how many were omitted"""
+    items = _items(values)
+    omitted = int(values[-1][2:].split(" ")[0]) if len(items) < len(values) else 0
+    keep = max(1, len(items) - max(1, len(items) // 4))
+    omitted += len(items) - keep
+    values[:] = items[:keep] + [f"(+{omitted} more omitted)"]
+
+
+def _longest_string(value: Any, best: Tuple[Any, Any, int] = (None, None, 0)) -> Tuple[Any, Any, int]:
+    """(container, key, length) of the longest string value nested in `value`"""
+    entries = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, item in entries:
+        if isinstance(item, str) and len(item) > best[2]:
+            best = (value, key, len(item))
+        elif isinstance(item, (dict, list)):
+            best = _longest_string(item, best)
+    return best
+
+
+def _shrink(value: Any) -> bool:
+    """Shrink a payload in place: shorten its longest list, else its longest long string"""
+    values = _longest_list(value)
+    if values is not None:
+        _trim_list(values)
+        return True
+    container, key, length = _longest_string(value)
+    if container is not None and length > 80:
+        container[key] = container[key][:length // 2].rstrip() + "…"
+        return True
+    return False
+
+
+def fit_inputs(
+    stage: str,
+    inputs: Dict[str, Any],
+    model: str = "gpt-4o-mini",
+    budget: int = None
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Encode a stage's task inputs compactly and trim them to the stage's token budget.
+
+    Inputs are JSON-serializable values (strings pass through). While over budget,
+    the input with the most tokens per unit of priority loses the tail of its
+    longest list, replaced by an "(+N more omitted)" note, or once no list can
+    shrink, half of its longest string. Returns the encoded inputs and a report of token counts and trimming.
+    Raises ValueError when the inputs are not exactly the stage's declared inputs.
+    """
+    budget = stage_budget(stage) if budget is None else budget
+    priorities = INPUT_PRIORITIES.get(stage, {})
+    if stage in INPUT_PRIORITIES and set(inputs) != set(priorities):
+        raise ValueError(f"{stage} inputs {sorted(inputs)} do not match its task inputs {sorted(priorities)}")
+    values = {name: json.loads(compact(value)) if not isinstance(value, str) else value for name, value in inputs.items()}
+    encoded = {name: value if isinstance(value, str) else compact(value) for name, value in values.items()}
+    tokens = {name: count_tokens(text, model) for name, text in encoded.items()}
+    original = sum(tokens.values())
+
+    trimmed = []
+    shrinkable = {name for name in values if not isinstance(values[name], str)}
+    while budget and sum(tokens.values()) > budget and shrinkable:
+        # Largest input relative to its priority gives way first
+        name = max(sorted(shrinkable), key=lambda n: tokens[n] / priorities.get(n, 1))
+        if not _shrink(values[name]):
+            shrinkable.discard(name)
+            continue
+        encoded[name] = compact(values[name])
+        tokens[name] = count_tokens(encoded[name], model)
+        if name not in trimmed:
+            trimmed.append(name)
+
+    total = sum(tokens.values())
+    if budget and total > budget:
+        logging.warning(f"{stage} inputs use {total} tokens after trimming, over the budget of {budget}")
+    return encoded, {
+        "budget": budget,
+        "tokens": total,
+        "original_tokens": original,
+        "by_input": tokens,
+        "trimmed": trimmed,
+    }
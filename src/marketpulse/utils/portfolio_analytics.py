@@ -0,0 +1,144 @@
+# src/marketpulse/utils/portfolio_analytics.py
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Exchange suffixes of non-US listings; unsuffixed tickers are taken as US listings
+REGION_SUFFIXES = {
+    "L": "Europe", "DE": "Europe", "F": "Europe", "PA": "Europe", "AS": "Europe", "BR": "Europe",
+    "MI": "Europe", "MC": "Europe", "SW": "Europe", "ST": "Europe", "CO": "Europe", "HE": "Europe",
+    "OL": "Europe", "VI": "Europe", "LS": "Europe", "IR": "Europe",
+    "T": "Asia", "HK": "Asia", "SS": "Asia", "SZ": "Asia", "KS": "Asia", "KQ": "Asia", "TW": "Asia",
+    "SI": "Asia", "NS": "Asia", "BO": "Asia", "JK": "Asia", "BK": "Asia",
+    "AX": "Oceania", "NZ": "Oceania",
+    "TO": "Canada", "V": "Canada", "CN": "Canada",
+    "SA": "Latin America", "MX": "Latin America",
+}
+
+
+def holding_region(holding: Dict[str, Any]) -> str:
+    """The holding's region field, or the region of its ticker's exchange suffix"""
+    if holding.get("region"):
+        return str(holding["region"])
+    ticker = str(holding.get("ticker") or "").strip().upper()
+    _, dot, suffix = ticker.rpartition(".")
+    return REGION_SUFFIXES.get(suffix, "US") if dot else "US"
+
+
+def _number(value: Any) -> float:
+    try:
+        number = float(str(value).rstrip("%")) if value not in (None, "") else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+def _round(value: Any, digits: int = 2) -> Optional[float]:
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+def _exposure(labels: List[str], weights: np.ndarray, preferred: List[str]) -> Dict[str, Any]:
+    """Weight per group, and how it departs from the preferred groups"""
+    groups, index = np.unique(np.array([str(label) for label in labels]), return_inverse=True)
+    totals = np.bincount(index, weights=weights, minlength=len(groups))
+    preferred_set = {p.lower() for p in preferred}
+    is_preferred = np.array([group.lower() in preferred_set for group in groups], dtype=bool)
+    order = np.argsort(-totals, kind="stable")
+    return {
+        "weights": [
+            {"name": str(groups[i]), "weight_pct": _round(totals[i]), "preferred": bool(is_preferred[i])}
+            for i in order
+        ],
+        "herfindahl": _round((totals / 100) @ (totals / 100), 3),
+        "preferred_weight_pct": _round(totals[is_preferred].sum()) if preferred_set else None,
+        "non_preferred_weight_pct": _round(totals[~is_preferred].sum()) if preferred_set else None,
+        "missing_preferred": [p for p in preferred if p.lower() not in {g.lower() for g in groups}],
+    }
+
+
+def portfolio_analytics(
+    portfolio: Dict[str, Any],
+    preferences: Dict[str, Any],
+    quotes: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Weights, unrealized P&L, concentration and drift from preferences, computed without an LLM.
+
+    Market values use the quoted price where one is available and the purchase
+    price otherwise; `unpriced` lists the holdings valued at cost. Weights are
+    market-value weights, compared with the stated `allocation` as the target.
+    Percentages are 0-100 like `allocation` and the position size preferences.
+    """
+    holdings = [h for h in portfolio.get("holdings", []) if h.get("ticker")]
+    if not holdings:
+        return {"holdings": []}
+    preferences = preferences or {}
+
+    tickers = [str(h["ticker"]).strip().upper() for h in holdings]
+    shares = np.array([_number(h.get("shares")) for h in holdings])
+    cost = np.array([_number(h.get("purchase_price")) for h in holdings])
+    allocation = np.array([_number(h.get("allocation")) for h in holdings])
+    price = np.array([_number((quotes.get(t) or {}).get("price")) for t in tickers])
+
+    priced = np.isfinite(price)
+    shares = np.nan_to_num(shares)
+    value = shares * np.where(priced, price, np.nan_to_num(cost))
+    basis = shares * cost
+    pnl = np.where(priced, value - basis, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_pct = pnl / basis * 100
+
+    allocation = np.nan_to_num(allocation)
+    target = allocation / allocation.sum() * 100 if allocation.sum() > 0 else np.full(len(holdings), np.nan)
+    # Without share counts there are no market values; fall back to the stated allocation
+    weights = value / value.sum() * 100 if value.sum() > 0 else np.nan_to_num(target)
+    drift = weights - target
+
+    sectors = [h.get("sector") or "Unknown" for h in holdings]
+    regions = [holding_region(h) for h in holdings]
+    sector_exposure = _exposure(sectors, weights, list(preferences.get("preferred_sectors") or []))
+    region_exposure = _exposure(regions, weights, list(preferences.get("preferred_regions") or []))
+
+    max_position = _number(preferences.get("max_position_size"))
+    min_position = _number(preferences.get("min_position_size"))
+    herfindahl = (weights / 100) @ (weights / 100)
+    top = int(np.argmax(weights))
+    known_pnl = np.isfinite(pnl)
+    known_basis = basis[known_pnl].sum()
+
+    return {
+        "holdings": [
+            {
+                "ticker": tickers[i],
+                "sector": sectors[i],
+                "region": regions[i],
+                "weight_pct": _round(weights[i]),
+                "target_pct": _round(target[i]),
+                "drift_pct": _round(drift[i]),
+                "market_value": _round(value[i]),
+                "unrealized_pnl": _round(pnl[i]),
+                "unrealized_pnl_pct": _round(pnl_pct[i]),
+            }
+            for i in range(len(holdings))
+        ],
+        "totals": {
+            "market_value": _round(value.sum()),
+            "cost_basis": _round(np.nansum(basis)),
+            "unrealized_pnl": _round(pnl[known_pnl].sum()) if known_pnl.any() else None,
+            "unrealized_pnl_pct": _round(pnl[known_pnl].sum() / known_basis * 100) if known_basis else None,
+        },
+        "concentration": {
+            "herfindahl": _round(herfindahl, 3),
+            "effective_positions": _round(1 / herfindahl, 1) if herfindahl > 0 else None,
+            "largest_position": {"ticker": tickers[top], "weight_pct": _round(weights[top])},
+        },
+        "sectors": sector_exposure,
+        "regions": region_exposure,
+        "position_limits": {
+            "above_max": [t for t, w in zip(tickers, weights) if math.isfinite(max_position) and w > max_position],
+            "below_min": [t for t, w in zip(tickers, weights) if math.isfinite(min_position) and w < min_position],
+        },
+        "unpriced": [t for t, p in zip(tickers, priced) if not p],
+    }
@@ -0,0 +1,61 @@
+# src/marketpulse/utils/portfolio_shards.py
+
+import os
+from typing import Any, Dict, List, Optional
+
+SHARD_SIZE = int(os.getenv("MARKETPULSE_NEWS_SHARD_SIZE", "8"))
+SHARD_CONCURRENCY = int(os.getenv("MARKETPULSE_NEWS_SHARD_CONCURRENCY", "4"))
+
+
+def shard_holdings(holdings: List[Dict[str, Any]], size: int = None) -> List[List[Dict[str, Any]]]:
+    """Split holdings into shards of at most `size`, keeping sectors together where possible.
+
+    Holdings are grouped by sector in order of first appearance. Large sectors are
+    chunked and small ones are packed into a shared shard, so the result depends
+    only on the input order.
+    """
+    size = max(1, size or SHARD_SIZE)
+    by_sector: Dict[str, List[Dict[str, Any]]] = {}
+    for holding in holdings:
+        by_sector.setdefault(holding.get("sector") or "", []).append(holding)
+
+    shards: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    for group in by_sector.values():
+        for start in range(0, len(group), size):
+            chunk = group[start:start + size]
+            if current and len(current) + len(chunk) > size:
+                shards.append(current)
+                current = []
+            current.extend(chunk)
+    if current:
+        shards.append(current)
+    return shards
+
+
+def combine_shard_results(results: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Merge per-shard portfolio news into one result, in shard order.
+
+    company_news entries are concatenated. Sector entries reported by several
+    shards are combined into one, with duplicate developments dropped.
+    """
+    results = [result for result in results if isinstance(result, dict)]
+    if not results:
+        return None
+
+    company_news = []
+    sectors: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        company_news.extend(entry for entry in result.get("company_news", []) if isinstance(entry, dict))
+        for entry in result.get("sector_news", []):
+            if not isinstance(entry, dict):
+                continue
+            merged = sectors.setdefault(entry.get("sector"), {**entry, "developments": []})
+            seen = {d.get("development") for d in merged["developments"] if isinstance(d, dict)}
+            for development in entry.get("developments", []):
+                if not isinstance(development, dict) or development.get("development") not in seen:
+                    merged["developments"].append(development)
+                    if isinstance(development, dict):
+                        seen.add(development.get("development"))
+
+    return {**results[0], "company_news": company_news, "sector_news": list(sectors.values())}
@@ -0,0 +1,151 @@
+# src/marketpulse/utils/risk.py
+
+import functools
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..tools.price_history import PriceHistoryStore, price_store
+
+TRADING_DAYS = 252
+RISK_BENCHMARK = os.getenv("MARKETPULSE_RISK_BENCHMARK", "SPY").strip().upper()
+RISK_LOOKBACK = int(os.getenv("MARKETPULSE_RISK_LOOKBACK", "252"))
+ROLLING_WINDOW = int(os.getenv("MARKETPULSE_RISK_ROLLING_WINDOW", "21"))
+MIN_SESSIONS = 20
+HIGH_CORRELATION = 0.7
+
+
+def _round(value: Any, digits: int = 4) -> Optional[float]:
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+def aligned_closes(
+    symbols: Sequence[str],
+    store: PriceHistoryStore,
+    lookback: int
+) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Closes on the sessions all symbols with enough history share, as a (sessions, symbols) matrix"""
+    loaded = {}
+    for symbol in symbols:
+        data = store.load(symbol, ("close",))
+        if data is not None and len(data["date"]) > MIN_SESSIONS:
+            loaded[symbol] = data
+    if not loaded:
+        return np.array([], dtype="datetime64[D]"), [], np.empty((0, 0))
+
+    dates = functools.reduce(np.intersect1d, (data["date"] for data in loaded.values()))[-(lookback + 1):]
+    closes = np.empty((len(dates), len(loaded)))
+    for column, data in enumerate(loaded.values()):
+        closes[:, column] = data["close"][np.searchsorted(data["date"], dates)]
+    # Sessions with a missing close for any symbol would poison every statistic
+    valid = np.isfinite(closes).all(axis=1) & (closes > 0).all(axis=1)
+    return dates[valid], list(loaded), closes[valid]
+
+
+def _weights(holdings: List[Dict[str, Any]], tickers: List[str]) -> np.ndarray:
+    """Holding weights from allocations, renormalized over the tickers with history; equal if unknown"""
+    allocation = {}
+    for holding in holdings:
+        ticker = str(holding.get("ticker") or "").strip().upper()
+        try:
+            allocation[ticker] = allocation.get(ticker, 0.0) + max(0.0, float(holding.get("allocation") or 0))
+        except (TypeError, ValueError):
+            continue
+    weights = np.array([allocation.get(ticker, 0.0) for ticker in tickers])
+    if weights.sum() <= 0:
+        weights = np.ones(len(tickers))
+    return weights / weights.sum()
+
+
+def _max_drawdown(levels: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough decline of each column of price levels (as a negative fraction)"""
+    return (levels / np.maximum.accumulate(levels, axis=0) - 1.0).min(axis=0)
+
+
+def risk_metrics(
+    holdings: List[Dict[str, Any]],
+    store: PriceHistoryStore = None,
+    benchmark: str = None,
+    lookback: int = None
+) -> Optional[Dict[str, Any]]:
+    """Volatility, beta, drawdown and correlations for the holdings from stored daily closes.
+
+    Every statistic is computed over the same aligned sessions in one pass over
+    a (sessions, symbols) return matrix. Volatilities are annualized, "recent"
+    values cover the last ROLLING_WINDOW sessions, and beta is against the
+    benchmark. Returns None when too few holdings have price history.
+    """
+    store = store or price_store
+    benchmark = RISK_BENCHMARK if benchmark is None else benchmark.strip().upper()
+    lookback = lookback or RISK_LOOKBACK
+
+    tickers = list(dict.fromkeys(
+        str(h.get("ticker") or "").strip().upper() for h in holdings if h.get("ticker")
+    ))
+    symbols = tickers + ([benchmark] if benchmark and benchmark not in tickers else [])
+    dates, found, closes = aligned_closes(symbols, store, lookback)
+    held = [symbol for symbol in found if symbol in tickers]
+    if len(dates) <= MIN_SESSIONS or not held:
+        return None
+
+    returns = closes[1:] / closes[:-1] - 1.0
+    held_columns = [found.index(ticker) for ticker in held]
+    weights = _weights(holdings, held)
+    portfolio_returns = returns[:, held_columns] @ weights
+    # Portfolio returns become one more column, so every statistic below covers it too
+    returns = np.column_stack([returns, portfolio_returns])
+    levels = np.column_stack([closes, np.concatenate([[1.0], np.cumprod(1.0 + portfolio_returns)])])
+
+    scale = math.sqrt(TRADING_DAYS)
+    window = min(ROLLING_WINDOW, len(returns))
+    volatility = returns.std(axis=0, ddof=1) * scale
+    recent_volatility = returns[-window:].std(axis=0, ddof=1) * scale
+    max_drawdown = _max_drawdown(levels)
+    drawdown = levels[-1] / levels.max(axis=0) - 1.0
+    period_return = levels[-1] / levels[0] - 1.0
+
+    beta = np.full(returns.shape[1], np.nan)
+    if benchmark in found:
+        centered = returns - returns.mean(axis=0)
+        market = centered[:, found.index(benchmark)]
+        beta = centered.T @ market / (market @ market)
+
+    correlation = np.atleast_2d(np.corrcoef(returns[:, held_columns], rowvar=False))
+    upper = np.triu_indices(len(held), k=1)
+    pairs = sorted(
+        ((correlation[i, j], held[i], held[j]) for i, j in zip(*upper) if correlation[i, j] >= HIGH_CORRELATION),
+        reverse=True
+    )
+
+    def stats(column: int) -> Dict[str, Optional[float]]:
+        return {
+            "return": _round(period_return[column]),
+            "volatility": _round(volatility[column]),
+            "volatility_recent": _round(recent_volatility[column]),
+            "beta": _round(beta[column], 2),
+            "max_drawdown": _round(max_drawdown[column]),
+            "drawdown": _round(drawdown[column]),
+        }
+
+    portfolio = stats(returns.shape[1] - 1)
+    # One-day historical value at risk: the loss exceeded on 5% of sessions
+    portfolio["value_at_risk_95"] = _round(-np.percentile(portfolio_returns, 5))
+    return {
+        "as_of": str(dates[-1]),
+        "sessions": len(returns),
+        "rolling_window": window,
+        "benchmark": benchmark if benchmark in found else None,
+        "portfolio": portfolio,
+        "holdings": [
+            {"ticker": ticker, "weight": _round(weight, 3), **stats(column)}
+            for ticker, weight, column in zip(held, weights, held_columns)
+        ],
+        "correlation": {"tickers": held, "matrix": [[_round(value, 2) for value in row] for row in correlation]},
+        "highly_correlated": [
+            {"pair": [first, second], "correlation": _round(value, 2)} for value, first, second in pairs
+        ],
+        "no_history": [ticker for ticker in tickers if ticker not in held],
+    }
@@ -0,0 +1,108 @@
+# src/marketpulse/utils/shared_results.py
+
+import asyncio
+import logging
+import os
+from datetime import datetime, time, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+
+
+def market_window(mode: str = None, at: datetime = None) -> str:
+    """Return the identifier of the market window containing `at`.
+
+    Modes:
+    - hourly: one window per clock hour (market time zone)
+    - session: pre-market, regular session, after-hours and weekend windows
+    - daily: one window per calendar day
+    """
+    mode = mode or os.getenv("MARKETPULSE_SHARED_WINDOW", "hourly")
+    now = (at or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now.strftime("%Y-%m-%d")
+
+    if mode == "daily":
+        return day
+    if mode == "session":
+        if now.weekday() >= 5:
+            return f"{day}:closed"
+        if now.time() < SESSION_OPEN:
+            return f"{day}:premarket"
+        if now.time() < SESSION_CLOSE:
+            return f"{day}:regular"
+        return f"{day}:afterhours"
+    return now.strftime("%Y-%m-%dT%H")
+
+
+def next_session_open(at: datetime = None) -> datetime:
+    """The next regular-session open at or after `at` (weekdays; exchange holidays are not modeled)"""
+    now = (at or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now.date()
+    if now.time() > SESSION_OPEN:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, SESSION_OPEN, tzinfo=MARKET_TZ)
+
+
+class SharedStageStore:
+    """Process-wide store for portfolio-independent stage results.
+
+    Results are keyed by (stage, market window, model config). The first caller for
+    a key computes the result and concurrent callers await the same computation
+    (single-flight). Failed computations (None results) are not stored.
+    """
+
+    def __init__(self):
+        self._results: Dict[Tuple[str, str, str], Any] = {}
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+    def get(self, stage: str, model_key: str, window: str = None) -> Optional[Any]:
+        return self._results.get((stage, window or market_window(), model_key))
+
+    def put(self, stage: str, model_key: str, value: Any, window: str = None):
+        current = market_window()
+        window = window or current
+        # Only the current window of a stage, and an upcoming one being warmed, are worth keeping
+        for key in [k for k in self._results if k[0] == stage and k[1] not in (window, current)]:
+            del self._results[key]
+        self._results[(stage, window, model_key)] = value
+
+    async def get_or_compute(
+        self,
+        stage: str,
+        model_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        window: str = None
+    ) -> Optional[Any]:
+        """Return the shared result for the stage, computing it at most once per key"""
+        window = window or market_window()
+        key = (stage, window, model_key)
+        if key in self._results:
+            return self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logging.info(f"Waiting for in-flight shared result for {stage} ({window})")
+
+        # Shield so one disconnecting request does not cancel the work others wait on
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Tuple[str, str, str], compute: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        value = await compute()
+        if value:
+            self.put(key[0], key[2], value, window=key[1])
+        return value
+
+    def clear(self):
+        self._results.clear()
+
+
+shared_stage_store = SharedStageStore()
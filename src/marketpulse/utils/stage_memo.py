@@ -0,0 +1,97 @@
+# src/marketpulse/utils/stage_memo.py
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..tools.cache import ToolCache
+from .shared_results import market_window
+
+
+def input_hash(*inputs: Any) -> str:
+    """Content hash of JSON-serializable inputs, independent of dict key order"""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def holding_slice(holding: Dict[str, Any]) -> Dict[str, str]:
+    """The parts of a holding that news depends on; allocation and share counts do not change the news"""
+    return {
+        "ticker": str(holding.get("ticker") or "").strip().upper(),
+        "company": holding.get("company") or "",
+        "sector": holding.get("sector") or "",
+    }
+
+
+class StageMemo:
+    """Persistent memo of stage outputs keyed by a hash of the stage's inputs.
+
+    Keys combine the stage name, a content hash of its inputs (portfolio slice,
+    preferences, upstream outputs), the model configuration and the current
+    freshness window, so a result is reused only while all of those match.
+    Entries live in a ToolCache under `<cache root>/stages/`.
+    """
+
+    def __init__(self, cache: ToolCache = None, window_mode: str = None):
+        self.enabled = os.getenv("MARKETPULSE_STAGE_MEMO", "1").lower() not in ("0", "false", "no")
+        self.window_mode = window_mode or os.getenv("MARKETPULSE_MEMO_WINDOW") or None
+        self.cache = cache or ToolCache("stages", ttl=float(os.getenv("MARKETPULSE_STAGE_MEMO_TTL", str(6 * 3600))))
+
+    def key(self, stage: str, model_key: str, *inputs: Any, at: datetime = None) -> str:
+        """Memo key for the window containing `at` (default now; the warmer passes the next open)"""
+        return f"{stage} {input_hash(model_key, market_window(self.window_mode, at=at), *inputs)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        cached = self.cache.get(key)
+        return json.loads(cached) if cached is not None else None
+
+    def put(self, key: str, value: Any):
+        if self.enabled and value:
+            self.cache.set(key, json.dumps(value))
+
+
+def merge_portfolio_news(
+    holdings: List[Dict[str, Any]],
+    cached_news: Dict[str, Dict[str, Any]],
+    cached_sectors: Dict[str, Dict[str, Any]],
+    fresh: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Combine memoized per-ticker and per-sector news with a fresh partial result.
+
+    company_news follows the order of the holdings; fresh entries win over cached
+    ones. sector_news keeps the holdings' sector order, followed by any extra
+    sectors the fresh result reported.
+    """
+    fresh = fresh or {}
+    fresh_news = {
+        str(entry.get("ticker", "")).strip().upper(): entry
+        for entry in fresh.get("company_news", []) if isinstance(entry, dict)
+    }
+    fresh_sectors = {
+        entry.get("sector"): entry
+        for entry in fresh.get("sector_news", []) if isinstance(entry, dict)
+    }
+
+    company_news = []
+    sectors = []
+    for holding in holdings:
+        ticker = holding_slice(holding)["ticker"]
+        entry = fresh_news.get(ticker) or cached_news.get(ticker)
+        if entry is not None:
+            company_news.append(entry)
+        sector = holding.get("sector")
+        if sector and sector not in sectors:
+            sectors.append(sector)
+
+    sector_news = [fresh_sectors.get(s) or cached_sectors.get(s) for s in sectors]
+    sector_news = [entry for entry in sector_news if entry is not None]
+    sector_news.extend(entry for name, entry in fresh_sectors.items() if name not in sectors)
+
+    return {**fresh, "company_news": company_news, "sector_news": sector_news}
+
+
+stage_memo = StageMemo()
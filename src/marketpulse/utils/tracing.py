@@ -0,0 +1,128 @@
+# src/marketpulse/utils/tracing.py
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("marketpulse_span", default=None)
+
+
+class Span:
+    """A timed unit of work with attributes and nested child spans.
+
+    Spans nest through a context variable, so tool calls made from crew threads
+    (the crew executor copies the context) attach to the stage that issued them.
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.children: List["Span"] = []
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def child(self, name: str, **attributes) -> "Span":
+        span = Span(name, parent=self, **attributes)
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + (self.duration if self.duration is not None else time.perf_counter() - self._started)
+
+    def _descendants(self) -> List["Span"]:
+        spans = []
+        for child in list(self.children):
+            spans.append(child)
+            spans.extend(child._descendants())
+        return spans
+
+    def summary(self) -> Dict[str, Any]:
+        """Duration plus counts of nested tool calls and cache hits"""
+        tools = [s for s in self._descendants() if s.attributes.get("kind") == "tool"]
+        return {
+            "started_at": self.start_time,
+            "ended_at": self.end_time,
+            "duration_ms": round((self.end_time - self.start_time) * 1000, 1),
+            "tool_calls": len(tools),
+            "cache_hits": sum(1 for s in tools if s.attributes.get("cache") == "hit"),
+            **{k: v for k, v in self.attributes.items() if k != "kind"},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            **self.summary(),
+            "children": [child.to_dict() for child in list(self.children)],
+        }
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def activate(span: Span):
+    """Make `span` the current span for the with-block and end it on exit"""
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.end()
+        _current_span.reset(token)
+
+
+@contextmanager
+def trace_span(name: str, **attributes):
+    """Open a span as a child of the current span (or a new root) for the with-block"""
+    parent = _current_span.get()
+    span = parent.child(name, **attributes) if parent else Span(name, **attributes)
+    with activate(span):
+        yield span
+
+
+def export_to_opentelemetry(root: Span):
+    """Replay a finished span tree into OpenTelemetry when MARKETPULSE_OTEL_EXPORT is enabled.
+
+    The exporter itself is configured through the standard OpenTelemetry SDK
+    environment; nothing happens if the opentelemetry packages are missing.
+    """
+    if os.getenv("MARKETPULSE_OTEL_EXPORT", "").lower() not in ("1", "true", "yes"):
+        return
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logging.warning("MARKETPULSE_OTEL_EXPORT is set but opentelemetry is not installed")
+        return
+
+    tracer = trace.get_tracer("marketpulse")
+
+    def _emit(span: Span, context=None):
+        otel_span = tracer.start_span(span.name, context=context, start_time=int(span.start_time * 1e9))
+        for key, value in span.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                otel_span.set_attribute(f"marketpulse.{key}", value)
+        child_context = trace.set_span_in_context(otel_span)
+        for child in list(span.children):
+            _emit(child, child_context)
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+    try:
+        _emit(root)
+    except Exception as e:
+        logging.warning(f"OpenTelemetry export failed: {str(e)}")
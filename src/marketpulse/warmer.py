@@ -0,0 +1,178 @@
+# src/marketpulse/warmer.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from .batch import unique_holdings
+from .crew_pool import CrewPool, crew_pool
+from .flows.market_analysis_flow import MarketSentimentFlow
+from .jobs import job_queue
+from .tools.price_history import refresh_price_histories
+from .tools.rate_scheduler import quota_snapshot
+from .utils.crew_executor import crew_executor
+from .utils.risk import RISK_BENCHMARK
+from .utils.shared_results import MARKET_TZ, market_window, next_session_open
+from .utils.stage_memo import holding_slice
+
+WARM_AT = os.getenv("MARKETPULSE_WARM_AT", "09:00")
+WARM_PORTFOLIOS = os.getenv("MARKETPULSE_WARM_PORTFOLIOS")
+WARM_LOOKBACK_DAYS = float(os.getenv("MARKETPULSE_WARM_LOOKBACK_DAYS", "7"))
+# Share of each provider's remaining daily budget a warm run may spend
+WARM_QUOTA_SHARE = float(os.getenv("MARKETPULSE_WARM_QUOTA_SHARE", "0.25"))
+
+# Rough provider calls per unit of work, used to size a run to the budget
+SHARED_STAGE_SEARCHES = 12
+SEARCHES_PER_TICKER = 2
+QUOTES_PER_TICKER = 1
+HISTORY_PER_TICKER = 1
+
+
+def load_portfolio_file(path: str) -> List[Dict[str, Any]]:
+    """Portfolios from a JSON or YAML file holding one portfolio, a list, or {"portfolios": [...]}"""
+    with open(path, "r") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, dict) and "portfolios" in data:
+        data = data["portfolios"]
+    portfolios = data if isinstance(data, list) else [data]
+    return [p for p in portfolios if isinstance(p, dict) and isinstance(p.get("holdings"), list)]
+
+
+def known_portfolios(paths: List[str] = None, lookback_days: float = None) -> List[Dict[str, Any]]:
+    """Portfolios from the configured files plus those submitted as jobs recently"""
+    portfolios = []
+    for path in paths if paths is not None else ([WARM_PORTFOLIOS] if WARM_PORTFOLIOS else []):
+        try:
+            portfolios.extend(load_portfolio_file(path))
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load warm portfolios from {path}: {str(e)}")
+    lookback = WARM_LOOKBACK_DAYS if lookback_days is None else lookback_days
+    if lookback > 0:
+        portfolios.extend(job_queue.store.recent_portfolios(time.time() - lookback * 86400))
+    return portfolios
+
+
+def ticker_budget(quota: Dict[str, Dict[str, float]], share: float = None) -> int:
+    """How many tickers a warm run can cover within its share of the remaining provider budgets"""
+    share = WARM_QUOTA_SHARE if share is None else share
+    serper = quota["serper"]["remaining_today"] * share - SHARED_STAGE_SEARCHES
+    alphavantage = quota["alphavantage"]["remaining_today"] * share
+    return max(0, int(min(serper / SEARCHES_PER_TICKER, alphavantage / (QUOTES_PER_TICKER + HISTORY_PER_TICKER))))
+
+
+def prioritized_holdings(portfolios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Unique holdings, most widely held first, so a capped run covers the most portfolios"""
+    counts = Counter(
+        ticker for portfolio in portfolios
+        for ticker in {holding_slice(h)["ticker"] for h in portfolio.get("holdings", [])}
+    )
+    holdings = unique_holdings(portfolios)
+    return sorted(holdings, key=lambda h: -counts[h["ticker"]])
+
+
+def next_warm_time(now: datetime = None, warm_at: str = None) -> datetime:
+    """The next weekday at the configured warm time (market time zone)"""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    hour, minute = (int(part) for part in (warm_at or WARM_AT).split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class PreMarketWarmer:
+    """Precompute the portfolio-independent work for the next market open.
+
+    Runs the global news and influencer stages, and quotes plus portfolio news for
+    the union of tickers in known portfolios, storing them for the market window of
+    the next open. Requests at the opening bell then find the shared stages and
+    per-ticker news memoized and only run the personalized stages. The number of
+    tickers is capped to a share of the providers' remaining daily budgets, and
+    quotes are fetched in the scheduler's low-priority lane.
+    """
+
+    def __init__(self, pool: CrewPool = None, quota_share: float = None):
+        self.pool = pool or crew_pool
+        self.quota_share = WARM_QUOTA_SHARE if quota_share is None else quota_share
+
+    def plan(self, portfolios: List[Dict[str, Any]], as_of: datetime = None) -> Dict[str, Any]:
+        """What a run would warm, without calling any provider"""
+        as_of = as_of or next_session_open()
+        holdings = prioritized_holdings(portfolios)
+        quota = quota_snapshot()
+        budget = ticker_budget(quota, self.quota_share)
+        return {
+            "as_of": as_of.isoformat(),
+            "window": market_window(at=as_of),
+            "portfolios": len(portfolios),
+            "shared": quota["serper"]["remaining_today"] * self.quota_share >= SHARED_STAGE_SEARCHES,
+            "holdings": holdings[:budget],
+            "skipped": [h["ticker"] for h in holdings[budget:]],
+        }
+
+    async def run(self, portfolios: List[Dict[str, Any]], as_of: datetime = None) -> Dict[str, Any]:
+        """Warm the caches for the window containing `as_of` (default: the next session open)"""
+        started = time.perf_counter()
+        before = quota_snapshot()
+        plan = self.plan(portfolios, as_of)
+        if not plan["shared"]:
+            logging.warning(f"Skipping pre-market warm for {plan['window']}: search budget too low")
+            return {"window": plan["window"], "skipped_reason": "quota"}
+        if plan["skipped"]:
+            logging.warning(f"Warm budget covers {len(plan['holdings'])} tickers; skipping {', '.join(plan['skipped'])}")
+
+        crews = await self.pool.acquire()
+        try:
+            flow = MarketSentimentFlow(
+                {"holdings": plan["holdings"]}, {}, crews=crews, as_of=datetime.fromisoformat(plan["as_of"])
+            )
+            stages = [flow.collect_global_news(), flow.monitor_key_influencers()]
+            if plan["holdings"]:
+                stages.append(flow.analyze_portfolio_news())
+            # Daily bars are not tied to a market window; refreshing them leaves only the risk math for requests
+            histories = refresh_price_histories([h["ticker"] for h in plan["holdings"]] + [RISK_BENCHMARK])
+            results, refreshed = await asyncio.gather(asyncio.gather(*stages), histories)
+        finally:
+            self.pool.release(crews)
+
+        after = quota_snapshot()
+        summary = {
+            "window": plan["window"],
+            "portfolios": plan["portfolios"],
+            "tickers": len(plan["holdings"]),
+            "skipped": plan["skipped"],
+            "stages": dict(zip(("global_news", "influencer_data", "portfolio_news"), (bool(r) for r in results))),
+            "price_histories_refreshed": len(refreshed),
+            "quota_used": {name: after[name]["used_today"] - before[name]["used_today"] for name in after},
+            "seconds": round(time.perf_counter() - started, 1),
+        }
+        logging.info(f"Pre-market warm for {summary['window']}: {summary}")
+        return summary
+
+    async def run_forever(self, warm_at: str = None):
+        """Warm before every session open (the FastAPI startup task)"""
+        while True:
+            at = next_warm_time(warm_at=warm_at)
+            await asyncio.sleep(max(0.0, (at - datetime.now(MARKET_TZ)).total_seconds()))
+            # Queue for capacity like a background job instead of competing with requests
+            await crew_executor.admit()
+            try:
+                await self.run(known_portfolios(), next_session_open(at))
+            except Exception as e:
+                logging.error(f"Pre-market warm failed: {str(e)}")
+            finally:
+                crew_executor.release()
+
+
+warmer = PreMarketWarmer()
@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import tempfile
+
+# Caches are created at import time; keep them out of the working tree
+os.environ.setdefault("MARKETPULSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "marketpulse-tests"))
@@ -0,0 +1,167 @@
+# tests/test_batch.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from marketpulse.batch import BatchAnalysis  # noqa: E402
+from marketpulse.flows.market_analysis_flow import MarketSentimentFlow  # noqa: E402
+from marketpulse.utils.shared_results import shared_stage_store  # noqa: E402
+from marketpulse.utils.stage_memo import stage_memo  # noqa: E402
+
+
+class FakePool:
+    """Hands out stand-in crew sets and counts them back in"""
+
+    def __init__(self):
+        crew = SimpleNamespace(
+            tasks=[SimpleNamespace(description="task", expected_output="json")],
+            agents=[SimpleNamespace(llm=SimpleNamespace(model="fake-model", temperature=0))]
+        )
+        self.crews = SimpleNamespace(**{name: crew for name in (
+            "crew_instance", "global_news_crew", "portfolio_news_crew",
+            "influencer_crew", "sentiment_crew", "recommendation_crew"
+        )})
+        self.out = 0
+
+    async def acquire(self):
+        self.out += 1
+        return self.crews
+
+    def release(self, crews):
+        self.out -= 1
+
+
+@pytest.fixture
+def stage_calls(monkeypatch):
+    """Run every stage against a fake crew, recording (stage, tickers) per crew run"""
+    calls = []
+
+    async def run_crew_stage(self, stage, crew, inputs=None, shard=None):
+        await asyncio.sleep(0)
+        tickers = sorted(h["ticker"] for h in (inputs or {}).get("portfolio", {}).get("holdings", []))
+        calls.append((stage, tickers))
+        if stage == "portfolio_news":
+            return {
+                "company_news": [{"ticker": ticker, "news": f"{ticker} news"} for ticker in tickers],
+                "sector_news": [],
+            }
+        if stage == "recommendations" and "FAIL" in tickers:
+            raise RuntimeError("model refused")
+        return {"stage": stage, "tickers": tickers}
+
+    async def no_quotes(self):
+        self.state.quotes = {}
+        return {}
+
+    async def no_risk_metrics(self):
+        return None
+
+    monkeypatch.setattr(MarketSentimentFlow, "_run_crew_stage", run_crew_stage)
+    monkeypatch.setattr(MarketSentimentFlow, "_fetch_quotes", no_quotes)
+    monkeypatch.setattr(MarketSentimentFlow, "_compute_risk_metrics", no_risk_metrics)
+    monkeypatch.setattr(stage_memo, "enabled", False)
+    shared_stage_store.clear()
+    yield calls
+    shared_stage_store.clear()
+
+
+def item(id, *tickers):
+    return {
+        "id": id,
+        "portfolio": {"holdings": [{"ticker": t, "sector": "Technology", "allocation": 10} for t in tickers]},
+        "preferences": {"risk_tolerance": "moderate"},
+    }
+
+
+def run_batch(items, pool=None, concurrency=2):
+    async def collect():
+        return [json.loads(line) async for line in BatchAnalysis(items, pool=pool or FakePool(), concurrency=concurrency).stream()]
+
+    return asyncio.run(collect())
+
+
+def test_shared_stages_and_news_run_once_for_the_whole_batch(stage_calls):
+    lines = run_batch([item("a", "AAPL", "MSFT"), item("b", "MSFT", "NVDA"), item("c", "AAPL")])
+
+    runs = [stage for stage, _ in stage_calls]
+    assert runs.count("global_news") == 1
+    assert runs.count("influencer_data") == 1
+    # Portfolio news runs once over the union of holdings, never per portfolio
+    assert [tickers for stage, tickers in stage_calls if stage == "portfolio_news"] == [["AAPL", "MSFT", "NVDA"]]
+    assert runs.count("sentiment_analysis") == 3
+    assert runs.count("recommendations") == 3
+
+    assert lines[0]["type"] == "status"
+    assert (lines[0]["portfolios"], lines[0]["unique_tickers"], lines[0]["total_holdings"]) == (3, 3, 5)
+    assert lines[1]["type"] == "shared_complete"
+    assert set(lines[1]["data"]) == {"global_news", "influencer_data"}
+
+
+def test_one_line_per_portfolio(stage_calls):
+    items = [item(f"p{i}", "AAPL", f"T{i}") for i in range(5)]
+    lines = run_batch(items)
+
+    portfolios = [line for line in lines if line["type"].startswith("portfolio_")]
+    assert len(portfolios) == len(items)
+    assert sorted((line["index"], line["id"]) for line in portfolios) == [(i, f"p{i}") for i in range(5)]
+    assert all(line["type"] == "portfolio_complete" for line in portfolios)
+    # Each portfolio's recommendations are its own, with the shared stages left out
+    for line in portfolios:
+        assert set(line["data"]) >= {"portfolio_news", "sentiment_analysis", "recommendations"}
+        assert not set(line["data"]) & {"global_news", "influencer_data"}
+        assert line["data"]["recommendations"]["tickers"] == sorted(["AAPL", f"T{line['index']}"])
+    assert lines[-1]["type"] == "complete"
+    assert (lines[-1]["succeeded"], lines[-1]["failed"]) == (5, 0)
+
+
+def test_a_failing_portfolio_does_not_abort_the_batch(stage_calls):
+    pool = FakePool()
+    lines = run_batch([item("ok-1", "AAPL"), item("bad", "FAIL"), item("ok-2", "MSFT")], pool=pool)
+
+    records = {line["id"]: line for line in lines if line["type"].startswith("portfolio_")}
+    assert records["bad"]["type"] == "portfolio_error"
+    assert records["bad"]["message"]
+    assert records["ok-1"]["type"] == records["ok-2"]["type"] == "portfolio_complete"
+    assert lines[-1]["type"] == "complete"
+    assert (lines[-1]["succeeded"], lines[-1]["failed"]) == (2, 1)
+    assert pool.out == 0
+
+
+def test_a_raising_portfolio_is_reported_and_the_rest_complete(stage_calls, monkeypatch):
+    analyze_one = BatchAnalysis._analyze_one
+
+    async def flaky(self, index, item, shared):
+        if item["id"] == "bad":
+            raise RuntimeError("crew set broke")
+        return await analyze_one(self, index, item, shared)
+
+    monkeypatch.setattr(BatchAnalysis, "_analyze_one", flaky)
+    lines = run_batch([item("ok-1", "AAPL"), item("bad", "MSFT"), item("ok-2", "NVDA")])
+
+    records = {line["id"]: line for line in lines if line["type"].startswith("portfolio_")}
+    assert records["bad"] == {"type": "portfolio_error", "index": 1, "id": "bad", "message": "crew set broke"}
+    assert records["ok-1"]["type"] == records["ok-2"]["type"] == "portfolio_complete"
+    assert (lines[-1]["succeeded"], lines[-1]["failed"]) == (2, 1)
+
+
+def test_shared_failure_aborts_before_any_portfolio(stage_calls, monkeypatch):
+    run_crew_stage = MarketSentimentFlow._run_crew_stage
+
+    async def no_global_news(self, stage, crew, inputs=None, shard=None):
+        if stage == "global_news":
+            return None
+        return await run_crew_stage(self, stage, crew, inputs, shard)
+
+    monkeypatch.setattr(MarketSentimentFlow, "_run_crew_stage", no_global_news)
+    pool = FakePool()
+    lines = run_batch([item("a", "AAPL"), item("b", "MSFT")], pool=pool)
+
+    assert [line["type"] for line in lines] == ["status", "error"]
+    assert "batch aborted" in lines[-1]["message"]
+    assert not [stage for stage, _ in stage_calls if stage in ("sentiment_analysis", "recommendations")]
+    assert pool.out == 0
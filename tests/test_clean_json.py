@@ -0,0 +1,58 @@
+# tests/test_clean_json.py
+
+import pytest
+
+from marketpulse.clean_json import clean_and_parse_json, extract_json, extract_json_string
+
+
+def test_direct():
+    assert extract_json('{"a": 1, "b": [1, 2]}') == ({"a": 1, "b": [1, 2]}, ())
+
+
+def test_code_fence():
+    data, repairs = extract_json('```json\n{"a": 1}\n```')
+    assert data == {"a": 1}
+    assert repairs == ("code_fence",)
+
+
+def test_prose_around_the_object():
+    data, repairs = extract_json('Here is the analysis: {"a": {"b": 2}} Let me know if you need more.')
+    assert data == {"a": {"b": 2}}
+    assert repairs == ("prose",)
+
+
+def test_braces_in_leading_prose():
+    data, repairs = extract_json('Using {placeholder} values:\n{"a": 1}')
+    assert data == {"a": 1}
+    assert "prose" in repairs
+
+
+def test_trailing_commas_outside_strings_only():
+    data, repairs = extract_json('{"items": [1, 2,], "note": "a, }", "more": {"x": 1,},}')
+    assert data == {"items": [1, 2], "note": "a, }", "more": {"x": 1}}
+    assert repairs == ("trailing_comma",)
+
+
+def test_escaped_document():
+    data, repairs = extract_json('{\\"summary\\": \\"ok\\", \\"items\\": [1]}')
+    assert data == {"summary": "ok", "items": [1]}
+    assert "escaped_quotes" in repairs
+
+
+def test_raw_control_characters_in_strings():
+    data, repairs = extract_json('{"text": "line one\nline two\tend"}')
+    assert data == {"text": "line one\nline two\tend"}
+    assert repairs == ()
+
+
+@pytest.mark.parametrize("response", ["no json here", '{"a": ', None])
+def test_failures_raise_value_error(response):
+    with pytest.raises(ValueError):
+        extract_json(response)
+
+
+def test_wrappers():
+    assert extract_json_string('```\n{"a": 1,}\n```') == '{"a": 1}'
+    assert clean_and_parse_json('Result: {"a": 1}') == {"a": 1}
+    with pytest.raises(ValueError, match="Failed to parse JSON after cleaning"):
+        clean_and_parse_json("nothing")
@@ -0,0 +1,67 @@
+# tests/test_cli.py
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from marketpulse import cli
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLES = ROOT / "examples"
+HEAVY_MODULES = ("crewai", "langchain", "litellm", "opentelemetry", "aiohttp", "numpy")
+
+VALIDATE_ONLY = f"""
+import sys
+from marketpulse import cli
+sys.argv = ["marketpulse", "-p", sys.argv[1], "-pref", sys.argv[2], "--validate-only"]
+cli.main()
+print("LOADED", [name for name in {HEAVY_MODULES!r} if name in sys.modules])
+"""
+
+
+def test_validate_only_does_not_import_the_agent_stack():
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    result = subprocess.run(
+        [sys.executable, "-c", VALIDATE_ONLY, str(EXAMPLES / "portfolio.json"), str(EXAMPLES / "preferences.json")],
+        capture_output=True, text=True, env=env, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Portfolio and preferences are valid." in result.stdout
+    assert "LOADED []" in result.stdout
+
+
+def test_validate_portfolio():
+    assert cli.validate_portfolio({"holdings": [{"ticker": "AAPL"}]}) == []
+    assert cli.validate_portfolio([]) == ["portfolio must be a mapping with a 'holdings' list"]
+    assert cli.validate_portfolio({"holdings": []}) == ["portfolio.holdings must be a non-empty list"]
+    assert cli.validate_portfolio({"holdings": ["AAPL", {"ticker": " "}]}) == [
+        "holdings[0] must be a mapping", "holdings[1] is missing a ticker"
+    ]
+
+
+def test_validate_preferences():
+    assert cli.validate_preferences({"risk_tolerance": "moderate", "investment_horizon": "long"}) == []
+    assert cli.validate_preferences({"risk_tolerance": "moderate", "preferred_sectors": "Technology"}) == [
+        "preferences.investment_horizon is required", "preferences.preferred_sectors must be a list"
+    ]
+    assert cli.validate_preferences(None) == ["preferences must be a mapping"]
+
+
+def test_unparseable_file_exits_with_message(tmp_path, capsys):
+    path = tmp_path / "portfolio.json"
+    path.write_text("{not json")
+    with pytest.raises(SystemExit) as exit_info:
+        cli.load_portfolio(str(path))
+    assert exit_info.value.code == 1
+    assert "Could not parse portfolio file" in capsys.readouterr().out
+
+
+def test_yaml_files_are_loaded(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "preferences.yaml"
+    path.write_text("risk_tolerance: moderate\ninvestment_horizon: long\n")
+    assert cli.load_preferences(str(path)) == {"risk_tolerance": "moderate", "investment_horizon": "long"}
+    assert cli.validate_inputs(str(EXAMPLES / "portfolio.json"), str(path))
@@ -0,0 +1,42 @@
+# tests/test_crew_executor.py
+
+import asyncio
+
+from marketpulse.utils.crew_executor import CrewExecutor
+
+
+def test_slots_are_admitted_up_to_the_limit():
+    executor = CrewExecutor(max_workers=1, max_analyses=4)
+    assert executor.try_admit(3)
+    assert not executor.try_admit(2)
+    assert executor.try_admit()
+    assert executor.active_analyses == 4
+    assert not executor.try_admit()
+
+    executor.release(3)
+    assert executor.active_analyses == 1
+    assert executor.try_admit(3)
+
+
+def test_release_never_goes_negative():
+    executor = CrewExecutor(max_workers=1, max_analyses=2)
+    executor.release(5)
+    assert executor.active_analyses == 0
+
+
+def test_admit_waits_for_enough_slots():
+    executor = CrewExecutor(max_workers=1, max_analyses=2)
+    executor.try_admit(2)
+
+    async def scenario():
+        waiter = asyncio.create_task(executor.admit(poll=0.01, slots=2))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        executor.release()
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        executor.release()
+        await asyncio.wait_for(waiter, timeout=1)
+
+    asyncio.run(scenario())
+    assert executor.active_analyses == 2
@@ -0,0 +1,170 @@
+# tests/test_crew_pool.py
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from marketpulse import crew_pool as crew_pool_module  # noqa: E402
+from marketpulse.crew_pool import CrewPool, CrewSet  # noqa: E402
+
+
+class FakeCrewSet:
+    """Stands in for CrewSet: slow to build, records the thread it was built on"""
+
+    build_seconds = 0.0
+
+    def __init__(self):
+        time.sleep(self.build_seconds)
+        self.built_on = threading.current_thread()
+        self.busy = False
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(crew_pool_module, "CrewSet", FakeCrewSet)
+    monkeypatch.setattr(FakeCrewSet, "build_seconds", 0.0)
+    return CrewPool(size=2)
+
+
+def test_acquire_hands_out_warmed_sets_and_release_returns_them(pool):
+    pool.warm()
+    assert pool.available == 2
+
+    async def run():
+        first, second = await pool.acquire(), await pool.acquire()
+        pool.release(first)
+        return first, second, await pool.acquire()
+
+    first, second, again = asyncio.run(run())
+    assert first is not second
+    assert again is first
+    assert first.resets == 1
+    assert pool.overflow_builds == 0
+
+
+def test_overflow_sets_are_built_off_the_event_loop(pool):
+    FakeCrewSet.build_seconds = 0.2
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        ticker = asyncio.create_task(tick())
+        crews = await asyncio.gather(pool.acquire(), pool.acquire(), pool.acquire())
+        ticker.cancel()
+        return crews, threading.current_thread()
+
+    crews, loop_thread = asyncio.run(run())
+    assert pool.overflow_builds == 3
+    assert all(crew_set.built_on is not loop_thread for crew_set in crews)
+    # The loop kept running while the sets were built
+    assert len(ticks) >= 10
+
+    for crew_set in crews:
+        pool.release(crew_set)
+    # Sets beyond the pool size are dropped
+    assert pool.available == 2
+
+
+def test_busy_sets_are_discarded(pool):
+    pool.warm()
+
+    async def run():
+        return await pool.acquire()
+
+    crew_set = asyncio.run(run())
+    crew_set.busy = True
+    pool.release(crew_set)
+    assert pool.available == 1
+    assert crew_set.resets == 0
+
+
+@pytest.fixture
+def crew_set(monkeypatch):
+    # The tools and LLMs refuse to build without keys; nothing is called
+    monkeypatch.setenv("SERPER_API_KEY", "fake-key-for-tests")
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key-for-tests")
+    return CrewSet()
+
+
+def test_crew_set_is_busy_while_a_kickoff_runs(crew_set):
+    started, release = threading.Event(), threading.Event()
+
+    def kickoff(inputs=None):
+        started.set()
+        release.wait(5)
+        return "done"
+
+    thread = threading.Thread(target=crew_set.kickoff, args=(SimpleNamespace(kickoff=kickoff),))
+    thread.start()
+    started.wait(5)
+    assert crew_set.busy
+
+    pool = CrewPool(size=1)
+    pool.release(crew_set)
+    assert pool.available == 0
+
+    release.set()
+    thread.join(5)
+    assert not crew_set.busy
+
+    crew_set.sentiment_crew.tasks[0].output = "previous analysis"
+    pool.release(crew_set)
+    assert pool.available == 1
+    assert crew_set.sentiment_crew.tasks[0].output is None
+
+
+def test_shard_crews_are_built_off_the_loop_and_reused(crew_set, monkeypatch):
+    from marketpulse.flows import market_analysis_flow as flow_module
+
+    built, used = [], []
+
+    def build_shard_crew():
+        built.append(threading.current_thread())
+        return SimpleNamespace(usage_metrics=None, agents=[], tasks=[SimpleNamespace(output=None)])
+
+    async def run_crew_stage(self, stage, crew, inputs=None, shard=None):
+        assert crew.tasks[0].output is None
+        crew.tasks[0].output = "shard output"
+        used.append(crew)
+        await asyncio.sleep(0.01)
+        return {"company_news": [{"ticker": h["ticker"]} for h in inputs["portfolio"]["holdings"]], "sector_news": []}
+
+    async def prefetched_quotes(self):
+        return {}
+
+    monkeypatch.setattr(crew_set.crew_instance, "portfolio_news_shard_crew", build_shard_crew)
+    monkeypatch.setattr(flow_module.MarketSentimentFlow, "_run_crew_stage", run_crew_stage)
+    monkeypatch.setattr(flow_module.MarketSentimentFlow, "_prefetched_quotes", prefetched_quotes)
+    monkeypatch.setattr(flow_module, "SHARD_CONCURRENCY", 2)
+
+    holdings = [
+        {"ticker": f"T{i}", "company": f"Company {i}", "sector": ("Tech", "Energy", "Health")[i % 3]} for i in range(30)
+    ]
+    flow = flow_module.MarketSentimentFlow({"holdings": holdings}, {}, crews=crew_set)
+
+    async def run():
+        first = await flow._analyze_holdings_news(holdings)
+        crew_set.reset()
+        second = await flow._analyze_holdings_news(holdings)
+        return first, second, threading.current_thread()
+
+    first, second, loop_thread = asyncio.run(run())
+    assert len(first["company_news"]) == len(second["company_news"]) == 30
+    # At most one crew per concurrently running shard, built in the executor and reused by the next analysis
+    assert len(built) == 2
+    assert loop_thread not in built
+    assert len(used) > len(built)
+    assert {id(crew) for crew in used} == {id(crew) for crew in crew_set._shard_crews}
@@ -0,0 +1,109 @@
+# tests/test_http_client.py
+
+import asyncio
+import random
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+pytest.importorskip("requests")
+
+from aiohttp import web  # noqa: E402
+
+from marketpulse.tools.http_client import AsyncHttpClient, HttpError  # noqa: E402
+
+
+def run_against(responses, client_kwargs=None, request=None):
+    """Serve the given (status, body or delay) responses in order; returns the result and the requests served"""
+    served = []
+
+    async def handler(http_request):
+        status, body = responses[min(len(served), len(responses) - 1)]
+        served.append(http_request.method)
+        if status == "slow":
+            await asyncio.sleep(body)
+            return web.json_response({"slow": True})
+        return web.json_response(body, status=status) if isinstance(body, dict) else web.Response(text=body, status=status)
+
+    async def main():
+        app = web.Application()
+        app.router.add_route("*", "/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        client = AsyncHttpClient(**({"retries": 2, "backoff": 0.5, "timeout": 5} | (client_kwargs or {})))
+        delays = []
+        client._delay = lambda attempt: delays.append(attempt) or 0
+        try:
+            result = await (request or (lambda c, url: c.get_json(url)))(client, f"http://127.0.0.1:{port}/")
+        except HttpError as e:
+            result = e
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return result, served, delays
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_transient_statuses(status):
+    result, served, delays = run_against([(status, {"error": "busy"}), (200, {"ok": True})])
+    assert result == {"ok": True}
+    assert len(served) == 2
+    assert delays == [0]
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404])
+def test_client_errors_are_not_retried(status):
+    result, served, delays = run_against([(status, {"error": "bad request"}), (200, {"ok": True})])
+    assert isinstance(result, HttpError)
+    assert str(status) in str(result)
+    assert len(served) == 1
+    assert delays == []
+
+
+def test_attempts_are_capped():
+    result, served, delays = run_against([(503, "<html>down</html>")], client_kwargs={"retries": 2})
+    assert isinstance(result, HttpError)
+    assert "after 3 attempts" in str(result)
+    assert len(served) == 3
+    # Backoff grows with the attempt number; there is no wait after the last attempt
+    assert delays == [0, 1]
+
+
+def test_timeouts_are_retried():
+    result, served, _ = run_against([("slow", 1.0), (200, {"ok": True})], client_kwargs={"timeout": 0.2})
+    assert result == {"ok": True}
+    assert len(served) == 2
+
+    result, served, _ = run_against([("slow", 1.0)], client_kwargs={"timeout": 0.2, "retries": 1})
+    assert isinstance(result, HttpError)
+    assert len(served) == 2
+
+
+def test_invalid_json_is_not_retried():
+    result, served, _ = run_against([(200, "<html>not json</html>")])
+    assert isinstance(result, HttpError)
+    assert len(served) == 1
+
+
+def test_post_sends_json_body():
+    async def post(client, url):
+        return await client.post_json(url, {"q": "news"})
+
+    result, served, _ = run_against([(200, {"organic": []})], request=post)
+    assert result == {"organic": []}
+    assert served == ["POST"]
+
+
+def test_backoff_uses_full_jitter():
+    client = AsyncHttpClient(backoff=0.5)
+    random.seed(3)
+    delays = [[client._delay(attempt) for _ in range(200)] for attempt in range(3)]
+    for attempt, samples in enumerate(delays):
+        assert all(0 <= delay <= 0.5 * 2 ** attempt for delay in samples)
+        # Spread over the whole range rather than a fixed step
+        assert max(samples) > 0.4 * 2 ** attempt and min(samples) < 0.1 * 2 ** attempt
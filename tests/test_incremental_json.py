@@ -0,0 +1,65 @@
+# tests/test_incremental_json.py
+
+import json
+
+import pytest
+
+from marketpulse.utils.incremental_json import ArrayItemParser
+
+DOCUMENT = json.dumps({
+    "overall": "neutral, {not an item}",
+    "major_events": [
+        {"event": "Rate decision \"held\"", "impact": {"level": "high"}},
+        {"event": "CPI [hot]", "impact": {"level": "medium"}},
+    ],
+    "tickers": ["AAPL", "MSFT"],
+    "sector_news": [{"sector": "Energy", "developments": [{"development": "OPEC"}]}],
+})
+EXPECTED = [
+    ("major_events", 0, {"event": "Rate decision \"held\"", "impact": {"level": "high"}}),
+    ("major_events", 1, {"event": "CPI [hot]", "impact": {"level": "medium"}}),
+    ("sector_news", 0, {"sector": "Energy", "developments": [{"development": "OPEC"}]}),
+]
+
+
+def feed_in_chunks(parser, text, size):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(DOCUMENT)])
+def test_items_are_returned_whatever_the_chunking(size):
+    parser = ArrayItemParser(marker=None)
+    assert feed_in_chunks(parser, DOCUMENT, size) == EXPECTED
+    assert parser.done
+
+
+def test_items_arrive_as_soon_as_they_close():
+    parser = ArrayItemParser(marker=None)
+    first_end = DOCUMENT.index("}}") + 2
+    assert parser.feed(DOCUMENT[:first_end - 1]) == []
+    assert parser.feed(DOCUMENT[first_end - 1:first_end]) == [EXPECTED[0]]
+
+
+@pytest.mark.parametrize("size", [1, 5, 200])
+def test_text_before_the_marker_is_skipped(size):
+    response = (
+        'Thought: I will call the tool with {"query": "markets"}\n'
+        'Action: search\n'
+        f"Thought: I now know the final answer\nFinal Answer: ```json\n{DOCUMENT}\n```"
+    )
+    assert feed_in_chunks(ArrayItemParser(), response, size) == EXPECTED
+
+
+def test_nothing_is_returned_after_the_document_ends():
+    parser = ArrayItemParser(marker=None)
+    parser.feed(DOCUMENT)
+    assert parser.feed('{"more": [{"a": 1}]}') == []
+
+
+def test_unparseable_items_are_skipped():
+    parser = ArrayItemParser(marker=None)
+    items = parser.feed('{"items": [{"a": 1,}, {"b": 2}]}')
+    assert items == [("items", 1, {"b": 2})]
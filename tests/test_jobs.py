@@ -0,0 +1,145 @@
+# tests/test_jobs.py
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from marketpulse.jobs import DONE, FAILED, RUNNING, JobQueue, JobStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def queue_with_events(store, monkeypatch, events):
+    queue = JobQueue(store=store, workers=1)
+
+    async def events_for(kind, payload):
+        for event in events:
+            yield event
+
+    monkeypatch.setattr(queue, "_events_for", events_for)
+    return queue
+
+
+def job_events(store, job_id):
+    return [json.loads(row["data"]) for row in store.events_after(job_id, 0)]
+
+
+def stream(queue, job_id, last_event_id=0):
+    async def collect():
+        return [chunk async for chunk in queue.stream_events(job_id, last_event_id)]
+    return asyncio.run(collect())
+
+
+def test_run_records_events_and_result(store, monkeypatch):
+    job_id = store.create("analysis", {"portfolio": {}, "preferences": {}}, "hash")
+    queue = queue_with_events(store, monkeypatch, [
+        {"type": "status", "message": "Starting"},
+        {"type": "task_complete", "task": "recommendations", "data": {"summary": "ok"}},
+    ])
+    asyncio.run(queue._run(job_id))
+
+    job = store.get(job_id)
+    assert job["status"] == DONE
+    assert job["result"] == {"recommendations": {"summary": "ok"}}
+    assert [row["seq"] for row in store.events_after(job_id, 0)] == [1, 2]
+    # A finished job's stream replays the events after Last-Event-ID and ends
+    assert [chunk.split("\n")[0] for chunk in stream(queue, job_id, 1)] == ["id: 2"]
+
+
+
+def test_failed_run_keeps_partial_result(store, monkeypatch):
+    job_id = store.create("analysis", {}, "hash")
+    queue = queue_with_events(store, monkeypatch, [
+        {"type": "task_complete", "task": "global_news", "data": {"major_events": []}},
+        {"type": "error", "message": "Failed to analyze market sentiment"},
+    ])
+    asyncio.run(queue._run(job_id))
+
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert job["error"] == "Failed to analyze market sentiment"
+    assert job["result"] == {"global_news": {"major_events": []}}
+
+
+def test_recovered_jobs_continue_event_ids(store, monkeypatch):
+    job_id = store.create("analysis", {}, "hash")
+    store.set_status(job_id, RUNNING)
+    for seq in (1, 2, 3):
+        store.append_event(job_id, seq, {"type": "status", "message": f"old {seq}"})
+
+    assert store.recover() == [job_id]
+    assert store.events_after(job_id, 0) == []
+    assert store.get(job_id)["event_base"] == 3
+
+    queue = queue_with_events(store, monkeypatch, [{"type": "status", "message": f"new {n}"} for n in (1, 2)])
+    asyncio.run(queue._run(job_id))
+    # A client that saw event 2 of the interrupted run resumes with the whole rerun
+    assert [row["seq"] for row in store.events_after(job_id, 2)] == [4, 5]
+    assert [event["message"] for event in job_events(store, job_id)] == ["new 1", "new 2"]
+
+
+def test_recovering_twice_keeps_ids_increasing(store):
+    job_id = store.create("analysis", {}, "hash")
+    store.append_event(job_id, 1, {})
+    store.append_event(job_id, 2, {})
+    store.recover()
+    store.append_event(job_id, 3, {})
+    store.recover()
+    assert store.get(job_id)["event_base"] == 3
+    store.recover()
+    assert store.get(job_id)["event_base"] == 3
+
+
+def test_submit_reuses_identical_requests(store):
+    queue = JobQueue(store=store, workers=1)
+
+    async def submit_twice():
+        queue._queue = asyncio.Queue()
+        queue._tasks = [asyncio.create_task(asyncio.sleep(0))]
+        first = await queue.submit("analysis", {"portfolio": {"holdings": []}})
+        second = await queue.submit("analysis", {"portfolio": {"holdings": []}})
+        return first, second
+
+    first, second = asyncio.run(submit_twice())
+    assert not first["reused"] and second["reused"]
+    assert first["job_id"] == second["job_id"]
+
+
+def test_streaming_finished_jobs_leaves_no_signals(store, monkeypatch):
+    job_id = store.create("analysis", {}, "hash")
+    queue = queue_with_events(store, monkeypatch, [{"type": "status", "message": "Starting"}])
+    asyncio.run(queue._run(job_id))
+
+    for _ in range(3):
+        assert len(stream(queue, job_id)) == 1
+    assert stream(queue, "unknown") == []
+    assert queue._signals == {}
+
+
+def test_worker_survives_an_unreadable_job(store, monkeypatch):
+    bad = store.create("analysis", {}, "bad")
+    good = store.create("analysis", {}, "good")
+    store._execute("UPDATE jobs SET payload = ? WHERE id = ?", ("not json", bad))
+    queue = queue_with_events(store, monkeypatch, [{"type": "status", "message": "Starting"}])
+
+    async def run():
+        queue.start()
+        try:
+            for _ in range(200):
+                if store.get(good)["status"] == DONE:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+    assert store.get(good)["status"] == DONE
+    row = store._execute("SELECT status, error FROM jobs WHERE id = ?", (bad,))[0]
+    assert row["status"] == FAILED
+    assert row["error"]
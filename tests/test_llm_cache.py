@@ -0,0 +1,100 @@
+# tests/test_llm_cache.py
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai import LLM  # noqa: E402
+from crewai.utilities.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus  # noqa: E402
+
+from marketpulse.tools.cache import ToolCache  # noqa: E402
+from marketpulse.utils import llm_cache  # noqa: E402
+from marketpulse.utils.llm_cache import CachedLLM, LLMCacheHitEvent, LLMResponseCache  # noqa: E402
+from marketpulse.utils.metrics import LLM_CACHE_LOOKUPS  # noqa: E402
+
+MODEL = "gpt-4o-mini"
+MESSAGES = [{"role": "system", "content": "You analyze sentiment"}, {"role": "user", "content": "Task"}]
+
+
+@pytest.fixture
+def llm_calls(tmp_path, monkeypatch):
+    """Calls reaching the underlying LLM, which answers with the next queued response"""
+    cache = LLMResponseCache(ToolCache("llm-test", ttl=60, root=str(tmp_path)))
+    cache.enabled = True
+    monkeypatch.setattr(llm_cache, "llm_response_cache", cache)
+    calls, responses = [], []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        calls.append(messages)
+        return responses.pop(0)
+
+    monkeypatch.setattr(LLM, "call", call)
+    return calls, responses
+
+
+@pytest.fixture
+def events():
+    seen = []
+    with crewai_event_bus.scoped_handlers():
+        for event_type in (LLMCallStartedEvent, LLMCallCompletedEvent, LLMCacheHitEvent):
+            crewai_event_bus.on(event_type)(lambda source, event: seen.append(event.type))
+        yield seen
+
+
+def lookups(result):
+    return LLM_CACHE_LOOKUPS.value(model=MODEL, result=result)
+
+
+def test_miss_calls_the_llm_and_stores_the_response(llm_calls, events):
+    calls, responses = llm_calls
+    responses.append('{"overall_market_sentiment": "neutral"}')
+    misses = lookups("miss")
+
+    llm = CachedLLM(model=MODEL, temperature=0)
+    assert llm.call(MESSAGES) == '{"overall_market_sentiment": "neutral"}'
+    assert len(calls) == 1
+    assert lookups("miss") == misses + 1
+    assert "llm_cache_hit" not in events
+
+
+def test_hit_answers_without_a_call_or_call_events(llm_calls, events):
+    calls, responses = llm_calls
+    responses.append("cached answer")
+    llm = CachedLLM(model=MODEL, temperature=0)
+    llm.call(MESSAGES)
+    hits = lookups("hit")
+
+    assert llm.call(MESSAGES) == "cached answer"
+    assert len(calls) == 1
+    assert lookups("hit") == hits + 1
+    assert events == ["llm_cache_hit"]
+
+
+def test_key_covers_messages_and_sampling(llm_calls):
+    calls, responses = llm_calls
+    responses.extend(["first", "second", "third"])
+    CachedLLM(model=MODEL, temperature=0).call(MESSAGES)
+    CachedLLM(model=MODEL, temperature=0).call(MESSAGES + [{"role": "user", "content": "Observation: tool output"}])
+    CachedLLM(model=MODEL, temperature=0.7).call(MESSAGES)
+    assert len(calls) == 3
+
+
+def test_tool_call_results_are_not_cached(llm_calls):
+    calls, responses = llm_calls
+    # With native function calling, call() returns the tool's result instead of text
+    responses.extend([{"price": "190.00"}, {"price": "191.00"}])
+    llm = CachedLLM(model=MODEL, temperature=0)
+    tools = [{"type": "function", "function": {"name": "stock_quote", "parameters": {}}}]
+
+    assert llm.call(MESSAGES, tools=tools, available_functions={"stock_quote": lambda: None}) == {"price": "190.00"}
+    assert llm.call(MESSAGES, tools=tools, available_functions={"stock_quote": lambda: None}) == {"price": "191.00"}
+    assert len(calls) == 2
+
+
+def test_empty_responses_are_not_cached(llm_calls):
+    calls, responses = llm_calls
+    responses.extend(["  ", "answer"])
+    llm = CachedLLM(model=MODEL, temperature=0)
+    llm.call(MESSAGES)
+    assert llm.call(MESSAGES) == "answer"
+    assert len(calls) == 2
@@ -0,0 +1,76 @@
+# tests/test_metrics.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from marketpulse.utils import metrics
+from marketpulse.utils.metrics import Registry
+
+
+def test_counter_and_gauge_values():
+    registry = Registry()
+    counter = registry.counter("test_total", "A counter", ["stage"])
+    counter.inc(stage="news")
+    counter.inc(2.5, stage="news")
+    assert counter.value(stage="news") == 3.5
+    assert counter.value(stage="other") == 0
+
+    gauge = registry.gauge("test_gauge", "A gauge")
+    gauge.set(5)
+    gauge.dec(2)
+    assert gauge.value() == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("test_seconds", "A histogram", ["stage"], buckets=(1, 0.1))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, stage="news")
+
+    assert histogram.totals() == {("news",): (4.05, 4)}
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{stage="news",le="0.1"} 1',
+        'test_seconds_bucket{stage="news",le="1.0"} 3',
+        'test_seconds_bucket{stage="news",le="+Inf"} 4',
+        'test_seconds_sum{stage="news"} 4.05',
+        'test_seconds_count{stage="news"} 4',
+    ]
+
+
+def test_histogram_time_observes_on_error():
+    histogram = Registry().histogram("test_seconds", "A histogram", ["outcome"])
+    with pytest.raises(RuntimeError):
+        with histogram.time(outcome="error"):
+            raise RuntimeError("boom")
+    assert histogram.totals()[("error",)][1] == 1
+
+
+def test_registry_render():
+    registry = Registry()
+    registry.counter("test_total", "Requests", ["path"]).inc(path='say "hi"\n')
+    registry.register_collector(lambda: [("test_cache_hits", "gauge", "Cache hits", [({"cache": "quotes"}, 7)])])
+
+    assert registry.render() == "\n".join([
+        "# HELP test_total Requests",
+        "# TYPE test_total counter",
+        'test_total{path="say \\"hi\\"\\n"} 1',
+        "# HELP test_cache_hits Cache hits",
+        "# TYPE test_cache_hits gauge",
+        'test_cache_hits{cache="quotes"} 7',
+    ]) + "\n"
+
+
+def test_record_token_usage(monkeypatch):
+    registry = Registry()
+    for name in ("LLM_TOKENS", "LLM_REQUESTS", "LLM_COST"):
+        monkeypatch.setattr(metrics, name, registry.counter(name.lower(), name, getattr(metrics, name).labelnames))
+
+    usage = SimpleNamespace(prompt_tokens=1_000_000, completion_tokens=500_000, cached_prompt_tokens=None, successful_requests=3)
+    metrics.record_token_usage("news", "openai/gpt-4o-mini", usage)
+    metrics.record_token_usage("news", "gpt-4o-mini", None)
+
+    assert metrics.LLM_TOKENS.value(stage="news", kind="prompt") == 1_000_000
+    assert metrics.LLM_TOKENS.value(stage="news", kind="cached_prompt") == 0
+    assert metrics.LLM_REQUESTS.value(stage="news") == 3
+    assert metrics.LLM_COST.value(stage="news") == pytest.approx(0.45)
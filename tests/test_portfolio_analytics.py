@@ -0,0 +1,125 @@
+# tests/test_portfolio_analytics.py
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from marketpulse.utils.portfolio_analytics import holding_region, portfolio_analytics  # noqa: E402
+
+PREFERENCES = {
+    "preferred_sectors": ["Technology", "Healthcare"],
+    "preferred_regions": ["US", "Europe"],
+    "max_position_size": 50,
+    "min_position_size": 10,
+}
+
+
+def holding(ticker, sector, allocation, shares, purchase_price):
+    return {"ticker": ticker, "sector": sector, "allocation": allocation, "shares": shares, "purchase_price": purchase_price}
+
+
+def quote(price):
+    return {"price": f"{price:.4f}", "change_percent": "0.5%"}
+
+
+def by_ticker(analytics):
+    return {h["ticker"]: h for h in analytics["holdings"]}
+
+
+def test_weights_and_pnl_from_quotes():
+    portfolio = {"holdings": [
+        holding("AAPL", "Technology", 60, 10, 100.0),
+        holding("XOM", "Energy", 40, 10, 50.0),
+    ]}
+    analytics = portfolio_analytics(portfolio, PREFERENCES, {"AAPL": quote(150.0), "XOM": quote(50.0)})
+
+    holdings = by_ticker(analytics)
+    assert holdings["AAPL"]["market_value"] == 1500.0
+    assert holdings["AAPL"]["weight_pct"] == 75.0
+    assert holdings["AAPL"]["target_pct"] == 60.0
+    assert holdings["AAPL"]["drift_pct"] == 15.0
+    assert holdings["AAPL"]["unrealized_pnl"] == 500.0
+    assert holdings["AAPL"]["unrealized_pnl_pct"] == 50.0
+    assert analytics["totals"] == {
+        "market_value": 2000.0, "cost_basis": 1500.0, "unrealized_pnl": 500.0, "unrealized_pnl_pct": 33.33
+    }
+    assert analytics["concentration"]["herfindahl"] == 0.625
+    assert analytics["concentration"]["largest_position"] == {"ticker": "AAPL", "weight_pct": 75.0}
+    assert analytics["position_limits"] == {"above_max": ["AAPL"], "below_min": []}
+    assert analytics["unpriced"] == []
+
+
+def test_sector_and_region_drift_from_preferences():
+    portfolio = {"holdings": [
+        holding("AAPL", "Technology", 50, 10, 100.0),
+        holding("SAP.DE", "Technology", 25, 5, 100.0),
+        holding("XOM", "Energy", 25, 5, 100.0),
+    ]}
+    analytics = portfolio_analytics(portfolio, PREFERENCES, {})
+
+    sectors = analytics["sectors"]
+    assert sectors["weights"][0] == {"name": "Technology", "weight_pct": 75.0, "preferred": True}
+    assert sectors["preferred_weight_pct"] == 75.0
+    assert sectors["non_preferred_weight_pct"] == 25.0
+    assert sectors["missing_preferred"] == ["Healthcare"]
+    regions = {entry["name"]: entry["weight_pct"] for entry in analytics["regions"]["weights"]}
+    assert regions == {"US": 75.0, "Europe": 25.0}
+    assert analytics["regions"]["missing_preferred"] == []
+
+
+def test_missing_quotes_are_valued_at_cost_without_pnl():
+    portfolio = {"holdings": [
+        holding("AAPL", "Technology", 50, 10, 100.0),
+        holding("MSFT", "Technology", 50, 10, 100.0),
+    ]}
+    analytics = portfolio_analytics(portfolio, {}, {"AAPL": quote(120.0)})
+
+    holdings = by_ticker(analytics)
+    assert holdings["MSFT"]["market_value"] == 1000.0
+    assert holdings["MSFT"]["unrealized_pnl"] is None
+    assert holdings["MSFT"]["unrealized_pnl_pct"] is None
+    assert analytics["unpriced"] == ["MSFT"]
+    # Totals cover only the holdings with a known P&L
+    assert analytics["totals"]["unrealized_pnl"] == 200.0
+    assert analytics["totals"]["unrealized_pnl_pct"] == 20.0
+
+
+def test_zero_shares_fall_back_to_stated_allocation():
+    portfolio = {"holdings": [
+        holding("AAPL", "Technology", 30, 0, 100.0),
+        {"ticker": "MSFT", "sector": "Technology", "allocation": 10},
+    ]}
+    analytics = portfolio_analytics(portfolio, {}, {"AAPL": quote(120.0)})
+
+    holdings = by_ticker(analytics)
+    assert holdings["AAPL"]["weight_pct"] == 75.0
+    assert holdings["MSFT"]["weight_pct"] == 25.0
+    assert holdings["AAPL"]["drift_pct"] == 0.0
+    assert analytics["totals"]["market_value"] == 0.0
+    assert analytics["totals"]["unrealized_pnl_pct"] is None
+    assert analytics["sectors"]["preferred_weight_pct"] is None
+
+
+def test_unusable_numbers_do_not_raise():
+    portfolio = {"holdings": [{"ticker": "AAPL", "allocation": "n/a", "shares": None, "purchase_price": "abc"}]}
+    analytics = portfolio_analytics(portfolio, {"max_position_size": "lots"}, {"AAPL": {"price": ""}})
+
+    assert analytics["holdings"][0]["weight_pct"] == 0.0
+    assert analytics["holdings"][0]["target_pct"] is None
+    assert analytics["position_limits"] == {"above_max": [], "below_min": []}
+
+
+def test_empty_portfolio():
+    assert portfolio_analytics({"holdings": []}, {}, {}) == {"holdings": []}
+    assert portfolio_analytics({"holdings": [{"company": "No ticker"}]}, {}, {}) == {"holdings": []}
+
+
+@pytest.mark.parametrize("holding_data, region", [
+    ({"ticker": "AAPL"}, "US"),
+    ({"ticker": "sap.de"}, "Europe"),
+    ({"ticker": "7203.T"}, "Asia"),
+    ({"ticker": "BRK.B"}, "US"),
+    ({"ticker": "SHOP.TO", "region": "North America"}, "North America"),
+])
+def test_holding_region(holding_data, region):
+    assert holding_region(holding_data) == region
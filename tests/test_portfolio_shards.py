@@ -0,0 +1,73 @@
+# tests/test_portfolio_shards.py
+
+from marketpulse.utils.portfolio_shards import combine_shard_results, shard_holdings
+
+
+def holdings(*spec):
+    return [{"ticker": ticker, "sector": sector} for ticker, sector in spec]
+
+
+def tickers(shards):
+    return [[h["ticker"] for h in shard] for shard in shards]
+
+
+def test_small_portfolio_is_one_shard():
+    portfolio = holdings(("AAPL", "Tech"), ("XOM", "Energy"))
+    assert tickers(shard_holdings(portfolio, size=8)) == [["AAPL", "XOM"]]
+    assert shard_holdings([], size=8) == []
+
+
+def test_sectors_stay_together_and_small_ones_are_packed():
+    portfolio = holdings(
+        ("AAPL", "Tech"), ("XOM", "Energy"), ("MSFT", "Tech"), ("JNJ", "Health"),
+        ("NVDA", "Tech"), ("CVX", "Energy"), ("PFE", "Health"),
+    )
+    assert tickers(shard_holdings(portfolio, size=3)) == [
+        ["AAPL", "MSFT", "NVDA"], ["XOM", "CVX"], ["JNJ", "PFE"]
+    ]
+
+
+def test_large_sectors_are_chunked_and_every_holding_is_kept_once():
+    portfolio = holdings(*[(f"T{i}", "Tech") for i in range(7)], ("XOM", "Energy"), ("HOLDING", None))
+    shards = shard_holdings(portfolio, size=3)
+    assert all(len(shard) <= 3 for shard in shards)
+    assert sorted(h["ticker"] for shard in shards for h in shard) == sorted(h["ticker"] for h in portfolio)
+    assert tickers(shards) == [["T0", "T1", "T2"], ["T3", "T4", "T5"], ["T6", "XOM", "HOLDING"]]
+
+
+def test_sharding_is_deterministic():
+    portfolio = holdings(*[(f"T{i}", ("Tech", "Energy", "Health")[i % 3]) for i in range(20)])
+    assert shard_holdings(portfolio, size=4) == shard_holdings(list(portfolio), size=4)
+
+
+def test_combine_concatenates_company_news_in_shard_order():
+    merged = combine_shard_results([
+        {"company_news": [{"ticker": "AAPL"}], "sector_news": [], "summary": "first"},
+        None,
+        {"company_news": [{"ticker": "XOM"}, "not an entry"], "sector_news": []},
+    ])
+    assert merged["company_news"] == [{"ticker": "AAPL"}, {"ticker": "XOM"}]
+    assert merged["summary"] == "first"
+
+
+def test_combine_merges_sectors_and_drops_duplicate_developments():
+    merged = combine_shard_results([
+        {"company_news": [], "sector_news": [
+            {"sector": "Tech", "developments": [{"development": "AI capex"}, {"development": "Chip tariffs"}]},
+        ]},
+        {"company_news": [], "sector_news": [
+            {"sector": "Tech", "developments": [{"development": "AI capex"}, {"development": "Antitrust"}]},
+            {"sector": "Energy", "developments": [{"development": "OPEC cut"}]},
+        ]},
+    ])
+    assert merged["sector_news"] == [
+        {"sector": "Tech", "developments": [
+            {"development": "AI capex"}, {"development": "Chip tariffs"}, {"development": "Antitrust"}
+        ]},
+        {"sector": "Energy", "developments": [{"development": "OPEC cut"}]},
+    ]
+
+
+def test_combine_without_results():
+    assert combine_shard_results([None, None]) is None
+    assert combine_shard_results([]) is None
@@ -0,0 +1,145 @@
+# tests/test_quotes.py
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+requests = pytest.importorskip("requests")
+
+from marketpulse.tools import quotes as quotes_module  # noqa: E402
+from marketpulse.tools.cache import ToolCache  # noqa: E402
+from marketpulse.tools.rate_scheduler import QuotaExhausted  # noqa: E402
+
+GLOBAL_QUOTE = {"Global Quote": {
+    "01. symbol": "AAPL", "05. price": "190.0000", "06. volume": "1000",
+    "07. latest trading day": "2026-01-05", "09. change": "1.0000", "10. change percent": "0.5%",
+}}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ToolCache("quotes-test", ttl=60, root=str(tmp_path))
+    monkeypatch.setattr(quotes_module, "QUOTE_CACHE", cache)
+    monkeypatch.setattr(quotes_module.ALPHA_VANTAGE, "penalize", lambda *args, **kwargs: None)
+    return cache
+
+
+def quote(symbol, price="100.0000"):
+    return {"symbol": symbol, "price": price, "change_percent": "0.1%"}
+
+
+def test_normalize_symbols():
+    assert quotes_module.normalize_symbols([" aapl", "MSFT", "AAPL ", "", None, "msft"]) == ["AAPL", "MSFT"]
+
+
+def test_format_global_quote():
+    assert quotes_module.format_global_quote(GLOBAL_QUOTE) == {
+        "symbol": "AAPL", "price": "190.0000", "change": "1.0000", "change_percent": "0.5%",
+        "volume": "1000", "latest_trading_day": "2026-01-05",
+    }
+    assert quotes_module.format_global_quote({"Global Quote": {}}) is None
+    assert quotes_module.format_global_quote([]) is None
+
+
+def test_quote_response_is_cached(cache):
+    assert quotes_module._quote_from_response("AAPL", GLOBAL_QUOTE)["price"] == "190.0000"
+    assert json.loads(cache.get("AAPL"))["price"] == "190.0000"
+
+
+def test_throttling_notice_raises_quota_exhausted(cache):
+    with pytest.raises(QuotaExhausted):
+        quotes_module._quote_from_response("AAPL", {"Note": "Thank you for using Alpha Vantage!"})
+    assert cache.get("AAPL") is None
+
+
+def test_cached_quotes_include_stale_entries(cache):
+    cache.set("AAPL", json.dumps(quote("AAPL")))
+    cache.set("MSFT", json.dumps(quote("MSFT")), ttl=-1)
+    assert quotes_module.cached_quotes(["aapl", "msft", "NVDA"]) == {"AAPL": quote("AAPL"), "MSFT": quote("MSFT")}
+
+
+def test_prefetch_fetches_only_missing_symbols(cache, monkeypatch):
+    cache.set("AAPL", json.dumps(quote("AAPL", "190.0000")))
+    fetched = []
+
+    async def fetch_quote(symbol, lane, max_wait):
+        fetched.append(symbol)
+        await asyncio.sleep(0.01)
+        return quote(symbol) if symbol != "NONE" else None
+
+    monkeypatch.setattr(quotes_module, "fetch_quote", fetch_quote)
+    result = asyncio.run(quotes_module.prefetch_quotes(["aapl", "MSFT", "msft", "NONE"]))
+
+    assert sorted(fetched) == ["MSFT", "NONE"]
+    assert result == {"AAPL": quote("AAPL", "190.0000"), "MSFT": quote("MSFT")}
+
+
+def test_prefetch_falls_back_to_stale_quotes(cache, monkeypatch):
+    cache.set("AAPL", json.dumps(quote("AAPL")), ttl=-1)
+
+    async def fetch_quote(symbol, lane, max_wait):
+        raise QuotaExhausted("no budget")
+
+    monkeypatch.setattr(quotes_module, "fetch_quote", fetch_quote)
+    assert asyncio.run(quotes_module.prefetch_quotes(["AAPL", "MSFT"])) == {"AAPL": quote("AAPL")}
+
+
+def test_prefetch_skips_failed_requests(cache, monkeypatch):
+    async def fetch_quote(symbol, lane, max_wait):
+        raise quotes_module.HttpError("boom")
+
+    monkeypatch.setattr(quotes_module, "fetch_quote", fetch_quote)
+    assert asyncio.run(quotes_module.prefetch_quotes(["AAPL"])) == {}
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status_code = status
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Server Error")
+
+    def json(self):
+        if not isinstance(self.body, dict):
+            raise requests.JSONDecodeError("Expecting value", str(self.body), 0)
+        return self.body
+
+
+@pytest.fixture
+def sync_response(cache, monkeypatch):
+    """Answer sync quote requests with the given response, without waiting for quota"""
+    monkeypatch.setattr(quotes_module.ALPHA_VANTAGE, "acquire", lambda *args, **kwargs: None)
+
+    def respond(status, body):
+        monkeypatch.setattr(quotes_module.sync_session, "get", lambda *args, **kwargs: FakeResponse(status, body))
+    return respond
+
+
+def test_fetch_quote_sync_raises_on_error_status(sync_response, cache):
+    sync_response(200, GLOBAL_QUOTE)
+    assert quotes_module.fetch_quote_sync("AAPL")["price"] == "190.0000"
+
+    sync_response(503, "<html>Service Unavailable</html>")
+    with pytest.raises(requests.HTTPError):
+        quotes_module.fetch_quote_sync("MSFT")
+    assert cache.get("MSFT") is None
+
+
+def test_quote_tool_serves_stale_quote_on_http_errors(sync_response, cache, monkeypatch):
+    pytest.importorskip("crewai")
+    from marketpulse.tools.market_tool import StockQuoteTool
+
+    cache.set("AAPL", json.dumps(quote("AAPL")), ttl=-1)
+    sync_response(502, "<html>Bad Gateway</html>")
+    assert json.loads(StockQuoteTool()._run("aapl")) == quote("AAPL")
+    assert "temporarily unavailable" in StockQuoteTool()._run("MSFT")
+
+    async def fetch_quote(symbol):
+        raise quotes_module.HttpError("GET failed with 502")
+
+    monkeypatch.setattr("marketpulse.tools.market_tool.fetch_quote", fetch_quote)
+    assert json.loads(asyncio.run(StockQuoteTool()._arun("AAPL"))) == quote("AAPL")
@@ -0,0 +1,107 @@
+# tests/test_rate_scheduler.py
+
+import asyncio
+import json
+
+import pytest
+
+from marketpulse.tools import rate_scheduler
+from marketpulse.tools.rate_scheduler import INTERACTIVE, PREFETCH, ProviderScheduler, QuotaExhausted
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_scheduler, "CACHE_ROOT", str(tmp_path))
+    # Persist only when flushed explicitly
+    monkeypatch.setattr(rate_scheduler, "PERSIST_INTERVAL", 3600)
+
+    def make(per_minute=3, per_day=100, **kwargs):
+        return ProviderScheduler("test", per_minute=per_minute, per_day=per_day, **kwargs)
+
+    return make
+
+
+def test_bucket_holds_per_minute_tokens(scheduler):
+    bucket = scheduler(per_minute=3)
+    assert [bucket._try_take(INTERACTIVE) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._try_take(INTERACTIVE) == pytest.approx(20.0, abs=0.1)
+
+
+def test_bucket_refills_over_time(scheduler):
+    bucket = scheduler(per_minute=3)
+    for _ in range(3):
+        bucket._try_take(INTERACTIVE)
+    # 40 seconds later two tokens are back, and the bucket never exceeds its size
+    bucket._refilled_at -= 40
+    assert bucket._try_take(INTERACTIVE) == 0.0
+    assert bucket._try_take(INTERACTIVE) == 0.0
+    assert bucket._try_take(INTERACTIVE) > 0
+    bucket._refilled_at -= 3600
+    assert bucket.snapshot()["tokens_available"] == pytest.approx(3.0, abs=0.01)
+
+
+def test_prefetch_leaves_the_interactive_reserve(scheduler):
+    bucket = scheduler(per_minute=3, interactive_reserve=1)
+    assert bucket._try_take(PREFETCH) == 0.0
+    assert bucket._try_take(PREFETCH) == 0.0
+    assert bucket._try_take(PREFETCH) > 0
+    assert bucket._try_take(INTERACTIVE) == 0.0
+
+
+def test_prefetch_yields_to_waiting_interactive_calls(scheduler):
+    bucket = scheduler(per_minute=3)
+    bucket._waiting(INTERACTIVE, 1)
+    assert bucket._try_take(PREFETCH) == pytest.approx(20.0)
+    assert bucket._try_take(INTERACTIVE) == 0.0
+
+
+def test_daily_budget(scheduler):
+    bucket = scheduler(per_minute=10, per_day=2)
+    bucket._try_take(INTERACTIVE)
+    bucket._try_take(INTERACTIVE)
+    with pytest.raises(QuotaExhausted, match="daily budget of 2"):
+        bucket._try_take(INTERACTIVE)
+    assert bucket.snapshot()["remaining_today"] == 0
+
+
+def test_acquire_reports_the_wait_it_applied(scheduler):
+    bucket = scheduler(per_minute=1, max_wait=30)
+    bucket.acquire()
+    with pytest.raises(QuotaExhausted, match=r"within 0\.5s"):
+        bucket.acquire(max_wait=0.5)
+    with pytest.raises(QuotaExhausted, match=r"within 2s"):
+        asyncio.run(bucket.acquire_async(PREFETCH, max_wait=2))
+    assert bucket.snapshot()["throttled"] == 2
+    assert bucket.snapshot()["interactive_waiting"] == 0
+
+
+def test_acquire_async_waits_for_a_token(scheduler):
+    bucket = scheduler(per_minute=600, per_day=1000)
+    for _ in range(600):
+        bucket._try_take(INTERACTIVE)
+    # One token every 0.1s
+    asyncio.run(bucket.acquire_async(max_wait=1))
+    assert bucket.snapshot()["calls"] == 601
+
+
+def test_usage_is_persisted_on_flush(scheduler):
+    bucket = scheduler()
+    bucket._try_take(INTERACTIVE)
+    bucket._try_take(INTERACTIVE)
+    assert bucket._save_timer is not None
+    assert scheduler().snapshot()["used_today"] == 0
+
+    bucket.flush()
+    with open(bucket.state_file) as f:
+        assert json.load(f)["used_today"] == 2
+    assert scheduler().snapshot()["used_today"] == 2
+    assert bucket._save_timer is None
+
+
+def test_timer_persists_usage(scheduler, monkeypatch):
+    monkeypatch.setattr(rate_scheduler, "PERSIST_INTERVAL", 0.01)
+    bucket = scheduler()
+    bucket._try_take(INTERACTIVE)
+    bucket._save_timer.join(timeout=1)
+    assert scheduler().snapshot()["used_today"] == 1
+    assert bucket._save_timer is None
@@ -0,0 +1,92 @@
+# tests/test_risk.py
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("requests")
+
+from marketpulse.tools.price_history import PriceHistoryStore, parse_daily_series  # noqa: E402
+from marketpulse.utils.risk import aligned_closes, risk_metrics  # noqa: E402
+
+SESSIONS = 60
+
+
+def bars(closes, start="2026-01-01"):
+    dates = np.arange(np.datetime64(start), np.datetime64(start) + len(closes))
+    closes = np.asarray(closes, dtype=float)
+    return {"date": dates, "open": closes, "high": closes, "low": closes, "close": closes, "volume": np.ones(len(closes))}
+
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(7)
+    market = rng.normal(0, 0.01, SESSIONS)
+    store = PriceHistoryStore(str(tmp_path))
+    store.append("SPY", bars(100 * np.cumprod(1 + market)))
+    # Twice the market's moves, and an unrelated series
+    store.append("AAA", bars(50 * np.cumprod(1 + 2 * market)))
+    store.append("BBB", bars(20 * np.cumprod(1 + rng.normal(0, 0.01, SESSIONS))))
+    return store
+
+
+def test_append_adds_only_new_sessions(tmp_path):
+    store = PriceHistoryStore(str(tmp_path))
+    assert store.append("aaa", bars([1.0, 2.0, 3.0])) == 3
+    assert store.append("AAA", bars([2.0, 3.0, 4.0, 5.0], start="2026-01-02")) == 2
+
+    data = store.load("AAA", ("close",))
+    assert data["close"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert str(data["date"][-1]) == "2026-01-05"
+    assert store.is_fresh("AAA")
+    assert store.load("MISSING") is None
+    assert not store.is_fresh("MISSING")
+
+
+def test_parse_daily_series_sorts_sessions():
+    data = {"Time Series (Daily)": {
+        "2026-01-02": {"1. open": "2", "2. high": "2", "3. low": "2", "4. close": "2.5", "5. volume": "10"},
+        "2026-01-01": {"1. open": "1", "2. high": "1", "3. low": "1", "4. close": "1.5", "5. volume": "10"},
+    }}
+    series = parse_daily_series(data)
+    assert [str(d) for d in series["date"]] == ["2026-01-01", "2026-01-02"]
+    assert series["close"].tolist() == [1.5, 2.5]
+    assert parse_daily_series({"Note": "rate limited"}) is None
+
+
+def test_aligned_closes_keeps_shared_valid_sessions(tmp_path):
+    store = PriceHistoryStore(str(tmp_path))
+    closes = np.linspace(10, 20, 30)
+    store.append("AAA", bars(closes))
+    shifted = closes.copy()
+    shifted[10] = np.nan
+    store.append("BBB", bars(shifted[5:], start="2026-01-06"))
+
+    dates, symbols, matrix = aligned_closes(["AAA", "BBB", "CCC"], store, lookback=252)
+    assert symbols == ["AAA", "BBB"]
+    assert len(dates) == 24
+    assert np.isfinite(matrix).all()
+
+
+def test_risk_metrics(store):
+    holdings = [{"ticker": "aaa", "allocation": 75}, {"ticker": "BBB", "allocation": 25}, {"ticker": "NONE"}]
+    metrics = risk_metrics(holdings, store=store, benchmark="SPY")
+
+    assert metrics["sessions"] == SESSIONS - 1
+    assert metrics["benchmark"] == "SPY"
+    assert metrics["no_history"] == ["NONE"]
+    by_ticker = {h["ticker"]: h for h in metrics["holdings"]}
+    assert by_ticker["AAA"]["weight"] == 0.75
+    assert by_ticker["AAA"]["beta"] == pytest.approx(2.0, abs=0.01)
+    assert by_ticker["AAA"]["max_drawdown"] <= 0
+    assert metrics["correlation"]["tickers"] == ["AAA", "BBB"]
+    assert metrics["correlation"]["matrix"][0][0] == 1.0
+    assert metrics["portfolio"]["volatility"] > 0
+    assert metrics["portfolio"]["value_at_risk_95"] > 0
+
+
+def test_risk_metrics_without_history(store, tmp_path):
+    assert risk_metrics([{"ticker": "NONE"}], store=store) is None
+    assert risk_metrics([], store=store) is None
+    short = PriceHistoryStore(str(tmp_path / "short"))
+    short.append("AAA", bars(np.linspace(1, 2, 10)))
+    assert risk_metrics([{"ticker": "AAA"}], store=short) is None
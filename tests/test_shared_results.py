@@ -0,0 +1,132 @@
+# tests/test_shared_results.py
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from marketpulse.utils.shared_results import MARKET_TZ, SharedStageStore, market_window, next_session_open
+
+
+def at(day, hour, minute=0):
+    return datetime(2026, 1, day, hour, minute, tzinfo=MARKET_TZ)
+
+
+def test_market_window_modes():
+    # 2026-01-05 is a Monday
+    assert market_window("hourly", at(5, 10, 15)) == "2026-01-05T10"
+    assert market_window("daily", at(5, 10, 15)) == "2026-01-05"
+    assert market_window("session", at(5, 9, 29)) == "2026-01-05:premarket"
+    assert market_window("session", at(5, 9, 30)) == "2026-01-05:regular"
+    assert market_window("session", at(5, 16, 0)) == "2026-01-05:afterhours"
+    assert market_window("session", at(3, 12)) == "2026-01-03:closed"
+
+
+def test_market_window_uses_market_time_zone():
+    utc = datetime.fromisoformat("2026-01-06T02:00:00+00:00")
+    assert market_window("daily", utc) == "2026-01-05"
+    assert market_window("hourly", utc) == "2026-01-05T21"
+
+
+def test_market_window_mode_from_environment(monkeypatch):
+    monkeypatch.setenv("MARKETPULSE_SHARED_WINDOW", "daily")
+    assert market_window(at=at(5, 10)) == "2026-01-05"
+
+
+def test_next_session_open_skips_weekends():
+    assert next_session_open(at(5, 8)) == at(5, 9, 30)
+    assert next_session_open(at(5, 9, 30)) == at(5, 9, 30)
+    assert next_session_open(at(5, 12)) == at(6, 9, 30)
+    assert next_session_open(at(9, 17)) == at(12, 9, 30)
+    assert next_session_open(at(10, 12)) == at(12, 9, 30)
+
+
+def test_get_or_compute_runs_once_for_concurrent_callers():
+    store = SharedStageStore()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"summary": "shared"}
+
+    async def run():
+        results = await asyncio.gather(*(store.get_or_compute("global_news", "model", compute, window="w1") for _ in range(5)))
+        again = await store.get_or_compute("global_news", "model", compute, window="w1")
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"summary": "shared"} for result in results)
+    assert again == {"summary": "shared"}
+    assert store.get("global_news", "model", window="w1") == {"summary": "shared"}
+
+
+def test_get_or_compute_keys_by_model_and_window():
+    store = SharedStageStore()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"call": len(calls)}
+
+    async def run():
+        return [
+            await store.get_or_compute("global_news", model, compute, window=window)
+            for model, window in (("a", "w1"), ("b", "w1"), ("a", "w2"))
+        ]
+
+    assert asyncio.run(run()) == [{"call": 1}, {"call": 2}, {"call": 3}]
+
+
+def test_failed_results_are_not_stored():
+    store = SharedStageStore()
+    results = iter([None, {"summary": "ok"}])
+
+    async def compute():
+        return next(results)
+
+    async def run():
+        first = await store.get_or_compute("global_news", "model", compute, window="w1")
+        second = await store.get_or_compute("global_news", "model", compute, window="w1")
+        return first, second
+
+    assert asyncio.run(run()) == (None, {"summary": "ok"})
+
+
+def test_caller_cancellation_does_not_cancel_shared_work():
+    store = SharedStageStore()
+    done = []
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        done.append(1)
+        return {"summary": "ok"}
+
+    async def run():
+        first = asyncio.ensure_future(store.get_or_compute("global_news", "model", compute, window="w1"))
+        second = asyncio.ensure_future(store.get_or_compute("global_news", "model", compute, window="w1"))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == {"summary": "ok"}
+    assert done == [1]
+
+
+def test_put_keeps_only_current_and_given_windows(monkeypatch):
+    from marketpulse.utils import shared_results
+
+    monkeypatch.setattr(shared_results, "market_window", lambda mode=None, at=None: "now")
+    store = SharedStageStore()
+    store.put("global_news", "model", "old", window="before")
+    store.put("global_news", "model", "current")
+    store.put("global_news", "model", "next", window="later")
+    store.put("influencer_data", "model", "other", window="before")
+
+    assert store.get("global_news", "model", window="before") is None
+    assert store.get("global_news", "model") == "current"
+    assert store.get("global_news", "model", window="later") == "next"
+    assert store.get("influencer_data", "model", window="before") == "other"
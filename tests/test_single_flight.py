@@ -0,0 +1,132 @@
+# tests/test_single_flight.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from marketpulse.tools.single_flight import SingleFlight
+
+
+def test_concurrent_sync_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, "key", fetch) for _ in range(5)]
+        # Let every follower join before the leader finishes
+        while flight.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert flight._inflight == {}
+
+
+def test_concurrent_async_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+    assert flight.coalesced == 4
+
+
+def test_distinct_keys_and_later_calls_run_again():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def run():
+        first = await asyncio.gather(flight.do_async("a", lambda: fetch("a")), flight.do_async("b", lambda: fetch("b")))
+        return first, await flight.do_async("a", lambda: fetch("a"))
+
+    assert asyncio.run(run()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_sync_and_async_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        # A crew thread leads; a coroutine asking for the same key joins it
+        leader = loop.run_in_executor(None, flight.do, "key", fetch)
+        while "key" not in flight._inflight:
+            await asyncio.sleep(0.001)
+
+        async def unexpected():
+            calls.append("async")
+            return "other"
+
+        follower = asyncio.ensure_future(flight.do_async("key", unexpected))
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(run()) == ["value", "value"]
+    assert calls == [1]
+
+
+def test_leader_exception_reaches_every_waiter_and_clears_the_key():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) and str(result) == "upstream failed" for result in results)
+    assert flight._inflight == {}
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_sync_leader_exception_reaches_sync_followers():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(3)]
+        while flight.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result(5)
+    assert flight._inflight == {}
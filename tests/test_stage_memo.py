@@ -0,0 +1,86 @@
+# tests/test_stage_memo.py
+
+from datetime import datetime
+
+import pytest
+
+from marketpulse.tools.cache import ToolCache
+from marketpulse.utils.stage_memo import StageMemo, holding_slice, input_hash, merge_portfolio_news
+
+
+def test_input_hash_ignores_dict_key_order():
+    assert input_hash({"a": 1, "b": {"c": 2, "d": 3}}) == input_hash({"b": {"d": 3, "c": 2}, "a": 1})
+
+
+def test_input_hash_depends_on_values_order_and_arity():
+    base = input_hash("stage", {"a": 1}, [1, 2])
+    assert input_hash("stage", {"a": 2}, [1, 2]) != base
+    assert input_hash("stage", {"a": 1}, [2, 1]) != base
+    assert input_hash("stage", {"a": 1}) != base
+    assert input_hash(("stage", {"a": 1}, [1, 2])) != base
+
+
+def test_input_hash_accepts_non_json_values():
+    assert input_hash(datetime(2026, 1, 2)) == input_hash(str(datetime(2026, 1, 2)))
+    assert len(input_hash(None)) == 64
+
+
+def test_holding_slice_drops_position_details():
+    holding = {"ticker": " aapl ", "company": "Apple Inc.", "sector": "Technology", "allocation": 15, "shares": 25}
+    assert holding_slice(holding) == {"ticker": "AAPL", "company": "Apple Inc.", "sector": "Technology"}
+    assert holding_slice({"ticker": None}) == {"ticker": "", "company": "", "sector": ""}
+
+
+@pytest.fixture
+def memo(tmp_path):
+    memo = StageMemo(ToolCache("stages-test", ttl=60, root=str(tmp_path)), window_mode="daily")
+    memo.enabled = True
+    return memo
+
+
+def test_memo_keys_cover_model_window_and_inputs(memo):
+    at = datetime(2026, 3, 2, 15)
+    key = memo.key("sentiment_analysis", "gpt-4o-mini:0", {"a": 1}, at=at)
+    assert key.startswith("sentiment_analysis ")
+    assert memo.key("sentiment_analysis", "gpt-4o-mini:0", {"a": 1}, at=at) == key
+    assert memo.key("sentiment_analysis", "gpt-4o:0", {"a": 1}, at=at) != key
+    assert memo.key("sentiment_analysis", "gpt-4o-mini:0", {"a": 2}, at=at) != key
+    assert memo.key("sentiment_analysis", "gpt-4o-mini:0", {"a": 1}, at=datetime(2026, 3, 3, 15)) != key
+
+
+def test_memo_round_trip_skips_empty_values(memo):
+    memo.put("stage key", {"summary": "ok"})
+    memo.put("empty key", {})
+    assert memo.get("stage key") == {"summary": "ok"}
+    assert memo.get("empty key") is None
+    memo.enabled = False
+    assert memo.get("stage key") is None
+
+
+def test_merge_portfolio_news_prefers_fresh_entries_in_holding_order():
+    holdings = [
+        {"ticker": "MSFT", "sector": "Technology"},
+        {"ticker": "XOM", "sector": "Energy"},
+        {"ticker": "AAPL", "sector": "Technology"},
+    ]
+    cached_news = {"MSFT": {"ticker": "MSFT", "source": "memo"}, "AAPL": {"ticker": "AAPL", "source": "memo"}}
+    cached_sectors = {"Technology": {"sector": "Technology", "source": "memo"}}
+    fresh = {
+        "company_news": [{"ticker": "aapl", "source": "fresh"}, {"ticker": "XOM", "source": "fresh"}],
+        "sector_news": [{"sector": "Energy", "source": "fresh"}, {"sector": "Utilities", "source": "fresh"}],
+        "summary": "kept",
+    }
+    merged = merge_portfolio_news(holdings, cached_news, cached_sectors, fresh)
+
+    assert [(e["ticker"], e["source"]) for e in merged["company_news"]] == [
+        ("MSFT", "memo"), ("XOM", "fresh"), ("aapl", "fresh")
+    ]
+    assert [(e["sector"], e["source"]) for e in merged["sector_news"]] == [
+        ("Technology", "memo"), ("Energy", "fresh"), ("Utilities", "fresh")
+    ]
+    assert merged["summary"] == "kept"
+
+
+def test_merge_portfolio_news_from_cache_only():
+    merged = merge_portfolio_news([{"ticker": "AAPL", "sector": "Technology"}], {"AAPL": {"ticker": "AAPL"}}, {})
+    assert merged == {"company_news": [{"ticker": "AAPL"}], "sector_news": []}
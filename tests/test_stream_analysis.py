@@ -0,0 +1,137 @@
+# tests/test_stream_analysis.py
+
+import asyncio
+import json
+import types
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from marketpulse.flows import market_analysis_flow as flow_module  # noqa: E402
+from marketpulse.flows.market_analysis_flow import STAGE_GRAPH, MarketSentimentFlow, timed_stage  # noqa: E402
+
+PORTFOLIO = {"holdings": [{"ticker": "AAPL", "company": "Apple Inc.", "sector": "Technology", "allocation": 100}]}
+PREFERENCES = {"risk_tolerance": "moderate", "investment_horizon": "long"}
+
+# Seconds each stubbed stage takes; the independent stages finish in reverse order of the graph
+DELAYS = {
+    "portfolio_analytics": 0.0,
+    "global_news": 0.15,
+    "portfolio_news": 0.1,
+    "influencer_data": 0.05,
+    "sentiment_analysis": 0.01,
+    "recommendations": 0.01,
+}
+
+
+def stub_flow(results=None, delays=None):
+    """A flow whose stages sleep and return canned results, recording when each starts and ends"""
+    crews = SimpleNamespace(
+        crew_instance=None, global_news_crew=None, portfolio_news_crew=None,
+        influencer_crew=None, sentiment_crew=None, recommendation_crew=None,
+    )
+    flow = MarketSentimentFlow(PORTFOLIO, PREFERENCES, crews=crews)
+    results = {name: {"stage": name} for name in STAGE_GRAPH} | (results or {})
+    delays = DELAYS | (delays or {})
+    flow.log = []
+
+    def stage(name):
+        @timed_stage(name)
+        async def run(self):
+            self.log.append(("start", name))
+            try:
+                await asyncio.sleep(delays[name])
+            except asyncio.CancelledError:
+                self.log.append(("cancelled", name))
+                raise
+            self.log.append(("end", name))
+            return results[name]
+        return types.MethodType(run, flow)
+
+    for name, (method, _, _, _) in STAGE_GRAPH.items():
+        setattr(flow, method, stage(name))
+
+    async def no_prefetch():
+        return {}
+
+    flow._fetch_quotes = no_prefetch
+    flow._compute_risk_metrics = no_prefetch
+    return flow
+
+
+def run_stream(flow, timeout=5):
+    async def collect():
+        return [json.loads(event.replace("data: ", "").strip()) async for event in flow.stream_analysis()]
+    return asyncio.run(asyncio.wait_for(collect(), timeout))
+
+
+def completed(events):
+    return [event["task"] for event in events if event["type"] == "task_complete"]
+
+
+def test_independent_stages_start_together():
+    flow = stub_flow()
+    events = run_stream(flow)
+
+    starts = [name for kind, name in flow.log if kind == "start"]
+    first_end = flow.log.index(next(entry for entry in flow.log if entry[0] == "end"))
+    # All stages without upstream tasks are running before any of them finishes
+    independent = {name for name, (_, upstream, _, _) in STAGE_GRAPH.items() if not upstream}
+    assert {name for kind, name in flow.log[:first_end] if kind == "start"} == independent
+    assert starts.index("sentiment_analysis") > max(starts.index(name) for name in independent)
+    assert events[-1]["type"] == "complete"
+
+
+def test_task_complete_events_follow_completion_order():
+    flow = stub_flow()
+    events = run_stream(flow)
+
+    assert completed(events) == [
+        "portfolio_analytics", "influencer_data", "portfolio_news", "global_news",
+        "sentiment_analysis", "recommendations",
+    ]
+    assert completed(events) == [name for kind, name in flow.log if kind == "end"]
+    complete_events = [event for event in events if event["type"] == "task_complete"]
+    assert all(event["data"] == {"stage": event["task"]} for event in complete_events)
+    timing = {event["task"]: event["timing"] for event in complete_events}
+    assert timing["global_news"]["duration_ms"] >= 100
+    # Independent stages start at the same offset into the analysis
+    assert abs(timing["global_news"]["offset_ms"] - timing["influencer_data"]["offset_ms"]) < 50
+    summary = next(event for event in events if event["type"] == "timing_summary")
+    assert set(summary["data"]["stages"]) == set(STAGE_GRAPH)
+
+
+def test_failing_stage_stops_the_stream_and_cancels_the_rest():
+    # Influencer monitoring fails first, while global and portfolio news are still running
+    flow = stub_flow(results={"influencer_data": None})
+    events = run_stream(flow)
+
+    assert [event["type"] for event in events][-2:] == ["error", "timing_summary"]
+    assert events[-2]["message"] == STAGE_GRAPH["influencer_data"][3]
+    assert "influencer_data" not in completed(events)
+    names = {name for _, name in flow.log}
+    # Dependents never start, and stages still running are cancelled rather than awaited
+    assert "sentiment_analysis" not in names and "recommendations" not in names
+    assert ("cancelled", "global_news") in flow.log and ("cancelled", "portfolio_news") in flow.log
+    assert ("end", "global_news") not in flow.log
+
+
+def test_failing_dependent_stage_reports_its_error():
+    flow = stub_flow(results={"sentiment_analysis": None})
+    events = run_stream(flow)
+
+    assert set(completed(events)) == {"portfolio_analytics", "global_news", "portfolio_news", "influencer_data"}
+    assert events[-2] == {"type": "error", "message": STAGE_GRAPH["sentiment_analysis"][3]}
+    assert ("start", "recommendations") not in flow.log
+
+
+def test_seeded_stages_are_not_run():
+    flow = stub_flow()
+    flow._seeded_stages = {"global_news": {"seeded": True}}
+    events = run_stream(flow)
+
+    assert ("start", "global_news") not in flow.log
+    assert completed(events)[0] == "global_news"
+    assert events[-1]["type"] == "complete"
@@ -0,0 +1,117 @@
+# tests/test_task_templates.py
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from marketpulse.utils.payloads import INPUT_PRIORITIES, fit_inputs
+
+ROOT = Path(__file__).resolve().parents[1]
+TASKS = yaml.safe_load((ROOT / "src" / "marketpulse" / "config" / "tasks.yaml").read_text())
+EXAMPLES = ROOT / "examples"
+
+TASK_STAGES = {
+    "collect_global_news_task": "global_news",
+    "analyze_portfolio_news_task": "portfolio_news",
+    "monitor_key_influencers_task": "influencer_data",
+    "analyze_market_sentiment_task": "sentiment_analysis",
+    "generate_recommendations_task": "recommendations",
+}
+
+# The template variable pattern crewai interpolates (crewai.utilities.string_utils)
+TEMPLATE_VARIABLE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+SAMPLE_INPUTS = {
+    "portfolio": {"holdings": [{"ticker": "AAPL", "company": "Apple Inc.", "sector": "Technology", "allocation": 60}]},
+    "preferences": {"risk_tolerance": "moderate"},
+    "quotes": {"AAPL": {"price": "190.0000", "change_percent": "0.5%"}},
+    "risk_metrics": "No price history available; assess risk qualitatively.",
+    "portfolio_analytics": {"holdings": [{"ticker": "AAPL", "weight_pct": 100.0}]},
+    "global_news": {"major_events": []},
+    "portfolio_news": {"company_news": [], "sector_news": []},
+    "influencer_data": {"influencer_statements": []},
+    "sentiment_analysis": {"overall_market_sentiment": "neutral"},
+}
+
+
+def template_variables(task):
+    return set(TEMPLATE_VARIABLE.findall(task["description"] + task["expected_output"]))
+
+
+def test_every_task_has_a_stage():
+    assert set(TASKS) == set(TASK_STAGES)
+
+
+@pytest.mark.parametrize("task_name, stage", sorted(TASK_STAGES.items()))
+def test_template_variables_are_the_stage_inputs(task_name, stage):
+    assert template_variables(TASKS[task_name]) == set(INPUT_PRIORITIES.get(stage, {}))
+
+
+@pytest.mark.parametrize("task_name, stage", sorted(TASK_STAGES.items()))
+def test_fitted_inputs_fill_every_template_variable(task_name, stage):
+    inputs = {name: SAMPLE_INPUTS[name] for name in INPUT_PRIORITIES.get(stage, {})}
+    encoded, _ = fit_inputs(stage, inputs, budget=0) if inputs else ({}, None)
+
+    task = TASKS[task_name]
+    text = TEMPLATE_VARIABLE.sub(lambda match: encoded[match.group(1)], task["description"] + task["expected_output"])
+    assert not TEMPLATE_VARIABLE.search(text)
+
+
+def test_fit_inputs_rejects_undeclared_inputs():
+    inputs = {name: SAMPLE_INPUTS[name] for name in ("portfolio", "quotes", "risk_metrics")}
+    with pytest.raises(ValueError, match="risk_metrics"):
+        fit_inputs("portfolio_news", inputs)
+    with pytest.raises(ValueError):
+        fit_inputs("portfolio_news", {"portfolio": SAMPLE_INPUTS["portfolio"]})
+
+
+def test_flow_stages_interpolate_their_tasks(monkeypatch):
+    pytest.importorskip("crewai")
+    from marketpulse.flows import market_analysis_flow as flow_module
+    from marketpulse.utils.shared_results import shared_stage_store
+    from marketpulse.utils.stage_memo import stage_memo
+
+    portfolio = json.loads((EXAMPLES / "portfolio.json").read_text())
+    preferences = json.loads((EXAMPLES / "preferences.json").read_text())
+
+    async def prefetch_quotes(symbols, **kwargs):
+        return {symbol: {"price": "100.0000", "change_percent": "0.1%"} for symbol in symbols}
+
+    async def refresh_price_histories(symbols, **kwargs):
+        return {}
+
+    failures, interpolated = [], []
+
+    async def kickoff(self, crew, inputs=None):
+        # Crew.kickoff interpolates only when it is given inputs
+        if inputs:
+            try:
+                crew._interpolate_inputs(inputs)
+                interpolated.append(crew.tasks[0].name or crew.tasks[0].description[:40])
+            except ValueError as e:
+                failures.append(str(e))
+        return SimpleNamespace(tasks_output=[SimpleNamespace(raw='{"summary": "ok"}')], token_usage=None)
+
+    # The search tools refuse to build without a key; no search is made
+    monkeypatch.setenv("SERPER_API_KEY", "fake-key-for-tests")
+    monkeypatch.setattr(flow_module, "prefetch_quotes", prefetch_quotes)
+    monkeypatch.setattr(flow_module, "refresh_price_histories", refresh_price_histories)
+    monkeypatch.setattr(flow_module.MarketSentimentFlow, "_kickoff", kickoff)
+    monkeypatch.setattr(stage_memo, "enabled", False)
+    shared_stage_store.clear()
+
+    flow = flow_module.MarketSentimentFlow(portfolio, preferences)
+
+    async def run_stages():
+        for method, _, _, _ in flow_module.STAGE_GRAPH.values():
+            assert await getattr(flow, method)()
+
+    asyncio.run(run_stages())
+    assert failures == []
+    # Portfolio news (one crew per shard), sentiment and recommendations take inputs
+    assert len(interpolated) >= 3
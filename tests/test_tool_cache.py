@@ -0,0 +1,146 @@
+# tests/test_tool_cache.py
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from marketpulse.tools import cache as cache_module
+from marketpulse.tools.cache import ToolCache, end_of_day_ttl
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("ttl", 60)
+        return ToolCache("test", root=str(tmp_path), **kwargs)
+    return make
+
+
+def test_memory_then_disk_hits(make_cache):
+    cache = make_cache()
+    cache.set("AAPL quote", "190")
+    assert cache.get("AAPL quote") == "190"
+    assert cache.counters["memory_hits"] == 1
+
+    cache.clear_memory()
+    assert cache.get("AAPL quote") == "190"
+    assert cache.counters["disk_hits"] == 1
+    # Promoted back into memory
+    assert cache.get("AAPL quote") == "190"
+    assert cache.counters["memory_hits"] == 2
+
+    assert cache.get("missing") is None
+    assert cache.stats()["hit_ratio"] == pytest.approx(3 / 4)
+
+
+def test_entries_expire_in_both_tiers(make_cache, monkeypatch):
+    cache = make_cache(ttl=10)
+    cache.set("key", "value")
+    cache.set("long", "value", ttl=1000)
+    later = time.time() + 11
+    monkeypatch.setattr(cache_module.time, "time", lambda: later)
+
+    assert cache.get("key") is None
+    assert cache.get("long") == "value"
+    cache.clear_memory()
+    assert cache.get("key") is None
+    assert cache.counters["expired"] == 2
+    # Expired values are still there for the stale fallback
+    assert cache.get_stale("key") == "value"
+
+
+def test_memory_tier_evicts_least_recently_used(make_cache):
+    cache = make_cache(max_memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert set(cache._memory) == {"a", "c"}
+    assert cache.counters["memory_evictions"] == 1
+    # The evicted entry is still served from disk
+    assert cache.get("b") == "2"
+    assert cache.counters["disk_hits"] == 1
+
+
+def test_disk_tier_is_bounded_by_count_and_size(make_cache):
+    cache = make_cache(max_disk_entries=3)
+    for i in range(5):
+        cache.set(f"key {i}", "x")
+        path = cache._filename(f"key {i}")
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.sweep()
+    assert sorted(os.listdir(cache.directory)) == sorted(
+        os.path.basename(cache._filename(f"key {i}")) for i in (2, 3, 4)
+    )
+    assert cache.counters["disk_evictions"] == 2
+
+    sized = ToolCache("sized", ttl=60, root=cache.directory, max_disk_bytes=400)
+    for i in range(5):
+        sized.set(f"key {i}", "x" * 100)
+        os.utime(sized._filename(f"key {i}"), (1000 + i, 1000 + i))
+    sized.sweep()
+    assert sum(entry.stat().st_size for entry in os.scandir(sized.directory)) <= 400
+
+
+def test_long_keys_get_distinct_files(make_cache):
+    cache = make_cache()
+    first, second = "x" * 150 + "1", "x" * 150 + "2"
+    assert cache._filename(first) != cache._filename(second)
+    cache.set(first, "1")
+    cache.set(second, "2")
+    cache.clear_memory()
+    assert (cache.get(first), cache.get(second)) == ("1", "2")
+
+
+def test_end_of_day_ttl():
+    noon = datetime(2026, 3, 2, 12).timestamp()
+    assert end_of_day_ttl(noon) == pytest.approx(12 * 3600)
+
+
+def test_keys_with_the_same_readable_name_do_not_collide(make_cache):
+    cache = make_cache()
+    cache.set("BRK.B", "class B")
+    cache.set("BRKB", "other")
+    cache.set("S&P 500", "index")
+    assert cache._filename("BRK.B") != cache._filename("BRKB")
+    cache.clear_memory()
+    assert (cache.get("BRK.B"), cache.get("BRKB"), cache.get("S&P 500"), cache.get("SP 500")) == (
+        "class B", "other", "index", None
+    )
+
+
+def test_entries_stored_under_another_key_are_ignored(make_cache):
+    cache = make_cache()
+    cache.set("BRK.B", "class B")
+    os.replace(cache._filename("BRK.B"), cache._filename("BRKB"))
+    cache.clear_memory()
+    assert cache.get("BRKB") is None
+    assert cache.get_stale("BRKB") is None
+
+
+def test_async_methods_keep_disk_io_off_the_loop_thread(make_cache):
+    cache = make_cache()
+    disk_threads = []
+    for name in ("_get_disk", "_get_stale_disk", "_write"):
+        method = getattr(cache, name)
+
+        def recorded(*args, _method=method):
+            disk_threads.append(threading.current_thread())
+            return _method(*args)
+        setattr(cache, name, recorded)
+
+    async def run():
+        await cache.aset("AAPL", "190")
+        hit = await cache.aget("AAPL")
+        cache.clear_memory()
+        return hit, await cache.aget("AAPL"), await cache.aget("MSFT"), await cache.aget_stale("MSFT")
+
+    assert asyncio.run(run()) == ("190", "190", None, None)
+    # The write, two disk lookups and the stale lookup ran in the executor; the memory hit did not
+    assert len(disk_threads) == 4
+    assert threading.main_thread() not in disk_threads
+    assert cache.counters["memory_hits"] == 1 and cache.counters["disk_hits"] == 1
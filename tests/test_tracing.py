@@ -0,0 +1,138 @@
+# tests/test_tracing.py
+
+import asyncio
+import json
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from marketpulse.utils.crew_executor import CrewExecutor
+from marketpulse.utils.tracing import Span, activate, current_span, export_to_opentelemetry, trace_span
+
+
+def tool_call(name, cache="miss"):
+    """What a tool does on a crew thread: open a tool span under whatever span is current"""
+    with trace_span(name, kind="tool", cache=cache):
+        return current_span().parent.name if current_span().parent else None
+
+
+def test_spans_nest_and_restore_the_current_span():
+    assert current_span() is None
+    with trace_span("analysis", kind="analysis") as root:
+        with trace_span("global_news", kind="stage") as stage:
+            assert current_span() is stage
+            tool_call("financial_news_search")
+        assert current_span() is root
+    assert current_span() is None
+
+    assert [child.name for child in root.children] == ["global_news"]
+    assert [child.name for child in stage.children] == ["financial_news_search"]
+    assert stage.duration is not None and root.duration >= stage.duration
+
+
+def test_crew_executor_threads_attach_tool_spans_to_the_stage():
+    executor = CrewExecutor(max_workers=2)
+    root = Span("analysis", kind="analysis")
+
+    async def stage(name):
+        with activate(root.child(name, kind="stage")) as span:
+            parents = await asyncio.gather(
+                executor.run(tool_call, "stock_quote", "hit"),
+                executor.run(tool_call, "financial_news_search"),
+            )
+            return span, parents
+
+    async def run():
+        return await asyncio.gather(stage("global_news"), stage("portfolio_news"))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    for span, parents in results:
+        # Each thread saw the stage that issued the call, even with both stages running at once
+        assert parents == [span.name, span.name]
+        assert sorted(child.name for child in span.children) == ["financial_news_search", "stock_quote"]
+        assert span.summary()["tool_calls"] == 2 and span.summary()["cache_hits"] == 1
+    assert root.summary()["tool_calls"] == 4
+
+
+def test_plain_executor_threads_do_not_see_the_span():
+    # Why the crew executor copies the context: run_in_executor alone does not
+    async def run():
+        with trace_span("stage", kind="stage"):
+            return await asyncio.get_running_loop().run_in_executor(None, current_span)
+
+    assert asyncio.run(run()) is None
+
+
+def test_summary_and_tree():
+    root = Span("analysis", kind="analysis")
+    stage = root.child("recommendations", kind="stage", source="memo")
+    stage.child("stock_quote", kind="tool", cache="hit").end()
+    stage.end()
+    root.end()
+
+    summary = stage.summary()
+    assert summary["source"] == "memo"
+    assert "kind" not in summary
+    assert summary["ended_at"] >= summary["started_at"]
+    tree = root.to_dict()
+    assert tree["name"] == "analysis"
+    leaf = tree["children"][0]["children"][0]
+    assert (leaf["name"], leaf["cache"], leaf["children"]) == ("stock_quote", "hit", [])
+
+
+def test_export_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("MARKETPULSE_OTEL_EXPORT", raising=False)
+    export_to_opentelemetry(Span("analysis"))
+
+
+def test_stage_and_tool_timings_appear_in_the_stream(monkeypatch):
+    pytest.importorskip("crewai")
+    from marketpulse.flows import market_analysis_flow as flow_module
+
+    executor = CrewExecutor(max_workers=2)
+    crews = SimpleNamespace(
+        crew_instance=None, global_news_crew=None, portfolio_news_crew=None,
+        influencer_crew=None, sentiment_crew=None, recommendation_crew=None,
+    )
+    flow = flow_module.MarketSentimentFlow({"holdings": [{"ticker": "AAPL"}]}, {}, crews=crews)
+
+    def stage(name, tools):
+        @flow_module.timed_stage(name)
+        async def run(self):
+            for tool, cache in tools:
+                await executor.run(tool_call, tool, cache)
+            return {"stage": name}
+        return types.MethodType(run, flow)
+
+    tools = {"global_news": [("financial_news_search", "miss"), ("financial_news_search", "hit")]}
+    for name, (method, _, _, _) in flow_module.STAGE_GRAPH.items():
+        setattr(flow, method, stage(name, tools.get(name, [])))
+
+    async def no_prefetch():
+        return {}
+
+    flow._fetch_quotes = no_prefetch
+    flow._compute_risk_metrics = no_prefetch
+
+    async def collect():
+        return [json.loads(event.replace("data: ", "").strip()) async for event in flow.stream_analysis()]
+
+    try:
+        events = asyncio.run(collect())
+    finally:
+        executor.shutdown()
+
+    timing = {event["task"]: event["timing"] for event in events if event["type"] == "task_complete"}
+    assert timing["global_news"]["tool_calls"] == 2
+    assert timing["global_news"]["cache_hits"] == 1
+    assert timing["sentiment_analysis"]["tool_calls"] == 0
+    assert all(stage_timing["offset_ms"] >= 0 for stage_timing in timing.values())
+
+    summary = next(event["data"] for event in events if event["type"] == "timing_summary")
+    assert set(summary["stages"]) == set(flow_module.STAGE_GRAPH)
+    assert summary["stages"]["global_news"]["tool_calls"] == 2
+    assert summary["total_ms"] >= max(stage_timing["duration_ms"] for stage_timing in timing.values())
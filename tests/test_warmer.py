@@ -0,0 +1,86 @@
+# tests/test_warmer.py
+
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from marketpulse import warmer as warmer_module  # noqa: E402
+from marketpulse.utils.shared_results import MARKET_TZ  # noqa: E402
+from marketpulse.warmer import (  # noqa: E402
+    PreMarketWarmer, load_portfolio_file, next_warm_time, prioritized_holdings, ticker_budget
+)
+
+
+def quota(serper, alphavantage):
+    return {"serper": {"remaining_today": serper}, "alphavantage": {"remaining_today": alphavantage}}
+
+
+def at(day, hour, minute=0):
+    return datetime(2026, 1, day, hour, minute, tzinfo=MARKET_TZ)
+
+
+def portfolio(*tickers):
+    return {"holdings": [{"ticker": ticker, "company": ticker.title(), "sector": "Technology"} for ticker in tickers]}
+
+
+def test_ticker_budget_is_bound_by_the_scarcer_provider():
+    # Serper: 400 * 0.25 - 12 shared searches leaves 88, at 2 per ticker
+    assert ticker_budget(quota(400, 1000), share=0.25) == 44
+    # Alpha Vantage: 100 * 0.25 = 25 calls, at a quote and a history request per ticker
+    assert ticker_budget(quota(2500, 100), share=0.25) == 12
+    assert ticker_budget(quota(40, 1000), share=0.25) == 0
+
+
+def test_next_warm_time_skips_past_times_and_weekends():
+    # 2026-01-05 is a Monday, 2026-01-09 a Friday
+    assert next_warm_time(at(5, 8), "09:00") == at(5, 9)
+    assert next_warm_time(at(5, 9), "09:00") == at(6, 9)
+    assert next_warm_time(at(9, 10), "09:00") == at(12, 9)
+    assert next_warm_time(at(10, 8), "08:45") == at(12, 8, 45)
+
+
+def test_prioritized_holdings_orders_by_how_widely_held():
+    holdings = prioritized_holdings([portfolio("aapl", "MSFT"), portfolio("MSFT", "NVDA", "msft"), portfolio("NVDA", "MSFT")])
+    assert [h["ticker"] for h in holdings] == ["MSFT", "NVDA", "AAPL"]
+    assert holdings[-1] == {"ticker": "AAPL", "company": "Aapl", "sector": "Technology"}
+
+
+def test_load_portfolio_file_shapes(tmp_path):
+    single = tmp_path / "single.json"
+    single.write_text(json.dumps(portfolio("AAPL")))
+    listed = tmp_path / "listed.json"
+    listed.write_text(json.dumps({"portfolios": [portfolio("MSFT"), {"holdings": "NVDA"}, "junk"]}))
+
+    assert load_portfolio_file(str(single)) == [portfolio("AAPL")]
+    assert load_portfolio_file(str(listed)) == [portfolio("MSFT")]
+
+
+def test_known_portfolios_skips_unreadable_files(tmp_path):
+    path = tmp_path / "portfolios.json"
+    path.write_text(json.dumps([portfolio("AAPL"), portfolio("MSFT")]))
+    assert warmer_module.known_portfolios([str(path), str(tmp_path / "missing.json")], lookback_days=0) == [
+        portfolio("AAPL"), portfolio("MSFT")
+    ]
+
+
+def test_plan_caps_tickers_to_the_budget(monkeypatch):
+    monkeypatch.setattr(warmer_module, "quota_snapshot", lambda: quota(20, 8))
+    plan = PreMarketWarmer(pool=object(), quota_share=1.0).plan(
+        [portfolio("AAPL", "MSFT"), portfolio("MSFT", "NVDA"), portfolio("TSLA", "NVDA", "MSFT")], as_of=at(5, 9, 30)
+    )
+
+    assert plan["window"] == warmer_module.market_window(at=at(5, 9, 30))
+    assert plan["portfolios"] == 3
+    assert plan["shared"]
+    # Serper allows (20 - 12) / 2 = 4 tickers and Alpha Vantage 8 / 2 = 4
+    assert [h["ticker"] for h in plan["holdings"]] == ["MSFT", "NVDA", "AAPL", "TSLA"]
+    assert plan["skipped"] == []
+
+    monkeypatch.setattr(warmer_module, "quota_snapshot", lambda: quota(10, 4))
+    plan = PreMarketWarmer(pool=object(), quota_share=1.0).plan([portfolio("AAPL", "MSFT"), portfolio("MSFT")], at(5, 9, 30))
+    assert not plan["shared"]
+    assert plan["holdings"] == []
+    assert plan["skipped"] == ["MSFT", "AAPL"]